@@ -10,6 +10,7 @@ set py=C:\Windows\py.exe -3.7 -B
     ..\..\..\..\..\jtypes.jvm\src\jt\jvm\java\com\jt\reflect\*.java ^
     org\pybee\rubicon\*.java
 %py% -m class2py org\pybee\rubicon\Python.class
+%py% -m classgen org\pybee\rubicon\Introspector org\pybee\rubicon\BatchingHandler
 del /F/Q ^
     ..\..\..\..\..\jtypes.jvm\src\jt\jvm\java\com\jt\reflect\*.class ^
     org\pybee\rubicon\*.class
@@ -0,0 +1,315 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+"""Generate the class files of the embedded helper classes.
+
+The class files of org.pybee.rubicon.Introspector and BatchingHandler are
+assembled with jt.rubicon.java._classfile, following their .java sources
+statement by statement, and embedded as the __javacode__ of their modules:
+
+    python -m classgen [--check] [org/pybee/rubicon/<class> ...]
+
+With --check the modules aren't changed; the exit status is 1 if any of
+their __javacode__ differs from the generated class file.
+"""
+
+import sys
+import os
+import re
+
+from jt.rubicon.java._classfile import ClassFile
+from jt.rubicon.java._classfile import ACC_PUBLIC, ACC_PRIVATE, ACC_STATIC, ACC_NATIVE
+from jt.rubicon.java._classfile import ACC_FINAL, ACC_SUPER, ACC_SYNCHRONIZED
+
+OBJECT  = "java/lang/Object"
+STRING  = "java/lang/String"
+CLASS   = "java/lang/Class"
+THREAD  = "java/lang/Thread"
+BUILDER = "java/lang/StringBuilder"
+METHOD  = "java/lang/reflect/Method"
+
+_append_char   = (BUILDER, "append", "(C)Ljava/lang/StringBuilder;")
+_append_int    = (BUILDER, "append", "(I)Ljava/lang/StringBuilder;")
+_append_string = (BUILDER, "append", "(Ljava/lang/String;)Ljava/lang/StringBuilder;")
+_to_string     = (BUILDER, "toString", "()Ljava/lang/String;")
+_get_name      = (CLASS, "getName", "()Ljava/lang/String;")
+
+
+def introspector():
+
+    name = "org/pybee/rubicon/Introspector"
+    cf = ClassFile(name, access=ACC_PUBLIC | ACC_FINAL | ACC_SUPER)
+
+    # private Introspector()
+    c = cf.code(1, 1)
+    c.aload(0).invokespecial(OBJECT, "<init>", "()V").return_()
+    cf.method(ACC_PRIVATE, "<init>", "()V", c)
+
+    # public static String describe(Class<?> cls)
+    # locals: 0 cls, 1 sb, 2 array/sup, 3 i, 4 member
+    c = cf.code(4, 5)
+    c.new(BUILDER).dup().invokespecial(BUILDER, "<init>", "()V").astore(1)
+    c.aload(0).invokevirtual(CLASS, "getInterfaces", "()[Ljava/lang/Class;").astore(2)
+    c.iconst_0().istore(3)
+    c.label("interfaces").iload(3).aload(2).arraylength().if_icmpge("superclasses")
+    c.aload(1).bipush(ord("I")).invokevirtual(*_append_char)
+    c.aload(2).iload(3).aaload().invokevirtual(*_get_name).invokevirtual(*_append_string)
+    c.bipush(ord("\n")).invokevirtual(*_append_char).pop()
+    c.iinc(3, 1).goto("interfaces")
+    c.label("superclasses")
+    c.aload(0).invokevirtual(CLASS, "getSuperclass", "()Ljava/lang/Class;").astore(2)
+    c.label("superclass").aload(2).ifnull("fields")
+    c.aload(1).bipush(ord("S")).invokevirtual(*_append_char)
+    c.aload(2).invokevirtual(*_get_name).invokevirtual(*_append_string)
+    c.bipush(ord("\n")).invokevirtual(*_append_char).pop()
+    c.aload(2).invokevirtual(CLASS, "getSuperclass", "()Ljava/lang/Class;").astore(2)
+    c.goto("superclass")
+    for tag, getter, member, label, next_label in (
+            ("F", "getFields",       "java/lang/reflect/Field",       "fields",       "methods"),
+            ("M", "getMethods",      METHOD,                          "methods",      "constructors"),
+            ("C", "getConstructors", "java/lang/reflect/Constructor", "constructors", "end")):
+        c.label(label)
+        c.aload(0).invokevirtual(CLASS, getter, "()[L%s;" % member).astore(2)
+        c.iconst_0().istore(3)
+        c.label(label + "_loop").iload(3).aload(2).arraylength().if_icmpge(next_label)
+        c.aload(2).iload(3).aaload().astore(4)
+        c.aload(1).bipush(ord(tag)).invokevirtual(*_append_char)
+        c.aload(4).invokevirtual(member, "getModifiers", "()I").invokevirtual(*_append_int)
+        if tag == "F":
+            c.bipush(ord("\t")).invokevirtual(*_append_char)
+            c.aload(4).invokevirtual(member, "getName", "()Ljava/lang/String;")
+            c.invokevirtual(*_append_string)
+            c.bipush(ord("\t")).invokevirtual(*_append_char)
+            c.aload(4).invokevirtual(member, "getType", "()Ljava/lang/Class;")
+            c.invokevirtual(*_get_name).invokevirtual(*_append_string)
+            c.bipush(ord("\n")).invokevirtual(*_append_char).pop()
+        else:
+            if tag == "M":
+                c.bipush(ord("\t")).invokevirtual(*_append_char)
+                c.aload(4).invokevirtual(member, "getName", "()Ljava/lang/String;")
+                c.invokevirtual(*_append_string)
+                c.bipush(ord("\t")).invokevirtual(*_append_char)
+                c.aload(4).invokevirtual(member, "getReturnType", "()Ljava/lang/Class;")
+                c.invokevirtual(*_get_name).invokevirtual(*_append_string)
+            c.pop()
+            c.aload(1).aload(4).invokevirtual(member, "getParameterTypes", "()[Ljava/lang/Class;")
+            c.invokestatic(name, "appendTypes", "(Ljava/lang/StringBuilder;[Ljava/lang/Class;)V")
+            c.aload(1).bipush(ord("\n")).invokevirtual(*_append_char).pop()
+        c.iinc(3, 1).goto(label + "_loop")
+    c.label("end").aload(1).invokevirtual(*_to_string).areturn()
+    cf.method(ACC_PUBLIC | ACC_STATIC, "describe", "(Ljava/lang/Class;)Ljava/lang/String;", c)
+
+    # public static String locate(Class<?> cls)
+    # locals: 0 cls, 1 sb, 2 types, 3 i, 4 type, 5 location/sup, 6 interfaces, 7 j
+    types = "java/util/ArrayList"
+    c = cf.code(4, 8)
+    c.new(BUILDER).dup().invokespecial(BUILDER, "<init>", "()V").astore(1)
+    c.new(types).dup().invokespecial(types, "<init>", "()V").astore(2)
+    c.aload(2).aload(0).invokevirtual(types, "add", "(Ljava/lang/Object;)Z").pop()
+    c.iconst_0().istore(3)
+    c.label("types").iload(3).aload(2).invokevirtual(types, "size", "()I").if_icmpge("end")
+    c.aload(2).iload(3).invokevirtual(types, "get", "(I)Ljava/lang/Object;").checkcast(CLASS).astore(4)
+    c.aload(4).invokestatic(name, "locateClass", "(Ljava/lang/Class;)Ljava/lang/String;").astore(5)
+    c.aload(5).ifnonnull("located").aconst_null().areturn()
+    c.label("located").aload(1).aload(5).invokevirtual(*_append_string)
+    c.bipush(ord("\n")).invokevirtual(*_append_char).pop()
+    c.aload(4).invokevirtual(CLASS, "getSuperclass", "()Ljava/lang/Class;").astore(5)
+    c.aload(5).ifnull("interfaces")
+    c.aload(2).aload(5).invokevirtual(types, "contains", "(Ljava/lang/Object;)Z").ifne("interfaces")
+    c.aload(2).aload(5).invokevirtual(types, "add", "(Ljava/lang/Object;)Z").pop()
+    c.label("interfaces").aload(4).invokevirtual(CLASS, "getInterfaces", "()[Ljava/lang/Class;").astore(6)
+    c.iconst_0().istore(7)
+    c.label("interface").iload(7).aload(6).arraylength().if_icmpge("next")
+    c.aload(2).aload(6).iload(7).aaload().invokevirtual(types, "contains", "(Ljava/lang/Object;)Z")
+    c.ifne("next_interface")
+    c.aload(2).aload(6).iload(7).aaload().invokevirtual(types, "add", "(Ljava/lang/Object;)Z").pop()
+    c.label("next_interface").iinc(7, 1).goto("interface")
+    c.label("next").iinc(3, 1).goto("types")
+    c.label("end").aload(1).invokevirtual(*_to_string).areturn()
+    cf.method(ACC_PUBLIC | ACC_STATIC, "locate", "(Ljava/lang/Class;)Ljava/lang/String;", c)
+
+    # private static String locateClass(Class<?> cls)
+    # locals: 0 cls, 1 url, 2 location
+    c = cf.code(6, 3)
+    c.aload(0)
+    c.new(BUILDER).dup().invokespecial(BUILDER, "<init>", "()V")
+    c.ldc("/").invokevirtual(*_append_string)
+    c.aload(0).invokevirtual(*_get_name)
+    c.bipush(ord(".")).bipush(ord("/")).invokevirtual(STRING, "replace", "(CC)Ljava/lang/String;")
+    c.invokevirtual(*_append_string).ldc(".class").invokevirtual(*_append_string)
+    c.invokevirtual(*_to_string)
+    c.invokevirtual(CLASS, "getResource", "(Ljava/lang/String;)Ljava/net/URL;").astore(1)
+    c.aload(1).ifnonnull("found").aconst_null().areturn()
+    c.label("found").aload(1).invokevirtual("java/net/URL", "toString", "()Ljava/lang/String;").astore(2)
+    c.aload(2).ldc("jrt:").invokevirtual(STRING, "startsWith", "(Ljava/lang/String;)Z").ifeq("other")
+    c.new(BUILDER).dup().invokespecial(BUILDER, "<init>", "()V")
+    c.ldc("jrt:").invokevirtual(*_append_string)
+    c.ldc("java.home").invokestatic("java/lang/System", "getProperty", "(Ljava/lang/String;)Ljava/lang/String;")
+    c.invokevirtual(*_append_string).invokevirtual(*_to_string).areturn()
+    c.label("other").aload(2).areturn()
+    cf.method(ACC_PRIVATE | ACC_STATIC, "locateClass", "(Ljava/lang/Class;)Ljava/lang/String;", c)
+
+    # private static void appendTypes(StringBuilder sb, Class<?>[] types)
+    c = cf.code(3, 3)
+    c.iconst_0().istore(2)
+    c.label("types").iload(2).aload(1).arraylength().if_icmpge("end")
+    c.aload(0).bipush(ord("\t")).invokevirtual(*_append_char)
+    c.aload(1).iload(2).aaload().invokevirtual(*_get_name).invokevirtual(*_append_string).pop()
+    c.iinc(2, 1).goto("types")
+    c.label("end").return_()
+    cf.method(ACC_PRIVATE | ACC_STATIC, "appendTypes",
+              "(Ljava/lang/StringBuilder;[Ljava/lang/Class;)V", c)
+
+    return cf.to_bytes()
+
+
+def batching_handler():
+
+    name = "org/pybee/rubicon/BatchingHandler"
+    objects = "[Ljava/lang/Object;"
+    cf = ClassFile(name, interfaces=("java/lang/reflect/InvocationHandler", "java/lang/Runnable"),
+                   access=ACC_PUBLIC | ACC_FINAL | ACC_SUPER)
+    cf.field(ACC_PRIVATE | ACC_FINAL, "target",    "J")
+    cf.field(ACC_PRIVATE | ACC_FINAL, "interval",  "J")
+    cf.field(ACC_PRIVATE | ACC_FINAL, "methods",   objects)
+    cf.field(ACC_PRIVATE | ACC_FINAL, "arguments", objects)
+    cf.field(ACC_PRIVATE, "count",  "I")
+    cf.field(ACC_PRIVATE, "closed", "Z")
+    cf.field(ACC_PRIVATE, "thread", "Ljava/lang/Thread;")
+
+    # public BatchingHandler(long target, int size, long interval)
+    c = cf.code(5, 6)
+    c.aload(0).invokespecial(OBJECT, "<init>", "()V")
+    c.aload(0).lload(1).putfield(name, "target", "J")
+    c.aload(0).lload(4).putfield(name, "interval", "J")
+    c.aload(0).iload(3).anewarray(OBJECT).putfield(name, "methods", objects)
+    c.aload(0).iload(3).anewarray(OBJECT).putfield(name, "arguments", objects)
+    c.lload(4).lconst_0().lcmp().ifle("end")
+    c.aload(0).new(THREAD).dup().aload(0).ldc("rubicon-batching")
+    c.invokespecial(THREAD, "<init>", "(Ljava/lang/Runnable;Ljava/lang/String;)V")
+    c.putfield(name, "thread", "Ljava/lang/Thread;")
+    c.aload(0).getfield(name, "thread", "Ljava/lang/Thread;")
+    c.iconst_1().invokevirtual(THREAD, "setDaemon", "(Z)V")
+    c.aload(0).getfield(name, "thread", "Ljava/lang/Thread;").invokevirtual(THREAD, "start", "()V")
+    c.label("end").return_()
+    cf.method(ACC_PUBLIC, "<init>", "(JIJ)V", c)
+
+    # public Object invoke(Object proxy, Method method, Object[] args)
+    equals = (STRING, "equals", "(Ljava/lang/Object;)Z")
+    c = cf.code(3, 4)
+    c.aload(2).invokevirtual(METHOD, "getDeclaringClass", "()Ljava/lang/Class;")
+    c.class_literal(OBJECT).if_acmpne("event")
+    c.aload(2).invokevirtual(METHOD, "getName", "()Ljava/lang/String;")
+    c.ldc("equals").invokevirtual(*equals).ifeq("hashCode")
+    c.aload(1).aload(3).iconst_0().aaload().if_acmpne("false")
+    c.iconst_1().invokestatic("java/lang/Boolean", "valueOf", "(Z)Ljava/lang/Boolean;").areturn()
+    c.label("false")
+    c.iconst_0().invokestatic("java/lang/Boolean", "valueOf", "(Z)Ljava/lang/Boolean;").areturn()
+    c.label("hashCode")
+    c.aload(2).invokevirtual(METHOD, "getName", "()Ljava/lang/String;")
+    c.ldc("hashCode").invokevirtual(*equals).ifeq("toString")
+    c.aload(1).invokestatic("java/lang/System", "identityHashCode", "(Ljava/lang/Object;)I")
+    c.invokestatic("java/lang/Integer", "valueOf", "(I)Ljava/lang/Integer;").areturn()
+    c.label("toString").aload(0).invokespecial(OBJECT, "toString", "()Ljava/lang/String;").areturn()
+    c.label("event").aload(0).aload(2).aload(3)
+    c.invokevirtual(name, "add", "(Ljava/lang/Object;[Ljava/lang/Object;)V")
+    c.aconst_null().areturn()
+    cf.method(ACC_PUBLIC, "invoke",
+              "(Ljava/lang/Object;Ljava/lang/reflect/Method;[Ljava/lang/Object;)Ljava/lang/Object;", c)
+
+    # private synchronized void add(Object method, Object[] args)
+    c = cf.code(4, 3)
+    c.aload(0).getfield(name, "closed", "Z").ifne("end")
+    c.aload(0).getfield(name, "methods", objects).aload(0).getfield(name, "count", "I")
+    c.aload(1).aastore()
+    c.aload(0).getfield(name, "arguments", objects).aload(0).getfield(name, "count", "I")
+    c.aload(2).aastore()
+    c.aload(0).dup().getfield(name, "count", "I").iconst_1().iadd().putfield(name, "count", "I")
+    c.aload(0).getfield(name, "count", "I")
+    c.aload(0).getfield(name, "methods", objects).arraylength().if_icmplt("end")
+    c.aload(0).invokevirtual(name, "flush", "()V")
+    c.label("end").return_()
+    cf.method(ACC_PRIVATE | ACC_SYNCHRONIZED, "add", "(Ljava/lang/Object;[Ljava/lang/Object;)V", c)
+
+    # public synchronized void flush()
+    c = cf.code(5, 1)
+    c.aload(0).getfield(name, "closed", "Z").ifne("end")
+    c.aload(0).getfield(name, "count", "I").ifle("end")
+    c.aload(0).getfield(name, "target", "J").aload(0).getfield(name, "methods", objects)
+    c.aload(0).getfield(name, "arguments", objects).aload(0).getfield(name, "count", "I")
+    c.invokestatic(name, "deliver", "(J[Ljava/lang/Object;[Ljava/lang/Object;I)V")
+    for field in ("methods", "arguments"):
+        c.aload(0).getfield(name, field, objects).iconst_0()
+        c.aload(0).getfield(name, "count", "I").aconst_null()
+        c.invokestatic("java/util/Arrays", "fill", "([Ljava/lang/Object;IILjava/lang/Object;)V")
+    c.aload(0).iconst_0().putfield(name, "count", "I")
+    c.label("end").return_()
+    cf.method(ACC_PUBLIC | ACC_SYNCHRONIZED, "flush", "()V", c)
+
+    # public void run()
+    c = cf.code(2, 1)
+    c.label("loop").aload(0).getfield(name, "interval", "J").invokestatic(THREAD, "sleep", "(J)V")
+    c.aload(0).invokevirtual(name, "flush", "()V").goto("loop")
+    c.label("interrupted").pop().return_()
+    c.handler("loop", "interrupted", "interrupted", "java/lang/InterruptedException")
+    cf.method(ACC_PUBLIC, "run", "()V", c)
+
+    # public synchronized void close()
+    c = cf.code(2, 2)
+    c.aload(0).getfield(name, "thread", "Ljava/lang/Thread;").ifnull("flush")
+    c.aload(0).getfield(name, "thread", "Ljava/lang/Thread;").invokevirtual(THREAD, "interrupt", "()V")
+    c.label("flush").aload(0).invokevirtual(name, "flush", "()V")
+    c.label("flushed").aload(0).iconst_1().putfield(name, "closed", "Z").return_()
+    c.label("finally").astore(1).aload(0).iconst_1().putfield(name, "closed", "Z").aload(1).athrow()
+    c.handler("flush", "flushed", "finally")
+    cf.method(ACC_PUBLIC | ACC_SYNCHRONIZED, "close", "()V", c)
+
+    # private static native void deliver(long target, Object[] methods, Object[] arguments, int count)
+    cf.method(ACC_PRIVATE | ACC_STATIC | ACC_NATIVE, "deliver",
+              "(J[Ljava/lang/Object;[Ljava/lang/Object;I)V")
+
+    return cf.to_bytes()
+
+
+classes = {
+    "org/pybee/rubicon/Introspector":     introspector,
+    "org/pybee/rubicon/BatchingHandler":  batching_handler,
+}
+
+_javacode = re.compile(r"(__javacode__ = bytearray\(  # Auto-generated; DO NOT EDIT!\n)"
+                       r"(.*?)(^\))", re.DOTALL | re.MULTILINE)
+
+
+def javacode(data):
+    """The lines of the __javacode__ literal of a class file"""
+    return "".join('    b"%s"\n' % "".join("\\x%02x" % byte for byte in data[i:i + 20])
+                   for i in range(0, len(data), 20))
+
+
+def classgen(class_name, check=False):
+    """Embed (or with check, compare) the class file of a class in its module.
+
+    Returns True if the module is (or was) up to date.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        *class_name.split("/")) + ".py"
+    with open(path, "r") as f:
+        source = f.read()
+    literal = javacode(classes[class_name]())
+    match = _javacode.search(source)
+    if match.group(2) == literal:
+        return True
+    if not check:
+        with open(path, "w") as f:
+            f.write(source[:match.start(2)] + literal + source[match.end(2):])
+    return False
+
+
+if __name__ == "__main__":
+    check = "--check" in sys.argv[1:]
+    class_names = [arg.replace("\\", "/") for arg in sys.argv[1:] if arg != "--check"]
+    up_to_date = True
+    for class_name in class_names or sorted(classes):
+        up_to_date &= classgen(class_name, check)
+    sys.exit(0 if up_to_date or not check else 1)
@@ -28,3 +28,42 @@ class rubicon_Python(jnij):
 
         from .org.pybee.rubicon import Python
         registerClass(jenv, "org.pybee.rubicon.Python", Python)
+
+class rubicon_Introspector(jnij):
+
+    @annotate(jenv=jni.JNIEnv)
+    def initialize(self, jenv):
+
+        from .org.pybee.rubicon import Introspector
+        registerClass(jenv, "org.pybee.rubicon.Introspector", Introspector)
+        self.Class    = jni.cast(jenv.NewGlobalRef(
+                                 jenv.FindClass(b"org/pybee/rubicon/Introspector")), jni.jclass)
+        self.describe = jenv.GetStaticMethodID(self.Class, b"describe",
+                                               b"(Ljava/lang/Class;)Ljava/lang/String;")
+        self.locate   = jenv.GetStaticMethodID(self.Class, b"locate",
+                                               b"(Ljava/lang/Class;)Ljava/lang/String;")
+
+    @annotate(jenv=jni.JNIEnv)
+    def dispose(self, jenv):
+
+        jenv.DeleteGlobalRef(self.Class)
+        self.Class = self.describe = self.locate = None
+
+class rubicon_BatchingHandler(jnij):
+
+    @annotate(jenv=jni.JNIEnv)
+    def initialize(self, jenv):
+
+        from .org.pybee.rubicon import BatchingHandler
+        registerClass(jenv, "org.pybee.rubicon.BatchingHandler", BatchingHandler)
+        self.Class       = jni.cast(jenv.NewGlobalRef(
+                                    jenv.FindClass(b"org/pybee/rubicon/BatchingHandler")), jni.jclass)
+        self.Constructor = jenv.GetMethodID(self.Class, b"<init>", b"(JIJ)V")
+        self.flush       = jenv.GetMethodID(self.Class, b"flush", b"()V")
+        self.close       = jenv.GetMethodID(self.Class, b"close", b"()V")
+
+    @annotate(jenv=jni.JNIEnv)
+    def dispose(self, jenv):
+
+        jenv.DeleteGlobalRef(self.Class)
+        self.Class = self.Constructor = self.flush = self.close = None
@@ -0,0 +1,115 @@
+// Copyright (c) 2016-2019, Adam Karpierz
+// Licensed under the BSD license
+// http://opensource.org/licenses/BSD-3-Clause
+
+package org.pybee.rubicon;
+
+import java.lang.reflect.InvocationHandler;
+import java.lang.reflect.Method;
+import java.util.Arrays;
+
+// The class file embedded in BatchingHandler.py is generated from this source,
+// statement by statement, by _java/classgen.py; keep them in step.
+//
+public final class BatchingHandler implements InvocationHandler, Runnable
+{
+    private final long target;
+    private final long interval;
+    private final Object[] methods;
+    private final Object[] arguments;
+    private int count;
+    private boolean closed;
+    private Thread thread;
+
+    // Create the invocation handler of a listener proxy, which buffers the
+    // events (invocations) and delivers them to the Python adapter in batches.
+    //
+    // @param target   The ID of the Python adapter
+    // @param size     The number of events which triggers a delivery
+    // @param interval The period (in milliseconds) of the deliveries of the
+    //                 pending events, or 0 to deliver them only by size
+    //
+    public BatchingHandler(long target, int size, long interval)
+    {
+        this.target    = target;
+        this.interval  = interval;
+        this.methods   = new Object[size];
+        this.arguments = new Object[size];
+        if (interval > 0)
+        {
+            this.thread = new Thread(this, "rubicon-batching");
+            this.thread.setDaemon(true);
+            this.thread.start();
+        }
+    }
+
+    public Object invoke(Object proxy, Method method, Object[] args)
+    {
+        if (method.getDeclaringClass() == Object.class)
+        {
+            if (method.getName().equals("equals"))
+                return Boolean.valueOf(proxy == args[0]);
+            if (method.getName().equals("hashCode"))
+                return Integer.valueOf(System.identityHashCode(proxy));
+            return super.toString();
+        }
+        add(method, args);
+        return null;
+    }
+
+    private synchronized void add(Object method, Object[] args)
+    {
+        if (closed)
+            return;
+        methods[count]   = method;
+        arguments[count] = args;
+        count++;
+        if (count >= methods.length)
+            flush();
+    }
+
+    // Deliver the pending events (none once closed).
+    //
+    public synchronized void flush()
+    {
+        if (!closed && count > 0)
+        {
+            deliver(target, methods, arguments, count);
+            Arrays.fill(methods,   0, count, null);
+            Arrays.fill(arguments, 0, count, null);
+            count = 0;
+        }
+    }
+
+    public void run()
+    {
+        try
+        {
+            for (;;)
+            {
+                Thread.sleep(interval);
+                flush();
+            }
+        }
+        catch (InterruptedException exc) {}
+    }
+
+    // Stop the periodic deliveries and deliver the pending events; the
+    // events of the listener are dropped afterwards.
+    //
+    public synchronized void close()
+    {
+        if (thread != null)
+            thread.interrupt();
+        try
+        {
+            flush();
+        }
+        finally
+        {
+            closed = true;
+        }
+    }
+
+    private static native void deliver(long target, Object[] methods, Object[] arguments, int count);
+}
@@ -0,0 +1,137 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+from __future__ import absolute_import
+
+import traceback
+
+from ...... import jni
+from ......jvm.jhost import JHost
+
+from .....java._jbatching import deliver_batch
+
+
+# Class: org.pybee.rubicon.BatchingHandler
+
+# Method: native static void deliver(long target, Object[] methods, Object[] arguments, int count);
+
+@jni.method("(J[Ljava/lang/Object;[Ljava/lang/Object;I)V")
+def deliver(env, cls,
+            target, jmethods, jarguments, count):
+
+    # Deliver a batch of events (the invoked Methods and their boxed
+    # arguments) buffered by the handler to its Python adapter. It may run on
+    # the delivery thread of the handler, so it uses that thread's env.
+
+    jenv = env[0]
+    try:
+        with JHost.CallbackState():
+            deliver_batch(target, jmethods, jarguments, count, jenv)
+    except Exception as exc:
+        traceback.print_exc()
+
+
+__jnimethods__ = (
+    deliver,
+)
+
+__javacode__ = bytearray(  # Auto-generated; DO NOT EDIT!
+    b"\xca\xfe\xba\xbe\x00\x00\x00\x31\x00\x7c\x01\x00\x21\x6f\x72\x67\x2f\x70\x79\x62"
+    b"\x65\x65\x2f\x72\x75\x62\x69\x63\x6f\x6e\x2f\x42\x61\x74\x63\x68\x69\x6e\x67\x48"
+    b"\x61\x6e\x64\x6c\x65\x72\x07\x00\x01\x01\x00\x10\x6a\x61\x76\x61\x2f\x6c\x61\x6e"
+    b"\x67\x2f\x4f\x62\x6a\x65\x63\x74\x07\x00\x03\x01\x00\x23\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x49\x6e\x76\x6f\x63\x61\x74\x69"
+    b"\x6f\x6e\x48\x61\x6e\x64\x6c\x65\x72\x07\x00\x05\x01\x00\x12\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x52\x75\x6e\x6e\x61\x62\x6c\x65\x07\x00\x07\x01\x00\x06\x74"
+    b"\x61\x72\x67\x65\x74\x01\x00\x01\x4a\x01\x00\x08\x69\x6e\x74\x65\x72\x76\x61\x6c"
+    b"\x01\x00\x07\x6d\x65\x74\x68\x6f\x64\x73\x01\x00\x13\x5b\x4c\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x01\x00\x09\x61\x72\x67\x75\x6d"
+    b"\x65\x6e\x74\x73\x01\x00\x05\x63\x6f\x75\x6e\x74\x01\x00\x01\x49\x01\x00\x06\x63"
+    b"\x6c\x6f\x73\x65\x64\x01\x00\x01\x5a\x01\x00\x06\x74\x68\x72\x65\x61\x64\x01\x00"
+    b"\x12\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x54\x68\x72\x65\x61\x64\x3b\x01"
+    b"\x00\x06\x3c\x69\x6e\x69\x74\x3e\x01\x00\x03\x28\x29\x56\x0c\x00\x15\x00\x16\x0a"
+    b"\x00\x04\x00\x17\x0c\x00\x09\x00\x0a\x09\x00\x02\x00\x19\x0c\x00\x0b\x00\x0a\x09"
+    b"\x00\x02\x00\x1b\x0c\x00\x0c\x00\x0d\x09\x00\x02\x00\x1d\x0c\x00\x0e\x00\x0d\x09"
+    b"\x00\x02\x00\x1f\x01\x00\x10\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x54\x68\x72"
+    b"\x65\x61\x64\x07\x00\x21\x01\x00\x10\x72\x75\x62\x69\x63\x6f\x6e\x2d\x62\x61\x74"
+    b"\x63\x68\x69\x6e\x67\x08\x00\x23\x01\x00\x29\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x52\x75\x6e\x6e\x61\x62\x6c\x65\x3b\x4c\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x29\x56\x0c\x00\x15\x00\x25\x0a\x00\x22"
+    b"\x00\x26\x0c\x00\x13\x00\x14\x09\x00\x02\x00\x28\x01\x00\x09\x73\x65\x74\x44\x61"
+    b"\x65\x6d\x6f\x6e\x01\x00\x04\x28\x5a\x29\x56\x0c\x00\x2a\x00\x2b\x0a\x00\x22\x00"
+    b"\x2c\x01\x00\x05\x73\x74\x61\x72\x74\x0c\x00\x2e\x00\x16\x0a\x00\x22\x00\x2f\x01"
+    b"\x00\x04\x43\x6f\x64\x65\x01\x00\x06\x28\x4a\x49\x4a\x29\x56\x01\x00\x18\x6a\x61"
+    b"\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x4d\x65\x74\x68"
+    b"\x6f\x64\x07\x00\x33\x01\x00\x11\x67\x65\x74\x44\x65\x63\x6c\x61\x72\x69\x6e\x67"
+    b"\x43\x6c\x61\x73\x73\x01\x00\x13\x28\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67"
+    b"\x2f\x43\x6c\x61\x73\x73\x3b\x0c\x00\x35\x00\x36\x0a\x00\x34\x00\x37\x01\x00\x07"
+    b"\x67\x65\x74\x4e\x61\x6d\x65\x01\x00\x14\x28\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x0c\x00\x39\x00\x3a\x0a\x00\x34\x00\x3b"
+    b"\x01\x00\x06\x65\x71\x75\x61\x6c\x73\x08\x00\x3d\x01\x00\x10\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x07\x00\x3f\x01\x00\x15\x28\x4c\x6a"
+    b"\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x29\x5a\x0c\x00"
+    b"\x3d\x00\x41\x0a\x00\x40\x00\x42\x01\x00\x11\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67"
+    b"\x2f\x42\x6f\x6f\x6c\x65\x61\x6e\x07\x00\x44\x01\x00\x07\x76\x61\x6c\x75\x65\x4f"
+    b"\x66\x01\x00\x16\x28\x5a\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x42\x6f"
+    b"\x6f\x6c\x65\x61\x6e\x3b\x0c\x00\x46\x00\x47\x0a\x00\x45\x00\x48\x01\x00\x08\x68"
+    b"\x61\x73\x68\x43\x6f\x64\x65\x08\x00\x4a\x01\x00\x10\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x53\x79\x73\x74\x65\x6d\x07\x00\x4c\x01\x00\x10\x69\x64\x65\x6e\x74"
+    b"\x69\x74\x79\x48\x61\x73\x68\x43\x6f\x64\x65\x01\x00\x15\x28\x4c\x6a\x61\x76\x61"
+    b"\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x29\x49\x0c\x00\x4e\x00\x4f"
+    b"\x0a\x00\x4d\x00\x50\x01\x00\x11\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x49\x6e"
+    b"\x74\x65\x67\x65\x72\x07\x00\x52\x01\x00\x16\x28\x49\x29\x4c\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x49\x6e\x74\x65\x67\x65\x72\x3b\x0c\x00\x46\x00\x54\x0a\x00"
+    b"\x53\x00\x55\x01\x00\x08\x74\x6f\x53\x74\x72\x69\x6e\x67\x0c\x00\x57\x00\x3a\x0a"
+    b"\x00\x04\x00\x58\x01\x00\x03\x61\x64\x64\x01\x00\x28\x28\x4c\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x5b\x4c\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x29\x56\x0c\x00\x5a\x00\x5b\x0a\x00"
+    b"\x02\x00\x5c\x01\x00\x06\x69\x6e\x76\x6f\x6b\x65\x01\x00\x53\x28\x4c\x6a\x61\x76"
+    b"\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x4c\x6a\x61\x76\x61\x2f"
+    b"\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x4d\x65\x74\x68\x6f\x64\x3b"
+    b"\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x29"
+    b"\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x0c\x00"
+    b"\x11\x00\x12\x09\x00\x02\x00\x60\x0c\x00\x0f\x00\x10\x09\x00\x02\x00\x62\x01\x00"
+    b"\x05\x66\x6c\x75\x73\x68\x0c\x00\x64\x00\x16\x0a\x00\x02\x00\x65\x01\x00\x07\x64"
+    b"\x65\x6c\x69\x76\x65\x72\x01\x00\x2b\x28\x4a\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e"
+    b"\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x49\x29\x56\x0c\x00\x67\x00\x68\x0a\x00\x02"
+    b"\x00\x69\x01\x00\x10\x6a\x61\x76\x61\x2f\x75\x74\x69\x6c\x2f\x41\x72\x72\x61\x79"
+    b"\x73\x07\x00\x6b\x01\x00\x04\x66\x69\x6c\x6c\x01\x00\x2a\x28\x5b\x4c\x6a\x61\x76"
+    b"\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x49\x49\x4c\x6a\x61\x76"
+    b"\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62\x6a\x65\x63\x74\x3b\x29\x56\x0c\x00\x6d\x00"
+    b"\x6e\x0a\x00\x6c\x00\x6f\x01\x00\x05\x73\x6c\x65\x65\x70\x01\x00\x04\x28\x4a\x29"
+    b"\x56\x0c\x00\x71\x00\x72\x0a\x00\x22\x00\x73\x01\x00\x1e\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x49\x6e\x74\x65\x72\x72\x75\x70\x74\x65\x64\x45\x78\x63\x65\x70"
+    b"\x74\x69\x6f\x6e\x07\x00\x75\x01\x00\x03\x72\x75\x6e\x01\x00\x09\x69\x6e\x74\x65"
+    b"\x72\x72\x75\x70\x74\x0c\x00\x78\x00\x16\x0a\x00\x22\x00\x79\x01\x00\x05\x63\x6c"
+    b"\x6f\x73\x65\x00\x31\x00\x02\x00\x04\x00\x02\x00\x06\x00\x08\x00\x07\x00\x12\x00"
+    b"\x09\x00\x0a\x00\x00\x00\x12\x00\x0b\x00\x0a\x00\x00\x00\x12\x00\x0c\x00\x0d\x00"
+    b"\x00\x00\x12\x00\x0e\x00\x0d\x00\x00\x00\x02\x00\x0f\x00\x10\x00\x00\x00\x02\x00"
+    b"\x11\x00\x12\x00\x00\x00\x02\x00\x13\x00\x14\x00\x00\x00\x07\x00\x01\x00\x15\x00"
+    b"\x32\x00\x01\x00\x31\x00\x00\x00\x50\x00\x05\x00\x06\x00\x00\x00\x44\x2a\xb7\x00"
+    b"\x18\x2a\x1f\xb5\x00\x1a\x2a\x16\x04\xb5\x00\x1c\x2a\x1d\xbd\x00\x04\xb5\x00\x1e"
+    b"\x2a\x1d\xbd\x00\x04\xb5\x00\x20\x16\x04\x09\x94\x9e\x00\x20\x2a\xbb\x00\x22\x59"
+    b"\x2a\x12\x24\xb7\x00\x27\xb5\x00\x29\x2a\xb4\x00\x29\x04\xb6\x00\x2d\x2a\xb4\x00"
+    b"\x29\xb6\x00\x30\xb1\x00\x00\x00\x00\x00\x01\x00\x5e\x00\x5f\x00\x01\x00\x31\x00"
+    b"\x00\x00\x53\x00\x03\x00\x04\x00\x00\x00\x47\x2c\xb6\x00\x38\x12\x04\xa6\x00\x39"
+    b"\x2c\xb6\x00\x3c\x12\x3e\xb6\x00\x43\x99\x00\x14\x2b\x2d\x03\x32\xa6\x00\x08\x04"
+    b"\xb8\x00\x49\xb0\x03\xb8\x00\x49\xb0\x2c\xb6\x00\x3c\x12\x4b\xb6\x00\x43\x99\x00"
+    b"\x0b\x2b\xb8\x00\x51\xb8\x00\x56\xb0\x2a\xb7\x00\x59\xb0\x2a\x2c\x2d\xb6\x00\x5d"
+    b"\x01\xb0\x00\x00\x00\x00\x00\x22\x00\x5a\x00\x5b\x00\x01\x00\x31\x00\x00\x00\x42"
+    b"\x00\x04\x00\x03\x00\x00\x00\x36\x2a\xb4\x00\x61\x9a\x00\x31\x2a\xb4\x00\x1e\x2a"
+    b"\xb4\x00\x63\x2b\x53\x2a\xb4\x00\x20\x2a\xb4\x00\x63\x2c\x53\x2a\x59\xb4\x00\x63"
+    b"\x04\x60\xb5\x00\x63\x2a\xb4\x00\x63\x2a\xb4\x00\x1e\xbe\xa1\x00\x07\x2a\xb6\x00"
+    b"\x66\xb1\x00\x00\x00\x00\x00\x21\x00\x64\x00\x16\x00\x01\x00\x31\x00\x00\x00\x4d"
+    b"\x00\x05\x00\x01\x00\x00\x00\x41\x2a\xb4\x00\x61\x9a\x00\x3c\x2a\xb4\x00\x63\x9e"
+    b"\x00\x35\x2a\xb4\x00\x1a\x2a\xb4\x00\x1e\x2a\xb4\x00\x20\x2a\xb4\x00\x63\xb8\x00"
+    b"\x6a\x2a\xb4\x00\x1e\x03\x2a\xb4\x00\x63\x01\xb8\x00\x70\x2a\xb4\x00\x20\x03\x2a"
+    b"\xb4\x00\x63\x01\xb8\x00\x70\x2a\x03\xb5\x00\x63\xb1\x00\x00\x00\x00\x00\x01\x00"
+    b"\x77\x00\x16\x00\x01\x00\x31\x00\x00\x00\x24\x00\x02\x00\x01\x00\x00\x00\x10\x2a"
+    b"\xb4\x00\x1c\xb8\x00\x74\x2a\xb6\x00\x66\xa7\xff\xf5\x57\xb1\x00\x01\x00\x00\x00"
+    b"\x0e\x00\x0e\x00\x76\x00\x00\x00\x21\x00\x7b\x00\x16\x00\x01\x00\x31\x00\x00\x00"
+    b"\x34\x00\x02\x00\x02\x00\x00\x00\x20\x2a\xb4\x00\x29\xc6\x00\x0a\x2a\xb4\x00\x29"
+    b"\xb6\x00\x7a\x2a\xb6\x00\x66\x2a\x04\xb5\x00\x61\xb1\x4c\x2a\x04\xb5\x00\x61\x2b"
+    b"\xbf\x00\x01\x00\x0e\x00\x12\x00\x18\x00\x00\x00\x00\x01\x0a\x00\x67\x00\x68\x00"
+    b"\x00\x00\x00"
+)
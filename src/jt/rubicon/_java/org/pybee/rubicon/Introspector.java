@@ -0,0 +1,134 @@
+// Copyright (c) 2016-2019, Adam Karpierz
+// Licensed under the BSD license
+// http://opensource.org/licenses/BSD-3-Clause
+
+package org.pybee.rubicon;
+
+import java.lang.reflect.Constructor;
+import java.lang.reflect.Field;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.util.ArrayList;
+
+// The class file embedded in Introspector.py is generated from this source,
+// statement by statement, by _java/classgen.py; keep them in step.
+//
+public final class Introspector
+{
+    private Introspector() {}
+
+    // Describe the public members of a class.
+    //
+    // The description is packed in a single string, so that the whole class
+    // can be introspected with one JNI call. It consists of one record per
+    // line; the first character of a record is its tag, and the remaining
+    // tab-separated items are:
+    //
+    //   I<interface name>                               (direct interfaces)
+    //   S<superclass name>                              (superclasses, nearest first)
+    //   F<modifiers> <name> <type name>                 (public fields)
+    //   M<modifiers> <name> <return type name> [<parameter type name> ...]
+    //                                                   (public methods)
+    //   C<modifiers> [<parameter type name> ...]        (public constructors)
+    //
+    // Names are the ones returned by Class.getName().
+    //
+    // @param cls The class to describe
+    // @return The packed description of the class.
+    //
+    public static String describe(Class<?> cls)
+    {
+        StringBuilder sb = new StringBuilder();
+
+        Class<?>[] interfaces = cls.getInterfaces();
+        for (int i = 0; i < interfaces.length; i++)
+            sb.append('I').append(interfaces[i].getName()).append('\n');
+
+        for (Class<?> sup = cls.getSuperclass(); sup != null; sup = sup.getSuperclass())
+            sb.append('S').append(sup.getName()).append('\n');
+
+        Field[] fields = cls.getFields();
+        for (int i = 0; i < fields.length; i++)
+        {
+            Field field = fields[i];
+            sb.append('F').append(field.getModifiers())
+              .append('\t').append(field.getName())
+              .append('\t').append(field.getType().getName()).append('\n');
+        }
+
+        Method[] methods = cls.getMethods();
+        for (int i = 0; i < methods.length; i++)
+        {
+            Method method = methods[i];
+            sb.append('M').append(method.getModifiers())
+              .append('\t').append(method.getName())
+              .append('\t').append(method.getReturnType().getName());
+            appendTypes(sb, method.getParameterTypes());
+            sb.append('\n');
+        }
+
+        Constructor<?>[] constructors = cls.getConstructors();
+        for (int i = 0; i < constructors.length; i++)
+        {
+            Constructor<?> constructor = constructors[i];
+            sb.append('C').append(constructor.getModifiers());
+            appendTypes(sb, constructor.getParameterTypes());
+            sb.append('\n');
+        }
+
+        return sb.toString();
+    }
+
+    // Locate the class files a description is made from: the ones of a class
+    // and of all its superclasses and (direct or inherited) interfaces.
+    //
+    // @param cls The class to locate
+    // @return The URLs of the class files, one per line, as returned by
+    //         Class.getResource(); for the classes of the Java runtime image
+    //         (jrt: URLs) it is "jrt:" followed by the Java home directory.
+    //         null if a class file can't be found (e.g. for classes defined
+    //         at runtime).
+    //
+    public static String locate(Class<?> cls)
+    {
+        StringBuilder sb = new StringBuilder();
+
+        ArrayList<Class<?>> types = new ArrayList<Class<?>>();
+        types.add(cls);
+        for (int i = 0; i < types.size(); i++)
+        {
+            Class<?> type = types.get(i);
+            String location = locateClass(type);
+            if (location == null)
+                return null;
+            sb.append(location).append('\n');
+
+            Class<?> sup = type.getSuperclass();
+            if (sup != null && !types.contains(sup))
+                types.add(sup);
+            Class<?>[] interfaces = type.getInterfaces();
+            for (int j = 0; j < interfaces.length; j++)
+                if (!types.contains(interfaces[j]))
+                    types.add(interfaces[j]);
+        }
+
+        return sb.toString();
+    }
+
+    private static String locateClass(Class<?> cls)
+    {
+        URL url = cls.getResource("/" + cls.getName().replace('.', '/') + ".class");
+        if (url == null)
+            return null;
+        String location = url.toString();
+        if (location.startsWith("jrt:"))
+            return "jrt:" + System.getProperty("java.home");
+        return location;
+    }
+
+    private static void appendTypes(StringBuilder sb, Class<?>[] types)
+    {
+        for (int i = 0; i < types.length; i++)
+            sb.append('\t').append(types[i].getName());
+    }
+}
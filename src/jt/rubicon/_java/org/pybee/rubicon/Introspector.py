@@ -0,0 +1,128 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+from __future__ import absolute_import
+
+
+# Class: org.pybee.rubicon.Introspector
+
+# Method: static String describe(Class<?> cls);
+# Method: static String locate(Class<?> cls);
+
+__jnimethods__ = (
+)
+
+__javacode__ = bytearray(  # Auto-generated; DO NOT EDIT!
+    b"\xca\xfe\xba\xbe\x00\x00\x00\x31\x00\x86\x01\x00\x1e\x6f\x72\x67\x2f\x70\x79\x62"
+    b"\x65\x65\x2f\x72\x75\x62\x69\x63\x6f\x6e\x2f\x49\x6e\x74\x72\x6f\x73\x70\x65\x63"
+    b"\x74\x6f\x72\x07\x00\x01\x01\x00\x10\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f"
+    b"\x62\x6a\x65\x63\x74\x07\x00\x03\x01\x00\x06\x3c\x69\x6e\x69\x74\x3e\x01\x00\x03"
+    b"\x28\x29\x56\x0c\x00\x05\x00\x06\x0a\x00\x04\x00\x07\x01\x00\x04\x43\x6f\x64\x65"
+    b"\x01\x00\x17\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x42"
+    b"\x75\x69\x6c\x64\x65\x72\x07\x00\x0a\x0a\x00\x0b\x00\x07\x01\x00\x0f\x6a\x61\x76"
+    b"\x61\x2f\x6c\x61\x6e\x67\x2f\x43\x6c\x61\x73\x73\x07\x00\x0d\x01\x00\x0d\x67\x65"
+    b"\x74\x49\x6e\x74\x65\x72\x66\x61\x63\x65\x73\x01\x00\x14\x28\x29\x5b\x4c\x6a\x61"
+    b"\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x43\x6c\x61\x73\x73\x3b\x0c\x00\x0f\x00\x10\x0a"
+    b"\x00\x0e\x00\x11\x01\x00\x06\x61\x70\x70\x65\x6e\x64\x01\x00\x1c\x28\x43\x29\x4c"
+    b"\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x42\x75\x69\x6c"
+    b"\x64\x65\x72\x3b\x0c\x00\x13\x00\x14\x0a\x00\x0b\x00\x15\x01\x00\x07\x67\x65\x74"
+    b"\x4e\x61\x6d\x65\x01\x00\x14\x28\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f"
+    b"\x53\x74\x72\x69\x6e\x67\x3b\x0c\x00\x17\x00\x18\x0a\x00\x0e\x00\x19\x01\x00\x2d"
+    b"\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x29"
+    b"\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x42\x75\x69"
+    b"\x6c\x64\x65\x72\x3b\x0c\x00\x13\x00\x1b\x0a\x00\x0b\x00\x1c\x01\x00\x0d\x67\x65"
+    b"\x74\x53\x75\x70\x65\x72\x63\x6c\x61\x73\x73\x01\x00\x13\x28\x29\x4c\x6a\x61\x76"
+    b"\x61\x2f\x6c\x61\x6e\x67\x2f\x43\x6c\x61\x73\x73\x3b\x0c\x00\x1e\x00\x1f\x0a\x00"
+    b"\x0e\x00\x20\x01\x00\x09\x67\x65\x74\x46\x69\x65\x6c\x64\x73\x01\x00\x1c\x28\x29"
+    b"\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f"
+    b"\x46\x69\x65\x6c\x64\x3b\x0c\x00\x22\x00\x23\x0a\x00\x0e\x00\x24\x01\x00\x17\x6a"
+    b"\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x46\x69\x65"
+    b"\x6c\x64\x07\x00\x26\x01\x00\x0c\x67\x65\x74\x4d\x6f\x64\x69\x66\x69\x65\x72\x73"
+    b"\x01\x00\x03\x28\x29\x49\x0c\x00\x28\x00\x29\x0a\x00\x27\x00\x2a\x01\x00\x1c\x28"
+    b"\x49\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x42"
+    b"\x75\x69\x6c\x64\x65\x72\x3b\x0c\x00\x13\x00\x2c\x0a\x00\x0b\x00\x2d\x0a\x00\x27"
+    b"\x00\x19\x01\x00\x07\x67\x65\x74\x54\x79\x70\x65\x0c\x00\x30\x00\x1f\x0a\x00\x27"
+    b"\x00\x31\x01\x00\x0a\x67\x65\x74\x4d\x65\x74\x68\x6f\x64\x73\x01\x00\x1d\x28\x29"
+    b"\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f"
+    b"\x4d\x65\x74\x68\x6f\x64\x3b\x0c\x00\x33\x00\x34\x0a\x00\x0e\x00\x35\x01\x00\x18"
+    b"\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x4d\x65"
+    b"\x74\x68\x6f\x64\x07\x00\x37\x0a\x00\x38\x00\x2a\x0a\x00\x38\x00\x19\x01\x00\x0d"
+    b"\x67\x65\x74\x52\x65\x74\x75\x72\x6e\x54\x79\x70\x65\x0c\x00\x3b\x00\x1f\x0a\x00"
+    b"\x38\x00\x3c\x01\x00\x11\x67\x65\x74\x50\x61\x72\x61\x6d\x65\x74\x65\x72\x54\x79"
+    b"\x70\x65\x73\x0c\x00\x3e\x00\x10\x0a\x00\x38\x00\x3f\x01\x00\x0b\x61\x70\x70\x65"
+    b"\x6e\x64\x54\x79\x70\x65\x73\x01\x00\x2e\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e"
+    b"\x67\x2f\x53\x74\x72\x69\x6e\x67\x42\x75\x69\x6c\x64\x65\x72\x3b\x5b\x4c\x6a\x61"
+    b"\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x43\x6c\x61\x73\x73\x3b\x29\x56\x0c\x00\x41\x00"
+    b"\x42\x0a\x00\x02\x00\x43\x01\x00\x0f\x67\x65\x74\x43\x6f\x6e\x73\x74\x72\x75\x63"
+    b"\x74\x6f\x72\x73\x01\x00\x22\x28\x29\x5b\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67"
+    b"\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x43\x6f\x6e\x73\x74\x72\x75\x63\x74\x6f\x72"
+    b"\x3b\x0c\x00\x45\x00\x46\x0a\x00\x0e\x00\x47\x01\x00\x1d\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x72\x65\x66\x6c\x65\x63\x74\x2f\x43\x6f\x6e\x73\x74\x72\x75\x63"
+    b"\x74\x6f\x72\x07\x00\x49\x0a\x00\x4a\x00\x2a\x0a\x00\x4a\x00\x3f\x01\x00\x08\x74"
+    b"\x6f\x53\x74\x72\x69\x6e\x67\x0c\x00\x4d\x00\x18\x0a\x00\x0b\x00\x4e\x01\x00\x08"
+    b"\x64\x65\x73\x63\x72\x69\x62\x65\x01\x00\x25\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61"
+    b"\x6e\x67\x2f\x43\x6c\x61\x73\x73\x3b\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67"
+    b"\x2f\x53\x74\x72\x69\x6e\x67\x3b\x01\x00\x13\x6a\x61\x76\x61\x2f\x75\x74\x69\x6c"
+    b"\x2f\x41\x72\x72\x61\x79\x4c\x69\x73\x74\x07\x00\x52\x0a\x00\x53\x00\x07\x01\x00"
+    b"\x03\x61\x64\x64\x01\x00\x15\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f"
+    b"\x62\x6a\x65\x63\x74\x3b\x29\x5a\x0c\x00\x55\x00\x56\x0a\x00\x53\x00\x57\x01\x00"
+    b"\x04\x73\x69\x7a\x65\x0c\x00\x59\x00\x29\x0a\x00\x53\x00\x5a\x01\x00\x03\x67\x65"
+    b"\x74\x01\x00\x15\x28\x49\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x4f\x62"
+    b"\x6a\x65\x63\x74\x3b\x0c\x00\x5c\x00\x5d\x0a\x00\x53\x00\x5e\x01\x00\x0b\x6c\x6f"
+    b"\x63\x61\x74\x65\x43\x6c\x61\x73\x73\x0c\x00\x60\x00\x51\x0a\x00\x02\x00\x61\x01"
+    b"\x00\x08\x63\x6f\x6e\x74\x61\x69\x6e\x73\x0c\x00\x63\x00\x56\x0a\x00\x53\x00\x64"
+    b"\x01\x00\x06\x6c\x6f\x63\x61\x74\x65\x01\x00\x01\x2f\x08\x00\x67\x01\x00\x10\x6a"
+    b"\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x07\x00\x69\x01\x00"
+    b"\x07\x72\x65\x70\x6c\x61\x63\x65\x01\x00\x16\x28\x43\x43\x29\x4c\x6a\x61\x76\x61"
+    b"\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x0c\x00\x6b\x00\x6c\x0a\x00"
+    b"\x6a\x00\x6d\x01\x00\x06\x2e\x63\x6c\x61\x73\x73\x08\x00\x6f\x01\x00\x0b\x67\x65"
+    b"\x74\x52\x65\x73\x6f\x75\x72\x63\x65\x01\x00\x22\x28\x4c\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x29\x4c\x6a\x61\x76\x61\x2f\x6e\x65"
+    b"\x74\x2f\x55\x52\x4c\x3b\x0c\x00\x71\x00\x72\x0a\x00\x0e\x00\x73\x01\x00\x0c\x6a"
+    b"\x61\x76\x61\x2f\x6e\x65\x74\x2f\x55\x52\x4c\x07\x00\x75\x0a\x00\x76\x00\x4e\x01"
+    b"\x00\x04\x6a\x72\x74\x3a\x08\x00\x78\x01\x00\x0a\x73\x74\x61\x72\x74\x73\x57\x69"
+    b"\x74\x68\x01\x00\x15\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67\x2f\x53\x74\x72"
+    b"\x69\x6e\x67\x3b\x29\x5a\x0c\x00\x7a\x00\x7b\x0a\x00\x6a\x00\x7c\x01\x00\x09\x6a"
+    b"\x61\x76\x61\x2e\x68\x6f\x6d\x65\x08\x00\x7e\x01\x00\x10\x6a\x61\x76\x61\x2f\x6c"
+    b"\x61\x6e\x67\x2f\x53\x79\x73\x74\x65\x6d\x07\x00\x80\x01\x00\x0b\x67\x65\x74\x50"
+    b"\x72\x6f\x70\x65\x72\x74\x79\x01\x00\x26\x28\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e"
+    b"\x67\x2f\x53\x74\x72\x69\x6e\x67\x3b\x29\x4c\x6a\x61\x76\x61\x2f\x6c\x61\x6e\x67"
+    b"\x2f\x53\x74\x72\x69\x6e\x67\x3b\x0c\x00\x82\x00\x83\x0a\x00\x81\x00\x84\x00\x31"
+    b"\x00\x02\x00\x04\x00\x00\x00\x00\x00\x05\x00\x02\x00\x05\x00\x06\x00\x01\x00\x09"
+    b"\x00\x00\x00\x11\x00\x01\x00\x01\x00\x00\x00\x05\x2a\xb7\x00\x08\xb1\x00\x00\x00"
+    b"\x00\x00\x09\x00\x50\x00\x51\x00\x01\x00\x09\x00\x00\x01\x39\x00\x04\x00\x05\x00"
+    b"\x00\x01\x2d\xbb\x00\x0b\x59\xb7\x00\x0c\x4c\x2a\xb6\x00\x12\x4d\x03\x3e\x1d\x2c"
+    b"\xbe\xa2\x00\x1e\x2b\x10\x49\xb6\x00\x16\x2c\x1d\x32\xb6\x00\x1a\xb6\x00\x1d\x10"
+    b"\x0a\xb6\x00\x16\x57\x84\x03\x01\xa7\xff\xe2\x2a\xb6\x00\x21\x4d\x2c\xc6\x00\x1e"
+    b"\x2b\x10\x53\xb6\x00\x16\x2c\xb6\x00\x1a\xb6\x00\x1d\x10\x0a\xb6\x00\x16\x57\x2c"
+    b"\xb6\x00\x21\x4d\xa7\xff\xe4\x2a\xb6\x00\x25\x4d\x03\x3e\x1d\x2c\xbe\xa2\x00\x3f"
+    b"\x2c\x1d\x32\x3a\x04\x2b\x10\x46\xb6\x00\x16\x19\x04\xb6\x00\x2b\xb6\x00\x2e\x10"
+    b"\x09\xb6\x00\x16\x19\x04\xb6\x00\x2f\xb6\x00\x1d\x10\x09\xb6\x00\x16\x19\x04\xb6"
+    b"\x00\x32\xb6\x00\x1a\xb6\x00\x1d\x10\x0a\xb6\x00\x16\x57\x84\x03\x01\xa7\xff\xc1"
+    b"\x2a\xb6\x00\x36\x4d\x03\x3e\x1d\x2c\xbe\xa2\x00\x4a\x2c\x1d\x32\x3a\x04\x2b\x10"
+    b"\x4d\xb6\x00\x16\x19\x04\xb6\x00\x39\xb6\x00\x2e\x10\x09\xb6\x00\x16\x19\x04\xb6"
+    b"\x00\x3a\xb6\x00\x1d\x10\x09\xb6\x00\x16\x19\x04\xb6\x00\x3d\xb6\x00\x1a\xb6\x00"
+    b"\x1d\x57\x2b\x19\x04\xb6\x00\x40\xb8\x00\x44\x2b\x10\x0a\xb6\x00\x16\x57\x84\x03"
+    b"\x01\xa7\xff\xb6\x2a\xb6\x00\x48\x4d\x03\x3e\x1d\x2c\xbe\xa2\x00\x2d\x2c\x1d\x32"
+    b"\x3a\x04\x2b\x10\x43\xb6\x00\x16\x19\x04\xb6\x00\x4b\xb6\x00\x2e\x57\x2b\x19\x04"
+    b"\xb6\x00\x4c\xb8\x00\x44\x2b\x10\x0a\xb6\x00\x16\x57\x84\x03\x01\xa7\xff\xd3\x2b"
+    b"\xb6\x00\x4f\xb0\x00\x00\x00\x00\x00\x09\x00\x66\x00\x51\x00\x01\x00\x09\x00\x00"
+    b"\x00\xa5\x00\x04\x00\x08\x00\x00\x00\x99\xbb\x00\x0b\x59\xb7\x00\x0c\x4c\xbb\x00"
+    b"\x53\x59\xb7\x00\x54\x4d\x2c\x2a\xb6\x00\x58\x57\x03\x3e\x1d\x2c\xb6\x00\x5b\xa2"
+    b"\x00\x77\x2c\x1d\xb6\x00\x5f\xc0\x00\x0e\x3a\x04\x19\x04\xb8\x00\x62\x3a\x05\x19"
+    b"\x05\xc7\x00\x05\x01\xb0\x2b\x19\x05\xb6\x00\x1d\x10\x0a\xb6\x00\x16\x57\x19\x04"
+    b"\xb6\x00\x21\x3a\x05\x19\x05\xc6\x00\x13\x2c\x19\x05\xb6\x00\x65\x9a\x00\x0a\x2c"
+    b"\x19\x05\xb6\x00\x58\x57\x19\x04\xb6\x00\x12\x3a\x06\x03\x36\x07\x15\x07\x19\x06"
+    b"\xbe\xa2\x00\x1f\x2c\x19\x06\x15\x07\x32\xb6\x00\x65\x9a\x00\x0d\x2c\x19\x06\x15"
+    b"\x07\x32\xb6\x00\x58\x57\x84\x07\x01\xa7\xff\xdf\x84\x03\x01\xa7\xff\x87\x2b\xb6"
+    b"\x00\x4f\xb0\x00\x00\x00\x00\x00\x0a\x00\x60\x00\x51\x00\x01\x00\x09\x00\x00\x00"
+    b"\x61\x00\x06\x00\x03\x00\x00\x00\x55\x2a\xbb\x00\x0b\x59\xb7\x00\x0c\x12\x68\xb6"
+    b"\x00\x1d\x2a\xb6\x00\x1a\x10\x2e\x10\x2f\xb6\x00\x6e\xb6\x00\x1d\x12\x70\xb6\x00"
+    b"\x1d\xb6\x00\x4f\xb6\x00\x74\x4c\x2b\xc7\x00\x05\x01\xb0\x2b\xb6\x00\x77\x4d\x2c"
+    b"\x12\x79\xb6\x00\x7d\x99\x00\x1b\xbb\x00\x0b\x59\xb7\x00\x0c\x12\x79\xb6\x00\x1d"
+    b"\x12\x7f\xb8\x00\x85\xb6\x00\x1d\xb6\x00\x4f\xb0\x2c\xb0\x00\x00\x00\x00\x00\x0a"
+    b"\x00\x41\x00\x42\x00\x01\x00\x09\x00\x00\x00\x2b\x00\x03\x00\x03\x00\x00\x00\x1f"
+    b"\x03\x3d\x1c\x2b\xbe\xa2\x00\x19\x2a\x10\x09\xb6\x00\x16\x2b\x1c\x32\xb6\x00\x1a"
+    b"\xb6\x00\x1d\x57\x84\x02\x01\xa7\xff\xe7\xb1\x00\x00\x00\x00\x00\x00"
+)
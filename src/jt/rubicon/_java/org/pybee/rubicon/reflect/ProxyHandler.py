@@ -12,7 +12,7 @@ from .......jvm.jhost  import JHost
 from .......jvm.java   import throwJavaException
 
 from ......java._jvm    import JVM
-from ......java._jproxy import dispatch
+from ......java._jproxy import dispatch_method, release_proxy
 
 
 # Class: com.jt.reflect.ProxyHandler
@@ -26,37 +26,17 @@ def invoke(env, this,
     # Implementation of the InvocationHandler used by all Python objects.
     #
     # This method converts the Python method invocation into a call on the
-    # method dispatch method that has been registered as part of the runtime.
+    # method dispatcher compiled for the invoked method. An exception raised
+    # by the Python implementation is thrown into Java as a RuntimeException,
+    # so that the caller doesn't go on with a null result.
 
-    jt_jvm = JVM.jvm
     jenv = env[0]
     try:
         with JHost.CallbackState():
-            method, args = None, []
-            try:
-                instance = jni.from_oid(target)
-
-                method = jt_jvm.JMethod(None, jmethod, own=False) if jmethod else None
-                method_name = method.getName()
-
-                argcnt = jenv.GetArrayLength(jargs) if jargs else 0
-                with JFrame(jenv, argcnt):
-                    for idx in range(argcnt):
-                        jarg = jenv.GetObjectArrayElement(jargs, idx)
-                        args.append(jarg) # (unsigned long)jarg
-                    args = tuple(args)
-
-                    result = dispatch(id(instance), method_name, args)
-
-                    if result is None:
-                        return None
-                    else:
-                        return # ???
-            finally:
-                del method, args
+            return dispatch_method(target, jmethod, jargs, jenv)
     except Exception as exc:
-        #if result == NULL:
-        traceback.print_exc()
+        throwJavaException(jenv, "java/lang/RuntimeException",
+                           "Python exception thrown: {}: {}".format(type(exc).__name__, exc))
 
     return None
 
@@ -72,7 +52,15 @@ def initialize(env, this,
 @jni.method("(J)V")
 def release(env, this,
             target):
-    pass
+
+    # The Java proxy instance has been collected (the handler is being
+    # finalized); the Python object implementing it can go.
+
+    try:
+        with JHost.CallbackState():
+            release_proxy(target)
+    except Exception as exc:
+        traceback.print_exc()
 
 
 __jnimethods__ = (
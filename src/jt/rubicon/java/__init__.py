@@ -4,14 +4,26 @@
 
 from .. import __version__
 
-from ._jclass     import JavaClass, JavaInterface
+from ._jclass     import JavaClass, JavaInterface, ClassCache, invalidate_loader
 from ._jfield     import StaticJavaField, JavaField
-from ._jmethod    import StaticJavaMethod, JavaMethod, BoundJavaMethod
+from ._jmethod    import StaticJavaMethod, JavaMethod, BoundJavaMethod, JavaConstructor
+from ._jmethod    import StaticJavaMethodHandle, JavaMethodHandle, JavaConstructorHandle
 from ._jobject    import JavaInstance
 from ._jproxy     import JavaProxy
-from ._jproxy     import dispatch, dispatch_cast
+from ._jref       import ReleaseQueue, release_global_ref, release_pending
+from ._jref       import LocalScope, local_scope
+from ._jref       import RefAccounting, RefRecord, ref_accounting
+from ._jref       import track_global_ref, untrack_global_ref
+from ._jref       import InstanceTable, instance_table, wrap_instance
+from ._jref       import WeakJavaRef, release_weak_global_ref
+from ._trampoline import CallbackTrampolines, callback_trampolines
+from ._jbatching  import BatchingAdapter
+from ._metadata   import ClassMetadata, MetadataCache, describe_class, predefine_class
+from ._jproxy     import dispatch, dispatch_cast, dispatch_method, proxy_instance, release_proxy
 from ._reflect    import reflect
-from ._conversion import (convert_args, select_polymorph,
+from .bindgen     import generate_bindings
+from ._conversion import (convert_args, select_polymorph, compile_polymorphs, split_signature,
+                          compile_marshaller, split_method_signature,
                           signature_for_type_name, signature_for_params,
                           type_names_for_params, return_cast)
 from .jni   import *
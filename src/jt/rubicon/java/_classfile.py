@@ -0,0 +1,327 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+"""A minimal writer of Java class files.
+
+It covers what the classes generated at runtime need: a constant pool of
+classes, strings, integers, fields and methods, fields, native methods and
+methods with straight-line or branching code and exception handlers. The
+classes are written in the class file format version 49 (Java 5), so they
+don't need stack map frames.
+"""
+
+from __future__ import absolute_import
+
+import struct
+
+from ...jvm.lib import public
+
+from ._conversion import split_signature
+
+# Access flags
+ACC_PUBLIC       = 0x0001
+ACC_PRIVATE      = 0x0002
+ACC_PROTECTED    = 0x0004
+ACC_STATIC       = 0x0008
+ACC_FINAL        = 0x0010
+ACC_SUPER        = 0x0020  # (classes)
+ACC_SYNCHRONIZED = 0x0020  # (methods)
+ACC_NATIVE       = 0x0100
+ACC_ABSTRACT     = 0x0400
+
+_OPCODES = dict(
+    aconst_null=0x01, iconst_0=0x03, iconst_1=0x04, lconst_0=0x09, fconst_0=0x0B, dconst_0=0x0E,
+    bipush=0x10, sipush=0x11, ldc=0x12, ldc_w=0x13,
+    iload=0x15, lload=0x16, fload=0x17, dload=0x18, aload=0x19,
+    istore=0x36, lstore=0x37, fstore=0x38, dstore=0x39, astore=0x3A,
+    iaload=0x2E, laload=0x2F, faload=0x30, daload=0x31, aaload=0x32,
+    baload=0x33, caload=0x34, saload=0x35,
+    iastore=0x4F, lastore=0x50, fastore=0x51, dastore=0x52, aastore=0x53,
+    bastore=0x54, castore=0x55, sastore=0x56,
+    pop=0x57, pop2=0x58, dup=0x59, dup_x1=0x5A, dup_x2=0x5B, dup2=0x5C, swap=0x5F,
+    iadd=0x60, ladd=0x61, isub=0x64, lsub=0x65,
+    lcmp=0x94,
+    ifeq=0x99, ifne=0x9A, iflt=0x9B, ifge=0x9C, ifgt=0x9D, ifle=0x9E,
+    if_icmpeq=0x9F, if_icmpne=0xA0, if_icmplt=0xA1, if_icmpge=0xA2,
+    if_icmpgt=0xA3, if_icmple=0xA4, if_acmpeq=0xA5, if_acmpne=0xA6, goto=0xA7,
+    ireturn=0xAC, lreturn=0xAD, freturn=0xAE, dreturn=0xAF, areturn=0xB0, return_=0xB1,
+    getstatic=0xB2, putstatic=0xB3, getfield=0xB4, putfield=0xB5,
+    invokevirtual=0xB6, invokespecial=0xB7, invokestatic=0xB8, invokeinterface=0xB9,
+    new=0xBB, newarray=0xBC, anewarray=0xBD, arraylength=0xBE, athrow=0xBF,
+    checkcast=0xC0, instanceof=0xC1, monitorenter=0xC2, monitorexit=0xC3,
+    ifnull=0xC6, ifnonnull=0xC7,
+)
+
+_BRANCHES = {"ifeq", "ifne", "iflt", "ifge", "ifgt", "ifle",
+             "if_icmpeq", "if_icmpne", "if_icmplt", "if_icmpge", "if_icmpgt", "if_icmple",
+             "if_acmpeq", "if_acmpne", "goto", "ifnull", "ifnonnull"}
+
+# The opcodes of the <op>_0 forms of the local variable instructions
+_SHORT_LOCALS = dict(iload=0x1A, lload=0x1E, fload=0x22, dload=0x26, aload=0x2A,
+                     istore=0x3B, lstore=0x3F, fstore=0x43, dstore=0x47, astore=0x4B)
+
+_ARRAY_TYPES = dict(Z=4, C=5, F=6, D=7, B=8, S=9, I=10, J=11)
+
+# {type signature: (load opcode, return opcode)}
+_TYPE_OPCODES = dict(Z=("iload", "ireturn"), C=("iload", "ireturn"),
+                     B=("iload", "ireturn"), S=("iload", "ireturn"),
+                     I=("iload", "ireturn"), J=("lload", "lreturn"),
+                     F=("fload", "freturn"), D=("dload", "dreturn"),
+                     L=("aload", "areturn"), V=(None, "return_"))
+_TYPE_OPCODES["["] = _TYPE_OPCODES["L"]
+
+
+@public
+class ClassFile(object):
+
+    """A Java class file under construction.
+
+    name, super_name and interfaces are internal class names
+    (e.g. "java/lang/Object").
+    """
+
+    def __init__(self, name, super_name="java/lang/Object", interfaces=(),
+                 access=ACC_PUBLIC | ACC_FINAL | ACC_SUPER, version=49):
+
+        self.name       = name
+        self.super_name = super_name
+        self.access     = access
+        self.version    = version
+        self._pool      = [None]  # The constant pool entries; index 0 is unused
+        self._indexes   = {}      # {constant key: constant pool index}
+        self._this      = self.class_ref(name)
+        self._super     = self.class_ref(super_name)
+        self._interfaces = [self.class_ref(interface) for interface in interfaces]
+        self._fields    = []
+        self._methods   = []
+
+    # Constant pool
+
+    def _constant(self, key, data, wide=False):
+
+        try:
+            return self._indexes[key]
+        except KeyError:
+            index = self._indexes[key] = len(self._pool)
+            self._pool.append(data)
+            if wide: # longs and doubles take two entries
+                self._pool.append(None)
+            return index
+
+    def utf8(self, value):
+
+        data = value.encode("utf-8")
+        return self._constant(("Utf8", value), struct.pack(">BH", 1, len(data)) + data)
+
+    def class_ref(self, name):
+
+        return self._constant(("Class", name), struct.pack(">BH", 7, self.utf8(name)))
+
+    def string(self, value):
+
+        return self._constant(("String", value), struct.pack(">BH", 8, self.utf8(value)))
+
+    def integer(self, value):
+
+        return self._constant(("Integer", value), struct.pack(">Bi", 3, value))
+
+    def long(self, value):
+
+        return self._constant(("Long", value), struct.pack(">Bq", 5, value), wide=True)
+
+    def name_and_type(self, name, descriptor):
+
+        return self._constant(("NameAndType", name, descriptor),
+                              struct.pack(">BHH", 12, self.utf8(name), self.utf8(descriptor)))
+
+    def field_ref(self, owner, name, descriptor):
+
+        return self._constant(("Fieldref", owner, name, descriptor),
+                              struct.pack(">BHH", 9, self.class_ref(owner),
+                                          self.name_and_type(name, descriptor)))
+
+    def method_ref(self, owner, name, descriptor):
+
+        return self._constant(("Methodref", owner, name, descriptor),
+                              struct.pack(">BHH", 10, self.class_ref(owner),
+                                          self.name_and_type(name, descriptor)))
+
+    def interface_method_ref(self, owner, name, descriptor):
+
+        return self._constant(("InterfaceMethodref", owner, name, descriptor),
+                              struct.pack(">BHH", 11, self.class_ref(owner),
+                                          self.name_and_type(name, descriptor)))
+
+    # Members
+
+    def field(self, access, name, descriptor):
+
+        self._fields.append(struct.pack(">HHHH", access, self.utf8(name),
+                                        self.utf8(descriptor), 0))
+
+    def method(self, access, name, descriptor, code=None):
+
+        """Add a method; code is its Code, or None for native (and abstract) methods."""
+        attributes = [] if code is None else [code._attribute()]
+        self._methods.append(struct.pack(">HHHH", access, self.utf8(name),
+                                         self.utf8(descriptor), len(attributes)) +
+                             b"".join(attributes))
+
+    def code(self, max_stack, max_locals):
+
+        return Code(self, max_stack, max_locals)
+
+    def to_bytes(self):
+
+        data = [struct.pack(">IHHH", 0xCAFEBABE, 0, self.version, len(self._pool))]
+        data.extend(entry for entry in self._pool[1:] if entry is not None)
+        data.append(struct.pack(">HHHH", self.access, self._this, self._super,
+                                len(self._interfaces)))
+        data.extend(struct.pack(">H", interface) for interface in self._interfaces)
+        data.append(struct.pack(">H", len(self._fields)))
+        data.extend(self._fields)
+        data.append(struct.pack(">H", len(self._methods)))
+        data.extend(self._methods)
+        data.append(struct.pack(">H", 0)) # attributes
+        return b"".join(data)
+
+
+@public
+class Code(object):
+
+    """The bytecode of a method.
+
+    The instructions are emitted by calling the methods named after their
+    mnemonics (return_ for return), which return the Code so that they can be
+    chained, e.g. code.aload(0).invokespecial("java/lang/Object", "<init>", "()V").
+    Branch targets are named labels, placed by label().
+    """
+
+    def __init__(self, class_file, max_stack, max_locals):
+
+        self._class_file = class_file
+        self.max_stack   = max_stack
+        self.max_locals  = max_locals
+        self._code     = bytearray()
+        self._labels   = {}
+        self._branches = []  # [(instruction offset, label)]
+        self._handlers = []  # [(start label, end label, handler label, class name)]
+
+    def label(self, name):
+
+        self._labels[name] = len(self._code)
+        return self
+
+    def handler(self, start, end, target, class_name=None):
+
+        """Add an exception handler at the label target for the code between the
+        labels start and end, catching class_name (or anything if None)."""
+        self._handlers.append((start, end, target, class_name))
+        return self
+
+    def class_literal(self, class_name):
+
+        """Emit the ldc of a class constant (e.g. Object.class)."""
+        index = self._class_file.class_ref(class_name)
+        if index <= 0xFF:
+            self._code += struct.pack(">BB", _OPCODES["ldc"], index)
+        else:
+            self._code += struct.pack(">BH", _OPCODES["ldc_w"], index)
+        return self
+
+    def load(self, type_signature, index):
+
+        """Emit the load instruction of a local of the given type signature."""
+        return getattr(self, _TYPE_OPCODES[type_signature[0]][0])(index)
+
+    def return_value(self, type_signature):
+
+        """Emit the return instruction for the given return type signature."""
+        return getattr(self, _TYPE_OPCODES[type_signature[0]][1])()
+
+    def iinc(self, index, value):
+
+        self._code += struct.pack(">BBb", 0x84, index, value)
+        return self
+
+    def __getattr__(self, mnemonic):
+
+        try:
+            opcode = _OPCODES[mnemonic]
+        except KeyError:
+            raise AttributeError(mnemonic)
+
+        def emit(*args):
+            class_file = self._class_file
+            code = self._code
+            offset = len(code)
+            if mnemonic in _BRANCHES:
+                label, = args
+                code += struct.pack(">Bh", opcode, 0)
+                self._branches.append((offset, label))
+            elif mnemonic in _SHORT_LOCALS:
+                index, = args
+                if index <= 3:
+                    code.append(_SHORT_LOCALS[mnemonic] + index)
+                else:
+                    code += struct.pack(">BB", opcode, index)
+            elif mnemonic in ("invokevirtual", "invokespecial", "invokestatic"):
+                code += struct.pack(">BH", opcode, class_file.method_ref(*args))
+            elif mnemonic == "invokeinterface":
+                owner, name, descriptor = args
+                code += struct.pack(">BHBB", opcode,
+                                    class_file.interface_method_ref(owner, name, descriptor),
+                                    1 + argument_slots(descriptor), 0)
+            elif mnemonic in ("getstatic", "putstatic", "getfield", "putfield"):
+                code += struct.pack(">BH", opcode, class_file.field_ref(*args))
+            elif mnemonic in ("new", "anewarray", "checkcast", "instanceof"):
+                class_name, = args
+                code += struct.pack(">BH", opcode, class_file.class_ref(class_name))
+            elif mnemonic == "newarray":
+                type_signature, = args
+                code += struct.pack(">BB", opcode, _ARRAY_TYPES[type_signature])
+            elif mnemonic in ("ldc", "ldc_w"):
+                value, = args
+                index = (class_file.string(value) if isinstance(value, str) else
+                         class_file.integer(value))
+                if index <= 0xFF:
+                    code += struct.pack(">BB", _OPCODES["ldc"], index)
+                else:
+                    code += struct.pack(">BH", _OPCODES["ldc_w"], index)
+            elif mnemonic == "bipush":
+                code += struct.pack(">Bb", opcode, *args)
+            elif mnemonic == "sipush":
+                code += struct.pack(">Bh", opcode, *args)
+            else:
+                if args:
+                    raise ValueError("Instruction '{}' takes no operands".format(mnemonic))
+                code.append(opcode)
+            return self
+
+        return emit
+
+    def _attribute(self):
+
+        class_file = self._class_file
+        code = bytearray(self._code)
+        for offset, label in self._branches:
+            struct.pack_into(">h", code, offset + 1, self._labels[label] - offset)
+        labels = self._labels
+        handlers = [struct.pack(">HHHH", labels[start], labels[end], labels[target],
+                                0 if class_name is None else class_file.class_ref(class_name))
+                    for start, end, target, class_name in self._handlers]
+        body = (struct.pack(">HHI", self.max_stack, self.max_locals, len(code)) + bytes(code) +
+                struct.pack(">H", len(handlers)) + b"".join(handlers) +
+                struct.pack(">H", 0)) # attributes
+        return struct.pack(">HI", class_file.utf8("Code"), len(body)) + body
+
+
+@public
+def argument_slots(descriptor):
+
+    """Return the number of local variable slots taken by the parameters of a
+    method descriptor (longs and doubles take two)."""
+    params_signature = descriptor[1:descriptor.index(")")]
+    return sum(2 if type_signature in ("J", "D") else 1
+               for type_signature in split_signature(params_signature))
@@ -4,14 +4,13 @@
 
 from __future__ import absolute_import
 
-import itertools
+import threading
 
 from ...jvm.lib import annotate, Optional
 from ...jvm.lib import public
 from ...jvm.jframe  import JFrame
 from ...jvm.jstring import JString
 
-from ._constants import EJavaType
 from ._jvm       import JVM
 from .           import types as jtypes
 
@@ -85,40 +84,142 @@ def convert_args(args, type_names):
     return converted
 
 
-def _convert_args_to_jargs(args, type_names):
-
-    largs = convert_args(args, type_names)
-    jargs = JVM.jvm.JArguments(len(largs))
-    for pos, jarg in enumerate(largs):
-        if isinstance(jarg, jtypes.jboolean):
-            jargs.setBoolean(pos, jarg)
-        elif isinstance(jarg, jtypes.jchar):
-            jargs.setChar(pos, jarg)
-        elif isinstance(jarg, jtypes.jbyte):
-            jargs.setByte(pos, jarg)
-        elif isinstance(jarg, jtypes.jshort):
-            jargs.setShort(pos, jarg)
-        elif isinstance(jarg, jtypes.jint):
-            jargs.setInt(pos, jarg)
-        elif isinstance(jarg, jtypes.jlong):
-            jargs.setLong(pos, jarg)
-        elif isinstance(jarg, jtypes.jfloat):
-            jargs.setFloat(pos, jarg)
-        elif isinstance(jarg, jtypes.jdouble):
-            jargs.setDouble(pos, jarg)
-        elif isinstance(jarg, jtypes.jstring):
-            jobject = JVM.jvm.JObject(None, jarg, own=False)
-            jargs.setObject(pos, jobject)
-            jargs.argtypes[pos] = EJavaType.STRING
-        else:
-            jobject = JVM.jvm.JObject(None, jarg, own=False)
-            jargs.setObject(pos, jobject)
+@public
+def compile_marshaller(match_types):
+
+    """Compile the argument marshalling plan for a list of parameter type signatures.
+
+    The plan is a tuple of setters, one per argument position, each storing a
+    Python value for the JNI type of its parameter straight into the jvalue of
+    its position, in a single pass and without intermediate ctypes objects.
+    A setter returns the local reference it has created, if any (i.e., for
+    strings), so it can be released after the call.
+    """
+    return tuple(_argument_setters.get(type_name, _set_object_argument)
+                 for type_name in match_types)
+
+
+def _marshal_args(marshaller, args, pool):
+
+    """Marshal the arguments according to the plan, into a buffer taken from the pool.
+
+    Returns a 2-tuple of the JArguments and the list of the local references
+    created while marshalling (or None if there are none). Both have to be
+    handed back to _release_args() after the call.
+    """
+    if len(args) != len(marshaller):
+        raise ValueError("Expected {} argument(s), got {}.".format(len(marshaller), len(args)))
+
+    jargs = pool.acquire()
+    jlocals = None
+    try:
+        if marshaller:
+            jvalues = jargs.arguments
+            for pos, setter in enumerate(marshaller):
+                jlocal = setter(jvalues[pos], args[pos])
+                if jlocal is not None:
+                    if jlocals is None:
+                        jlocals = []
+                    jlocals.append(jlocal)
+    except:
+        _release_args(pool, jargs, jlocals)
+        raise
+
+    return jargs, jlocals
+
+
+def _release_args(pool, jargs, jlocals):
+
+    if jlocals:
+        with JVM.jvm as (_, jenv):
+            for jlocal in jlocals:
+                jenv.DeleteLocalRef(jlocal)
+    pool.release(jargs)
 
-    return jargs
+
+class _ArgumentsPool(threading.local):
+
+    """Per-thread spare JArguments buffer of a given size.
+
+    A buffer is taken out of the pool for the duration of a call and put back
+    after it, so a reentrant call (e.g. from a callback into Python) made while
+    the buffer is in use gets a fresh one instead.
+    """
+    def __init__(self, size):
+
+        self.size  = size
+        self.spare = None
+
+    def acquire(self):
+
+        jargs = self.spare
+        if jargs is None:
+            return JVM.jvm.JArguments(self.size)
+        self.spare = None
+        return jargs
+
+    def release(self, jargs):
+
+        self.spare = jargs
+
+
+def _set_boolean_argument(jvalue, arg): jvalue.z = arg
+def _set_byte_argument(jvalue, arg):    jvalue.b = arg
+def _set_short_argument(jvalue, arg):   jvalue.s = arg
+def _set_int_argument(jvalue, arg):     jvalue.i = arg
+def _set_long_argument(jvalue, arg):    jvalue.j = arg
+def _set_float_argument(jvalue, arg):   jvalue.f = arg
+def _set_double_argument(jvalue, arg):  jvalue.d = arg
+
+
+def _set_char_argument(jvalue, arg):
+
+    jvalue.c = ord(arg) if isinstance(arg, (str, type(u""))) else arg
+
+
+def _set_object_argument(jvalue, arg):
+
+    if arg is None:
+        jvalue.l = None
+    elif isinstance(arg, (str, type(u""))):
+        with JVM.jvm as (_, jenv):
+            jvalue.l = jstr = jenv.NewStringUTF(arg.encode("utf-8"))
+        return jstr
+    else:
+        try:
+            jvalue.l = arg.__javaobject__
+        except AttributeError:
+            raise ValueError("Unknown argument type", arg, type(arg))
+
+
+_argument_setters = {
+    "Z": _set_boolean_argument,
+    "C": _set_char_argument,
+    "B": _set_byte_argument,
+    "S": _set_short_argument,
+    "I": _set_int_argument,
+    "J": _set_long_argument,
+    "F": _set_float_argument,
+    "D": _set_double_argument,
+}
 
 
 @public
-def select_polymorph(polymorphs, args):
+def split_method_signature(signature):
+
+    """Split a full JNI method signature into its arguments and return signatures.
+
+    i.e., '(ILjava/lang/String;)V' is split into ('ILjava/lang/String;', 'V').
+    """
+    params_signature, sep, return_signature = signature.partition(")")
+    if not sep or not params_signature.startswith("(") or not return_signature:
+        raise ValueError("Invalid JNI method signature '{}'".format(signature))
+
+    return params_signature[1:], return_signature
+
+
+@public
+def select_polymorph(polymorphs, args, dispatch=None):
 
     """Determine the polymorphic signature that will match a given argument list.
 
@@ -133,6 +234,10 @@ def select_polymorph(polymorphs, args):
 
     args is a list of arguments that have been passed to invoke the method.
 
+    dispatch is the decision structure compiled from polymorphs by
+    compile_polymorphs(). Callers invoking the same polymorphs repeatedly should
+    compile it once and pass it in; if it is omitted, it is compiled on the fly.
+
     Returns a 3-tuple:
      * arg_sig - the actual signature of the provided arguments
      * match_types - the type list that was matched. This is a list of individual
@@ -146,59 +251,144 @@ def select_polymorph(polymorphs, args):
      * polymorph - the value from the input polymorphs that matched. Equivalent
        to polymorphs[match_types]
     """
+    if dispatch is None:
+        dispatch = compile_polymorphs(polymorphs)
+
+    arg_types = [_arg_type_candidates(arg) for arg in args]
+
+    node = dispatch.get(len(arg_types))
+    if node is not None:
+        leaf = _dispatch(node, arg_types, 0)
+        if leaf is not None:
+            signature, match_types = leaf
+            return "".join(t[0] for t in arg_types), match_types, polymorphs[signature]
+
+    raise KeyError("".join(t[0] for t in arg_types))
+
+
+@public
+def compile_polymorphs(polymorphs):
+
+    """Compile the signatures of a polymorphs dictionary into a decision structure.
+
+    The result is a dictionary indexed by arity. Each entry is a tree with one
+    level per argument position, keyed by the JNI type of the parameter at that
+    position; the leaves are (signature, match_types) tuples. Walking the tree with
+    the candidate types of each argument (see select_polymorph()) costs a dict probe
+    per argument and candidate, instead of a probe for every combination of
+    candidate types.
+    """
+    dispatch = {}
+    for signature in polymorphs:
+        match_types = split_signature(signature)
+        leaf = (signature, match_types)
+        if not match_types:
+            dispatch[0] = leaf
+            continue
+        node = dispatch.setdefault(len(match_types), {})
+        for type_name in match_types[:-1]:
+            node = node.setdefault(type_name, {})
+        node[match_types[-1]] = leaf
+
+    return dispatch
+
+
+def _dispatch(node, arg_types, pos):
+
+    # Candidates are tried in order of preference, with earlier arguments
+    # taking precedence; this is the same order in which itertools.product()
+    # would have enumerated the combinations.
+    if pos == len(arg_types):
+        return node
+    for type_name in arg_types[pos]:
+        child = node.get(type_name)
+        if child is not None:
+            leaf = _dispatch(child, arg_types, pos + 1)
+            if leaf is not None:
+                return leaf
+    return None
+
+
+def _arg_type_candidates(arg):
+
+    """Return the JNI types an argument can be passed as, in order of preference."""
+    try:
+        return _type_candidates[type(arg)]
+    except KeyError:
+        pass
+
     from ._jobject import JavaInstance
     from ._jproxy  import JavaProxy
 
-    arg_types = []
-    if len(args) == 0:
-        arg_sig = ""
-        options = [[]]
-    else:
-        for arg in args:
-            if isinstance(arg, (bool, jtypes.jboolean)):
-                arg_types.append(["Z"])
-            elif isinstance(arg, jtypes.jchar):
-                arg_types.append(["C"])
-            elif isinstance(arg, jtypes.jbyte):
-                arg_types.append(["B"])
-            elif isinstance(arg, jtypes.jshort):
-                arg_types.append(["S"])
-            elif isinstance(arg, jtypes.jint):
-                arg_types.append(["I"])
-            elif isinstance(arg, int):
-                arg_types.append(["I", "J", "S"])
-            elif isinstance(arg, jtypes.jlong):
-                arg_types.append(["J"])
-            elif isinstance(arg, jtypes.jfloat):
-                arg_types.append(["F"])
-            elif isinstance(arg, jtypes.jdouble):
-                arg_types.append(["D"])
-            elif isinstance(arg, float):
-                arg_types.append(["D", "F"])
-            elif isinstance(arg, (str, type(u""))):
-                arg_types.append([
-                    "Ljava/lang/String;",
-                    "Ljava/io/Serializable;",
-                    "Ljava/lang/Comparable;",
-                    "Ljava/lang/CharSequence;",
-                    "Ljava/lang/Object;",
-                ])
-            elif isinstance(arg, (JavaInstance, JavaProxy)):
-                arg_types.append(arg.__class__.__dict__["_alternates"])
-            else:
-                raise ValueError("Unknown argument type", arg, type(arg))
+    if isinstance(arg, (JavaInstance, JavaProxy)):
+        return arg.__class__.__dict__["_alternates"]
+    for arg_type, candidates in _type_candidates_order:
+        if isinstance(arg, arg_type):
+            return candidates
 
-        arg_sig = "".join(t[0] for t in arg_types)
+    raise ValueError("Unknown argument type", arg, type(arg))
 
-        options = list(itertools.product(*arg_types))
 
-    for option in options:
-        try:
-            return arg_sig, option, polymorphs["".join(option)]
-        except KeyError:
-            pass
+@public
+def split_signature(signature):
 
-    raise KeyError(arg_sig)
+    """Split a JNI arguments signature into the tuple of its type signatures.
+
+    i.e., 'ILjava/lang/String;[Z' is split into
+    ('I', 'Ljava/lang/String;', '[Z').
+    """
+    type_names = []
+    start = pos = 0
+    while pos < len(signature):
+        char = signature[pos]
+        if char == "[":
+            pos += 1
+            continue
+        elif char == "L":
+            pos = signature.index(";", pos)
+        pos += 1
+        type_names.append(signature[start:pos])
+        start = pos
+
+    return tuple(type_names)
+
+
+# The JNI types that values of the Python (and ctypes) types can be passed as,
+# in order of preference. The order of the entries is the order of the checks
+# made for instances of subclasses.
+_type_candidates_order = (
+    ((bool, jtypes.jboolean), ("Z",)),
+    (jtypes.jchar,            ("C",)),
+    (jtypes.jbyte,            ("B",)),
+    (jtypes.jshort,           ("S",)),
+    (jtypes.jint,             ("I",)),
+    (int,                     ("I", "J", "S")),
+    (jtypes.jlong,            ("J",)),
+    (jtypes.jfloat,           ("F",)),
+    (jtypes.jdouble,          ("D",)),
+    (float,                   ("D", "F")),
+    ((str, type(u"")),        ("Ljava/lang/String;",
+                               "Ljava/io/Serializable;",
+                               "Ljava/lang/Comparable;",
+                               "Ljava/lang/CharSequence;",
+                               "Ljava/lang/Object;")),
+)
+
+# Exact type lookup table; the first matching check wins.
+_type_candidates = {}
+for _arg_types, _candidates in _type_candidates_order:
+    for _arg_type in (_arg_types if isinstance(_arg_types, tuple) else (_arg_types,)):
+        _type_candidates.setdefault(_arg_type, _candidates)
+del _arg_types, _arg_type, _candidates
+
+
+def _exact_types(type_name):
+
+    """Return the set of the Python types whose values are passed as the JNI type
+    without any further check (i.e., through the exact type lookup table).
+    """
+    return frozenset(arg_type for arg_type, candidates in _type_candidates.items()
+                     if type_name in candidates)
 
 
 @public
@@ -313,7 +503,7 @@ def _type_names_for_params(params):
 
 
 @public
-def return_cast(raw, return_signature):
+def return_cast(raw, return_signature, declaring_class=None):
 
     """Convert the return value from a JNI call into a Python value.
 
@@ -323,7 +513,8 @@ def return_cast(raw, return_signature):
     Primitive types are returned in the right format, and are not modified.
     Strings are turned into Python unicode objects.
     Objects are provided as JNI references, which are wrapped into an
-    instance of the relevant JavaClass.
+    instance of the relevant JavaClass; if declaring_class (the JavaClass of
+    the called method) is given, the class is resolved through its class loader.
     """
     if return_signature in ("V", "Z", "C", "B", "S", "I", "J", "F", "D"):
 
@@ -336,11 +527,15 @@ def return_cast(raw, return_signature):
 
     elif return_signature.startswith("L"):
 
-        from ._jclass import JavaClass
+        from ._jclass import JavaClass, _resolve_class
+        from ._jref   import wrap_instance
 
         if raw:
-            java_class = JavaClass(return_signature[1:-1])
-            return java_class(jni=jtypes.cast(raw, jtypes.jclass))
+            if declaring_class is None:
+                java_class = JavaClass(return_signature[1:-1])
+            else:
+                java_class = _resolve_class(return_signature[1:-1], declaring_class)
+            return wrap_instance(java_class, jtypes.cast(raw, jtypes.jclass))
         else:
             return None
 
@@ -0,0 +1,186 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+from __future__ import absolute_import
+
+import itertools
+
+from ...jvm.lib import public
+from ...jvm.jframe import JFrame
+
+from ._jvm      import JVM
+from ._jclass   import JavaClass
+from ._jref     import track_global_ref, release_global_ref
+from .          import types as jtypes
+
+
+@public
+class BatchingAdapter(object):
+
+    """A Java listener whose events are delivered to Python in batches.
+
+    For the high-rate event sources, a Python implementation of a listener
+    (JavaProxy) pays a Java -> Python transition per event. Instead, the
+    listener of a BatchingAdapter is a java.lang.reflect.Proxy whose
+    InvocationHandler (org.pybee.rubicon.BatchingHandler) stays on the Java
+    side: it buffers the events (the invoked methods and their arguments) and
+    delivers them to the handler in one callback when size events are buffered,
+    every interval seconds (from a daemon thread; 0 or None for by size only),
+    and on flush() and close().
+
+    interface is the descriptor of the listener interface, whose methods must
+    not return a value. The handler gets the list of the events of a batch as
+    (method name, arguments) tuples, or with columnar=True, a dict mapping the
+    method names to a list of columns, one per parameter, of the arguments of
+    their events (the methods of the interface mustn't be overloaded then).
+
+    The listener attribute is the Java instance to pass to the event source.
+    The adapter is kept alive until it is closed; the events of a closed
+    adapter are dropped (by its BatchingHandler).
+    """
+
+    def __init__(self, interface, handler, size=256, interval=0.1, columnar=False):
+
+        if size < 1:
+            raise ValueError("The batch size must be positive")
+
+        java_class = JavaClass(interface)
+        for name, overloads in java_class._metadata.methods.items():
+            if any(return_signature != "V" for _, return_signature in overloads):
+                raise ValueError("Can't batch the calls of method '{}' of {}, which "
+                                 "returns a value".format(name, interface))
+            if columnar and len(overloads) > 1:
+                raise ValueError("Can't make columnar batches of the calls of the overloaded "
+                                 "method '{}' of {}".format(name, interface))
+
+        self.interface = interface
+        self.handler   = handler
+        self.columnar  = columnar
+        self._target   = next(_counter)
+        self._methods  = {}  # {method ID: (name, argument converters)}
+
+        with JVM.jvm as (jvm, jenv), JFrame(jenv, 4): # jhandler, cloader, interfaces, jproxy
+            jhandler = None
+            try:
+                jargs = jvm.JArguments(3)
+                jargs.arguments[0].j = self._target
+                jargs.arguments[1].i = size
+                jargs.arguments[2].j = max(int(interval * 1000), 1) if interval else 0
+                jhandler = jenv.NewObject(jvm.BatchingHandler.Class,
+                                          jvm.BatchingHandler.Constructor, jargs.arguments)
+                cloader = jenv.CallObjectMethod(java_class.__javaclass__,
+                                                jvm.Class.getClassLoader)
+                interfaces = jenv.NewObjectArray(1, jvm.Class.Class)
+                jenv.SetObjectArrayElement(interfaces, 0, java_class.__javaclass__)
+                jargs = jvm.JArguments(3)
+                jargs.arguments[0].l = cloader
+                jargs.arguments[1].l = interfaces
+                jargs.arguments[2].l = jhandler
+                jproxy = jenv.CallStaticObjectMethod(jvm.Proxy.Class,
+                                                     jvm.Proxy.newProxyInstance, jargs.arguments)
+            except:
+                if jhandler: # Stop its thread
+                    jenv.CallVoidMethod(jhandler, jvm.BatchingHandler.close)
+                raise RuntimeError("Unable to create batching listener instance.")
+            self._jhandler = track_global_ref(jtypes.cast(jenv.NewGlobalRef(jhandler),
+                                                          jtypes.jobject),
+                                              "BatchingAdapter", interface)
+            jproxy = track_global_ref(jtypes.cast(jenv.NewGlobalRef(jproxy), jtypes.jclass),
+                                      "BatchingAdapter", interface)
+        self.listener = java_class(jni=jproxy, own=True)
+
+        _adapters[self._target] = self
+
+    def flush(self):
+
+        """Deliver the pending events now."""
+        if self._jhandler is None:
+            return
+        with JVM.jvm as (jvm, jenv):
+            jenv.CallVoidMethod(self._jhandler, jvm.BatchingHandler.flush)
+
+    def close(self):
+
+        """Deliver the pending events and stop the deliveries."""
+        jhandler = self._jhandler
+        if jhandler is None:
+            return
+        with JVM.jvm as (jvm, jenv):
+            jenv.CallVoidMethod(jhandler, jvm.BatchingHandler.close)
+        self._jhandler = None
+        _adapters.pop(self._target, None)
+        release_global_ref(jhandler)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+    def _event(self, jenv, jmethod, jargs):
+
+        # Return the (method name, arguments) of an event.
+
+        from ._jproxy import _describe_method, _argument_converter
+
+        method_id = jenv.FromReflectedMethod(jmethod).value
+        try:
+            name, converters = self._methods[method_id]
+        except KeyError:
+            name, params_signatures, _ = _describe_method(jenv, jmethod)
+            converters = tuple(_argument_converter(type_signature)
+                               for type_signature in params_signatures)
+            self._methods[method_id] = name, converters
+
+        args = []
+        for idx, convert in enumerate(converters):
+            with JFrame(jenv, 1):
+                args.append(convert(jenv, jenv.GetObjectArrayElement(jargs, idx)))
+        return name, tuple(args)
+
+    def _deliver(self, events):
+
+        if not self.columnar:
+            self.handler(events)
+            return
+        batch = {}
+        for name, args in events:
+            try:
+                columns = batch[name]
+            except KeyError:
+                columns = batch[name] = [[] for _ in args]
+            for column, arg in zip(columns, args):
+                column.append(arg)
+        self.handler(batch)
+
+    def __repr__(self):
+
+        return "<BatchingAdapter: {}>".format(self.interface)
+
+
+def deliver_batch(target, jmethods, jarguments, count, jenv):
+
+    """Deliver the events buffered by a BatchingHandler (the Java arrays of the
+    invoked Methods and of their arguments) to its adapter, in the JNI
+    environment of the delivering thread."""
+    try:
+        adapter = _adapters[target]
+    except KeyError: # Closed
+        return
+
+    events = []
+    for idx in range(count):
+        with JFrame(jenv, 2): # jmethod, jargs
+            events.append(adapter._event(jenv,
+                                         jenv.GetObjectArrayElement(jmethods, idx),
+                                         jenv.GetObjectArrayElement(jarguments, idx)))
+    adapter._deliver(events)
+
+
+_adapters = {}  # {adapter target: BatchingAdapter}
+
+# The targets of the adapters; unlike the id() of an adapter, never reused
+_counter = itertools.count(1)
@@ -2,101 +2,71 @@
 # Licensed under the BSD license
 # http://opensource.org/licenses/BSD-3-Clause
 
+import weakref
+from collections import OrderedDict
+
 from ...jvm.lib import annotate
 from ...jvm.lib import public
+from ...jvm.jframe import JFrame
 
-from ._constants  import EJavaModifiers
 from ._jvm        import JVM
 from ._jfield     import StaticJavaField, JavaField
-from ._jmethod    import StaticJavaMethod, JavaMethod
-from ._conversion import _signature_for_type, _signature_for_params, _type_names_for_params
+from ._jmethod    import StaticJavaMethod, JavaMethod, JavaConstructor
+from ._conversion import split_signature
+from ._metadata   import ClassMetadata, describe_class
 from ._exceptions import UnknownClassException
+from ._jref       import track_global_ref, untrack_global_ref, release_global_ref
 from .            import types as jtypes
 
 
 @public
 class JavaClass(type):
 
-    def __new__(cls, descriptor):
+    def __new__(cls, descriptor, loader=None):
 
-        try:
-            return _class_cache[descriptor]
-        except KeyError:
-            from ._jobject import JavaInstance
+        class_cache = JVM.jvm.class_cache
+        if loader is not None:
+            class_cache = class_cache.for_loader(loader)
+        java_class = class_cache.get(descriptor)
+        if java_class is not None:
+            return java_class
 
-            name_trans = JVM.jvm.JClass.name_trans
-            class_name = descriptor.encode("utf-8").translate(name_trans).decode("utf-8")
+        name_trans = JVM.jvm.JClass.name_trans
+        class_name = descriptor.encode("utf-8").translate(name_trans).decode("utf-8")
+
+        if class_cache.loader is None:
             try:
                 jclass = JVM.jvm.JClass.forName(class_name)
             except:
                 raise UnknownClassException(descriptor)
+            java_class = _new_class(cls, descriptor, jclass.handle)
+        else:
+            with JVM.jvm as (_, jenv), JFrame(jenv, 3): # java.lang.Class, class name, jclass
+                jclass = _load_class(jenv, loader.__javaobject__, class_name, descriptor)
+                java_class = _new_class(cls, descriptor, jclass, class_cache)
 
-            # Determine the alternate types for this class
-
-            # Best option is the type itself
-            alternates = ["L{};".format(descriptor)]
-
-            # Next preference is an interfaces
-            try:
-                java_interfaces = jclass.getInterfaces()
-            except:
-                raise RuntimeError("Couldn't get interfaces for '{}'".format(descriptor))
-            for java_interface in java_interfaces:
-                name = str(java_interface.getName())
-                alternates.append("L{};".format(name.replace('.', '/')))
-
-            # Then check all the superclasses
-            java_superclass = jclass
-            while True:
-                java_superclass = java_superclass.getSuperclass()
-                if not java_superclass: # <AK> was: java_superclass.value is None
-                    break
-                name = str(java_superclass.getName())
-                alternates.append("L{};".format(name.replace('.', '/')))
+        # Cache the class instance, so we don't have to recreate it
+        class_cache.add(descriptor, java_class)
+        return java_class
 
-            with JVM.jvm as (_, jenv):
-                __javaclass__ = jtypes.cast(jenv.NewGlobalRef(jclass.handle), jtypes.jclass)
+    def __init__(self, descriptor, loader=None):
 
-            # Cache the class instance, so we don't have to recreate it
-            bases = (JavaInstance,)
-            name  = descriptor
-            attrs = dict(_descriptor=descriptor,
-                         __javaclass__=__javaclass__,
-                         _alternates=alternates,
-                         _constructors=None,
-                         _members={
-                             "fields":  {},
-                             "methods": {},
-                         },
-                         _static={
-                             "fields":  {},
-                             "methods": {},
-                         })
-            _class_cache[descriptor] = java_class = super(JavaClass, cls).__new__(cls,
-                                                          str(name), bases, attrs)
-            return java_class
+        super(JavaClass, self).__init__(descriptor)
 
     def __getattr__(self, name):
 
         class_dict = self.__dict__
 
-        # First, try to find a field match
+        # Find a field or (failing that) a method match
         try:
-            field_wrapper = class_dict["_static"]["fields"][name]
+            member_wrapper = class_dict["_static"][name]
         except KeyError:
-            field_wrapper = class_dict["_static"]["fields"][name] = _cache_field(self, name, True)
+            member_wrapper = class_dict["_static"][name] = _cache_member(self, name, True)
 
-        if field_wrapper:
-            return field_wrapper.get()
-
-        # Then try to find a method match
-        try:
-            method_wrapper = class_dict["_static"]["methods"][name]
-        except KeyError:
-            method_wrapper = class_dict["_static"]["methods"][name] = _cache_methods(self, name, True)
-
-        if method_wrapper:
-            return method_wrapper
+        if isinstance(member_wrapper, StaticJavaField):
+            return member_wrapper.get()
+        elif member_wrapper:
+            return member_wrapper
 
         # If that didn't work, try an attribute on the object itself
         # try:
@@ -111,16 +81,25 @@ class JavaClass(type):
 
         # Try to find a field match
         try:
-            field_wrapper = class_dict["_static"]["fields"][name]
+            member_wrapper = class_dict["_static"][name]
         except KeyError:
-            field_wrapper = class_dict["_static"]["fields"][name] = _cache_field(self, name, True)
+            member_wrapper = class_dict["_static"][name] = _cache_member(self, name, True)
 
-        if field_wrapper:
-            return field_wrapper.set(value)
+        if isinstance(member_wrapper, StaticJavaField):
+            return member_wrapper.set(value)
 
         raise AttributeError("Java class '{}' has no attribute '{}'".format(
                              class_dict["_descriptor"], name))
 
+    def constructor(self, signature):
+
+        """Return a handle constructing instances through the public constructor
+        with the given full JNI signature, bypassing the overload resolution.
+
+        e.g. JavaClass("org/pybee/rubicon/test/Example").constructor("(II)V")
+        """
+        return _cache_constructors(self).signature(signature)
+
     def __repr__(self):
 
         return "<JavaClass: {}>".format(self._descriptor)
@@ -142,7 +121,8 @@ class JavaInterface(type):
             descriptor = bases[-1].__dict__["_descriptor"]
         attrs.update(_descriptor=descriptor,
                      _alternates=["L{};".format(descriptor)],
-                     _methods={})
+                     _methods={},
+                     _dispatchers={})
         java_class = super(JavaInterface, cls).__new__(cls, str(name), bases, attrs)
 
         name_trans = JVM.jvm.JClass.name_trans
@@ -156,22 +136,15 @@ class JavaInterface(type):
             java_class.__javaclass__ = jtypes.cast(jenv.NewGlobalRef(jclass.handle), jtypes.jclass)
             if not java_class.__javaclass__: # <AK> was: if jclass.value is None:
                 raise RuntimeError("Unable to create global reference to interface.")
+            track_global_ref(java_class.__javaclass__, "JavaInterface", descriptor)
 
         # Load the methods for the class
 
-        try:
-            java_methods = jclass.getMethods()
-        except:
-            raise RuntimeError("Couldn't get methods for '{}'".format(descriptor))
-        for java_method in java_methods:
-            modifiers = java_method.getModifiers()
-            is_public = EJavaModifiers.PUBLIC in modifiers
-            is_static = EJavaModifiers.STATIC in modifiers
-            if is_public and not is_static:
-                method_name   = str(java_method.getName())
-                method_params = java_method.getParameterTypes()
-                type_names = _type_names_for_params(method_params)
-                java_class._methods.setdefault(method_name, set()).add(type_names)
+        metadata = describe_class(descriptor, jclass.handle)
+        for method_name, overloads in metadata.methods.items():
+            for params_signature, _ in overloads:
+                java_class._methods.setdefault(method_name, set()).add(
+                    split_signature(params_signature))
 
         return java_class
 
@@ -180,26 +153,59 @@ class JavaInterface(type):
         return "<JavaInterface: {}>".format(self._descriptor)
 
 
+@public
+def invalidate_loader(loader):
+
+    """Drop the cached classes (with their member and method IDs) loaded by
+    the given class loader, e.g. when the plugin it has loaded is reloaded.
+    """
+    JVM.jvm.class_cache.invalidate(loader)
+
+
 @public
 @annotate(java_class=JavaClass, static=bool)
-def _cache_field(java_class, name, static):
+def _cache_member(java_class, name, static):
 
-    jclass = JVM.jvm.JClass(None, java_class.__javaclass__, own=False)
+    """Return the wrapper for the public field or (failing that) method
+    of the given name, or None if there is no such member.
 
-    try:
-        java_field = jclass.getField(name)
-    except: # NoSuchFieldException
+    The member is looked up in the index of the class metadata, so a miss
+    costs no JNI call.
+
+    The wrappers of instance members are also installed on the class, as
+    descriptors; later accesses are then made by the normal attribute lookup.
+    The wrappers of static members stay in the cache of the metaclass.
+    """
+    kind = java_class.__dict__["_metadata"].members.get(name, 0)
+    if static:
+        if kind & ClassMetadata.STATIC_FIELD:
+            return _cache_field(java_class, name, True)
+        elif kind & ClassMetadata.STATIC_METHOD:
+            return _cache_methods(java_class, name, True)
         return None
 
-    modifiers = java_field.getModifiers()
-    is_public = EJavaModifiers.PUBLIC in modifiers
-    is_static = EJavaModifiers.STATIC in modifiers
-    if not is_public or is_static != static:
+    if kind & ClassMetadata.FIELD:
+        wrapper = _cache_field(java_class, name, False)
+    elif kind & ClassMetadata.METHOD:
+        wrapper = _cache_methods(java_class, name, False)
+    else:
         return None
+    # Don't shadow the attributes of the Python side.
+    if not any(name in klass.__dict__ for klass in java_class.__mro__):
+        type.__setattr__(java_class, name, wrapper)
+    return wrapper
+
 
-    field_type = java_field.getType()
+@public
+@annotate(java_class=JavaClass, static=bool)
+def _cache_field(java_class, name, static):
+
+    metadata = java_class.__dict__["_metadata"]
+
+    signature = (metadata.static_fields if static else metadata.fields).get(name)
+    if signature is None:
+        return None
 
-    signature = _signature_for_type(field_type)
     if static:
         wrapper = StaticJavaField(java_class=java_class, name=name, signature=signature)
     else:
@@ -211,39 +217,10 @@ def _cache_field(java_class, name, static):
 @annotate(java_class=JavaClass, static=bool)
 def _cache_methods(java_class, name, static):
 
-    jclass = JVM.jvm.JClass(None, java_class.__javaclass__, own=False)
+    metadata = java_class.__dict__["_metadata"]
 
-    jclass_hash = jclass.hashCode()
-
-    methods_map = (_static_methods_cache if static else _instance_methods_cache).get(jclass_hash) # {str: {Method}}
-    if methods_map is None:
-        try:
-            java_methods = jclass.getMethods()
-        except:
-            return None
-
-        static_methods_map   = {} # {str: {Method}}
-        instance_methods_map = {} # {str: {Method}}
-
-        for java_method in java_methods:
-            modifiers = java_method.getModifiers()
-            is_public = EJavaModifiers.PUBLIC in modifiers
-            is_static = EJavaModifiers.STATIC in modifiers
-            if is_public:
-                method_name = str(java_method.getName())
-                alternatives_map = static_methods_map if is_static else instance_methods_map
-                alternatives = alternatives_map.get(method_name) # {Method}
-                if alternatives is None:
-                    alternatives_map[method_name] = alternatives = set()
-                alternatives.add(java_method)
-
-        _static_methods_cache[jclass_hash]   = static_methods_map
-        _instance_methods_cache[jclass_hash] = instance_methods_map
-
-        methods_map = static_methods_map if static else instance_methods_map
-
-    java_methods = methods_map.get(name)
-    if not java_methods:
+    overloads = (metadata.static_methods if static else metadata.methods).get(name)
+    if not overloads:
         return None
 
     if static:
@@ -251,23 +228,300 @@ def _cache_methods(java_class, name, static):
     else:
         wrapper = JavaMethod(java_class=java_class, name=name)
 
-    for java_method in java_methods:
-        params_java_types = java_method.getParameterTypes()
-        return_java_type  = java_method.getReturnType()
-        wrapper.add(_signature_for_params(params_java_types),
-                    _signature_for_type(return_java_type))
+    for params_signature, return_signature in overloads:
+        wrapper.add(params_signature, return_signature)
 
     return wrapper
 
 
-# A cache of known JavaClass instances. This is requried so that when
-# we do a return_cast() to a return type, we don't have to recreate
-# the class every time - we can re-use the existing class.
-_class_cache = {}
+@public
+@annotate(java_class=JavaClass)
+def _cache_constructors(java_class):
+
+    constructors = java_class.__dict__["_constructors"]
+    if constructors is not None:
+        return constructors
+
+    constructors = JavaConstructor(java_class=java_class)
+    for params_signature in java_class.__dict__["_metadata"].constructors:
+        constructors.add(params_signature)
+
+    type.__setattr__(java_class, "_constructors", constructors)
+    return constructors
+
+
+def _new_class(cls, descriptor, jclass, partition=None):
+
+    # partition is the class cache partition of the class loader the class has
+    # been loaded through, or None for the default class loader.
+
+    from ._jobject import JavaInstance
+
+    # Fetch the public members and the alternate types for this class
+    # (the type itself, then its interfaces, then all its superclasses).
+    metadata = describe_class(descriptor, jclass,
+                              None if partition is None else partition.loader)
+
+    with JVM.jvm as (_, jenv):
+        __javaclass__ = track_global_ref(jtypes.cast(jenv.NewGlobalRef(jclass), jtypes.jclass),
+                                         "JavaClass", descriptor)
+
+    bases = (JavaInstance,)
+    name  = descriptor
+    attrs = dict(__slots__=(),
+                 _descriptor=descriptor,
+                 __javaclass__=__javaclass__,
+                 _alternates=metadata.alternates,
+                 _metadata=metadata,
+                 _partition=partition,
+                 _handlers={},  # {type signature: ObjectHandler} (see TypeManager.get_handler)
+                 _constructors=None,
+                 _members={},  # {name: instance field or method wrapper, or None}
+                 _static={})   # {name: static field or method wrapper, or None}
+    java_class = type.__new__(cls, str(name), bases, attrs)
+    # The global reference is released when the class is garbage collected
+    # (e.g. after its eviction from the class cache), or when the JVM shuts down.
+    release = weakref.finalize(java_class, _release_class, __javaclass__)
+    release.atexit = False
+    type.__setattr__(java_class, "_release", release)
+    return java_class
+
+
+def _resolve_class(descriptor, declaring_class):
+
+    """Return the JavaClass of a type named by a member of the given class, as
+    resolved by the class loader of that class.
+
+    The types named by the classes of a class loader are cached in the same
+    partition of the class cache as them.
+    """
+    partition = declaring_class.__dict__.get("_partition")
+    if partition is None:
+        return JavaClass(descriptor)
+    java_class = partition.get(descriptor)
+    if java_class is not None:
+        return java_class
+
+    name_trans = JVM.jvm.JClass.name_trans
+    class_name = descriptor.encode("utf-8").translate(name_trans).decode("utf-8")
+
+    with JVM.jvm as (jvm, jenv), JFrame(jenv, 4): # jloader, java.lang.Class, class name, jclass
+        jloader = jenv.CallObjectMethod(declaring_class.__javaclass__, jvm.Class.getClassLoader)
+        jclass = _load_class(jenv, jloader, class_name, descriptor)
+        java_class = _new_class(JavaClass, descriptor, jclass, partition)
+
+    partition.add(descriptor, java_class)
+    return java_class
+
+
+def _load_class(jenv, jloader, class_name, descriptor):
+
+    """Load a class through Class.forName(class_name, true, loader).
+
+    Returns a local reference to the class.
+    """
+    try:
+        jclass_Class = jenv.FindClass(b"java/lang/Class")
+        jmethod_id = jenv.GetStaticMethodID(jclass_Class, b"forName",
+                                            b"(Ljava/lang/String;Z"
+                                            b"Ljava/lang/ClassLoader;)Ljava/lang/Class;")
+    except: # <AK> was: if jmethod_id.value is None:
+        raise RuntimeError("Couldn't find the Java method 'java/lang/Class.forName'")
+
+    jargs = JVM.jvm.JArguments(3)
+    jargs.arguments[0].l = jenv.NewStringUTF(class_name.encode("utf-8"))
+    jargs.arguments[1].z = True
+    jargs.arguments[2].l = jloader
+    try:
+        return jenv.CallStaticObjectMethod(jclass_Class, jmethod_id, jargs.arguments)
+    except:
+        raise UnknownClassException(descriptor)
+
+
+def _release_class(jclass):
+
+    release_global_ref(jclass)
+
+
+@public
+class ClassCache(object):
+
+    """The cache of the JavaClass instances, keyed by descriptor.
+
+    The cache is required so that when we do a return_cast() to a return type,
+    we don't have to recreate the class every time - we can re-use the existing
+    class. Its policy is set by the CLASS_CACHE configuration option:
+     * unbounded - the classes are kept until the JVM shuts down (the default)
+     * lru       - at most CLASS_CACHE_SIZE classes are kept; the least recently
+                   used ones are evicted
+     * weak      - the classes are kept as long as they are referenced elsewhere
+    Pinned classes are kept whatever the policy, and don't count toward the size.
+
+    An evicted class isn't disposed while it's still in use: its global reference
+    and its member wrappers are released when it is garbage collected. A later
+    JavaClass() call for its descriptor creates a new class.
+    """
+    UNBOUNDED = "unbounded"
+    LRU       = "lru"
+    WEAK      = "weak"
+
+    DEFAULT_SIZE = 256
+
+    def __init__(self):
+
+        self.loader   = None  # The weak global reference to the class loader of the partition
+        self._policy  = self.UNBOUNDED
+        self._maxsize = None
+        self._classes = {}  # {descriptor: JavaClass}
+        self._pinned  = {}  # {descriptor: JavaClass}
+        self._loaders = []  # [ClassCache] partitions of the classes of the other loaders
+
+    def start(self, policy=None, maxsize=None):
+
+        if policy is None or (policy == self.LRU and maxsize is None):
+            from ..__config__ import config
+            if policy is None:
+                policy = config.get("CLASS_CACHE", self.UNBOUNDED)
+            if policy == self.LRU and maxsize is None:
+                maxsize = int(config.get("CLASS_CACHE_SIZE", self.DEFAULT_SIZE))
+
+        self._configure(policy, maxsize)
+
+    def _configure(self, policy, maxsize):
+
+        if policy == self.UNBOUNDED:
+            classes = {}
+        elif policy == self.LRU:
+            if maxsize < 0:
+                raise ValueError("Invalid class cache size {}".format(maxsize))
+            classes = OrderedDict()
+        elif policy == self.WEAK:
+            classes = weakref.WeakValueDictionary()
+        else:
+            raise ValueError("Invalid class cache policy '{}'".format(policy))
+
+        self._policy  = policy
+        self._maxsize = maxsize if policy == self.LRU else None
+        self._classes = classes
+        self._pinned  = {}
+
+    def stop(self):
+
+        """Release the global references of all the cached classes
+        (and class loaders)."""
+        java_classes = list(self._classes.values()) + list(self._pinned.values())
+        self._classes = {}
+        self._pinned  = {}
+        for java_class in java_classes:
+            java_class.__dict__["_release"]()
+        loaders, self._loaders = self._loaders, []
+        for partition in loaders:
+            partition.stop()
+            partition._release_loader()
+
+    def for_loader(self, loader):
+
+        """Return the partition of the cache for the classes loaded by the given
+        class loader (an instance of java.lang.ClassLoader)."""
+        jloader = loader.__javaobject__
+        with JVM.jvm as (_, jenv):
+            for partition in self._loaders:
+                if jenv.IsSameObject(partition.loader, jloader):
+                    return partition
+            # The loader is referenced weakly, so that it can be collected
+            # (along with its classes) once its cached classes are released.
+            for partition in [partition for partition in self._loaders
+                              if jenv.IsSameObject(partition.loader, None)]:
+                self._loaders.remove(partition)
+                partition._release_loader()
+            partition = ClassCache()
+            partition._configure(self._policy, self._maxsize)
+            partition.loader = track_global_ref(jtypes.cast(jenv.NewWeakGlobalRef(jloader),
+                                                            jtypes.jobject), "ClassLoader")
+        self._loaders.append(partition)
+        return partition
+
+    def invalidate(self, loader):
+
+        """Drop all the classes loaded by the given class loader (e.g. when the
+        plugin it has loaded is reloaded), keeping the other ones.
+
+        As for the evicted classes, the dropped classes are released when they
+        are garbage collected.
+        """
+        jloader = loader.__javaobject__
+        with JVM.jvm as (_, jenv):
+            for partition in self._loaders:
+                if jenv.IsSameObject(partition.loader, jloader):
+                    break
+            else:
+                return
+        self._loaders.remove(partition)
+        partition._release_loader()
+
+    def _release_loader(self):
+
+        loader, self.loader = self.loader, None
+        with JVM.jvm as (_, jenv):
+            jenv.DeleteWeakGlobalRef(loader)
+        untrack_global_ref(loader)
+
+    @property
+    def policy(self):
+
+        return self._policy
+
+    @property
+    def maxsize(self):
+
+        return self._maxsize
+
+    def get(self, descriptor):
+
+        """Return the cached class of the given descriptor, or None."""
+        classes = self._classes
+        java_class = classes.get(descriptor)
+        if java_class is None:
+            return self._pinned.get(descriptor)
+        if self._policy == self.LRU:
+            classes.move_to_end(descriptor)
+        return java_class
+
+    def add(self, descriptor, java_class):
+
+        if descriptor in self._pinned:
+            self._pinned[descriptor] = java_class
+            return
+        classes = self._classes
+        classes[descriptor] = java_class
+        if self._policy == self.LRU:
+            while len(classes) > self._maxsize:
+                classes.popitem(last=False)
+
+    def discard(self, descriptor):
+
+        """Evict the class of the given descriptor, unless it is pinned."""
+        self._classes.pop(descriptor, None)
+
+    def pin(self, java_class):
+
+        """Keep a class in the cache whatever the policy (e.g. for the core classes)."""
+        descriptor = java_class.__dict__["_descriptor"]
+        self._classes.pop(descriptor, None)
+        self._pinned[descriptor] = java_class
+
+    def unpin(self, java_class):
+
+        descriptor = java_class.__dict__["_descriptor"]
+        if self._pinned.get(descriptor) is java_class:
+            del self._pinned[descriptor]
+            self.add(descriptor, java_class)
+
+    def __contains__(self, descriptor):
+
+        return descriptor in self._classes or descriptor in self._pinned
+
+    def __len__(self):
 
-# A 2 level maps of Class:
-#
-# Method name: Method for static methods
-_static_methods_cache   = {} # {Class, {str: {Method}}}
-# Method name: Method for instance methods
-_instance_methods_cache = {} # {Class, {str: {Method}}}
+        """The number of the classes the size bounds (the pinned ones don't count)."""
+        return len(self._classes)
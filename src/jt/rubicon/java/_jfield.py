@@ -19,7 +19,7 @@ class StaticJavaField(object):
         self.name        = name
         self.__signature = signature
         type_manager = JVM.jvm.type_manager
-        self.__thandler  = type_manager.get_handler(self.__signature)
+        self.__thandler  = type_manager.get_handler(self.__signature, self.java_class)
 
         with JVM.jvm as (jvm, jenv):
             try:
@@ -55,7 +55,7 @@ class JavaField(object):
         self.name        = name
         self.__signature = signature
         type_manager = JVM.jvm.type_manager
-        self.__thandler  = type_manager.get_handler(self.__signature)
+        self.__thandler  = type_manager.get_handler(self.__signature, self.java_class)
 
         with JVM.jvm as (jvm, jenv):
             try:
@@ -66,6 +66,17 @@ class JavaField(object):
                 raise RuntimeError("Couldn't find Java field '{}.{}'".format(
                                    self.java_class.__javaclass__, self.name))
 
+    def __get__(self, instance, owner=None):
+
+        if instance is None:
+            raise AttributeError("Java field '{}.{}' is not static".format(
+                                 self.java_class.__dict__["_descriptor"], self.name))
+        return self.__thandler.getInstance(self.__jfield_id, instance.__javaobject__)
+
+    def __set__(self, instance, value):
+
+        self.set(instance, value)
+
     def get(self, instance):
 
         return self.__thandler.getInstance(self.__jfield_id, instance.__javaobject__)
@@ -4,34 +4,155 @@
 
 from ...jvm.lib import annotate
 from ...jvm.lib import public
+from ...        import jni
 
 from ._jvm        import JVM
-from ._conversion import _convert_args_to_jargs, select_polymorph
+from ._conversion import select_polymorph, compile_polymorphs
+from ._conversion import compile_marshaller, _marshal_args, _release_args, _ArgumentsPool
+from ._conversion import split_signature, split_method_signature
+from ._conversion import _exact_types
+from ._jref       import track_global_ref
 
 
-@public
-class StaticJavaMethod(object):
+class _JavaPolymorphic(object):
 
-    """The representation for a static method on a Java object
+    """Common base for the Java callables which are resolved by argument types.
 
-    Constructor requires:
-     * java_class - the Python representation of the Java class
-     * name       - the method name being invoked.
+    Keeps the polymorphs (keyed by the JNI signature of their arguments), the
+    decision structure compiled from them for select_polymorph(), and an inline
+    cache of the resolutions already made.
+
+    The inline cache is keyed by the tuple of the Python types of the arguments;
+    a JavaClass is created once per Java class, so for Java objects the type also
+    stands for its _descriptor. The cache holds at most INLINE_CACHE_SIZE entries;
+    call sites seeing more argument type combinations than that (megamorphic ones)
+    resolve the remaining combinations through the decision structure on every call.
+
+    The arities having a single polymorph, taking only primitive arguments and
+    returning a primitive (or void), get a fast path which calls the JNI
+    Call<Type>Method function directly for arguments of the exact Python types
+    passed as its parameter types; any other call takes the general path.
+    The fast paths are compiled (unless FAST_PATH is false) by _fast_paths(),
+    for subclasses defining the JNI function pattern in _JNI_CALL.
     """
+    INLINE_CACHE_SIZE = 8
+    FAST_PATH = True
+
+    _JNI_CALL = None
+
     def __init__(self, java_class, name):
 
         self.java_class   = java_class
         self.name         = name
         self.__polymorphs = {}
+        self.__dispatch   = None
+        self.__icache     = {}
+        self.__fast       = None
+
+    def _add_polymorph(self, params_signature, polymorph):
+
+        # Every polymorph carries the plan marshalling its arguments,
+        # and the pool of the buffers they are marshalled into.
+        match_types = split_signature(params_signature)
+        polymorph["marshaller"] = compile_marshaller(match_types)
+        polymorph["jargs_pool"] = _ArgumentsPool(len(match_types))
+        self.__polymorphs[params_signature] = polymorph
+        self.__dispatch = None
+        self.__icache.clear()
+        self.__fast = None
+
+    def _fast_paths(self):
+
+        """Return the fast paths, as a dictionary of invokers indexed by arity."""
+        fast = self.__fast
+        if fast is None:
+            fast = self.__fast = self._compile_fast_paths()
+        return fast
+
+    def _compile_fast_paths(self):
+
+        fast = {}
+        if not self.FAST_PATH or self._JNI_CALL is None:
+            return fast
+
+        by_arity = {}
+        for params_signature, polymorph in self.__polymorphs.items():
+            by_arity.setdefault(len(polymorph["marshaller"]), []).append(
+                (split_signature(params_signature), polymorph))
+
+        for arity, polymorphs in by_arity.items():
+            if len(polymorphs) != 1:
+                continue
+            match_types, polymorph = polymorphs[0]
+            return_signature = polymorph["return_signature"]
+            if (return_signature not in _jni_type_names or
+                not all(type_name in _jni_type_names for type_name in match_types)):
+                continue
+            jni_call = getattr(jni.JNIEnv,
+                               self._JNI_CALL.format(_jni_type_names[return_signature]))
+            fast[arity] = _compile_fast_path(jni_call, polymorph["jmethod_id"],
+                                             match_types, polymorph["jargs_pool"])
+        return fast
+
+    def _select_polymorph(self, args):
+
+        """Return the (match_types, polymorph) resolved for the arguments."""
+        key = tuple(map(type, args))
+        try:
+            return self.__icache[key]
+        except KeyError:
+            pass
+
+        dispatch = self.__dispatch
+        if dispatch is None:
+            dispatch = self.__dispatch = compile_polymorphs(self.__polymorphs)
+        arg_sig, match_types, polymorph = select_polymorph(self.__polymorphs, args, dispatch)
+
+        resolved = (match_types, polymorph)
+        if len(self.__icache) < self.INLINE_CACHE_SIZE:
+            self.__icache[key] = resolved
+        return resolved
+
+    def _pinned_polymorph(self, signature):
+
+        """Return the (match_types, polymorph) having exactly the full JNI signature."""
+        params_signature, return_signature = split_method_signature(signature)
+        polymorph = self.__polymorphs.get(params_signature)
+        if polymorph is None or polymorph["return_signature"] != return_signature:
+            raise ValueError("Can't find Java method '{}.{}' with signature '{}'. "
+                             "Options are: {}".format(self.java_class.__dict__["_descriptor"],
+                                                      self.name, signature,
+                                                      ", ".join(sorted(self._signatures()))))
+        return split_signature(params_signature), polymorph
+
+    def _signatures(self):
+
+        return ["({}){}".format(params_signature, polymorph["return_signature"])
+                for params_signature, polymorph in self.__polymorphs.items()]
+
+    @property
+    def _polymorphs(self):
+
+        return self.__polymorphs
+
+
+@public
+class StaticJavaMethod(_JavaPolymorphic):
+
+    """The representation for a static method on a Java object
 
+    Constructor requires:
+     * java_class - the Python representation of the Java class
+     * name       - the method name being invoked.
+    """
     def add(self, params_signature, return_signature):
 
-        if params_signature in self.__polymorphs:
+        if params_signature in self._polymorphs:
             return
 
         type_manager = JVM.jvm.type_manager
-        thandler = type_manager.get_handler(return_signature)
-	
+        thandler = type_manager.get_handler(return_signature, self.java_class)
+
         full_signature = "({}){}".format(params_signature, return_signature)
 
         with JVM.jvm as (jvm, jenv):
@@ -44,35 +165,57 @@ class StaticJavaMethod(object):
                                    "'{}'".format(self.java_class.__dict__["_descriptor"],
                                                  self.name, full_signature))
 
-        self.__polymorphs[params_signature] = dict(thandler=thandler,
-                                                   jmethod_id=jmethod_id)
+        self._add_polymorph(params_signature, dict(thandler=thandler,
+                                                   jmethod_id=jmethod_id,
+                                                   return_signature=return_signature))
+
+    def signature(self, signature):
+
+        """Return a handle calling the overload with the given full JNI signature.
+
+        e.g. Example.tripler.signature("(I)I")
+        """
+        match_types, polymorph = self._pinned_polymorph(signature)
+        return StaticJavaMethodHandle(self, signature, match_types, polymorph)
+
+    _JNI_CALL = "CallStatic{}Method"
 
     def __call__(self, *args):
 
+        invoke = self._fast_paths().get(len(args))
+        if invoke is not None:
+            result = invoke(self.java_class.__javaclass__, args)
+            if result is not _MISS:
+                return result
+
         try:
-            arg_sig, match_types, polymorph = select_polymorph(self.__polymorphs, args)
-            jmethod_id = polymorph["jmethod_id"]
-            jargs = _convert_args_to_jargs(args, match_types)
-            thandler = polymorph["thandler"]
-            return thandler.callStatic(jmethod_id, self.java_class.__javaclass__, jargs)
+            match_types, polymorph = self._select_polymorph(args)
         except KeyError as exc:
             raise ValueError("Can't find Java static method '{}.{}' matching argument signature "
                              "'{}'. Options are: {}".format(self.java_class.__dict__["_descriptor"],
-                                                            self.name, exc, self.__polymorphs.keys()))
+                                                            self.name, exc, self._polymorphs.keys()))
+        pool = polymorph["jargs_pool"]
+        jargs, jlocals = _marshal_args(polymorph["marshaller"], args, pool)
+        try:
+            return polymorph["thandler"].callStatic(polymorph["jmethod_id"],
+                                                    self.java_class.__javaclass__, jargs)
+        finally:
+            _release_args(pool, jargs, jlocals)
 
 @public
-class JavaMethod(object):
+class JavaMethod(_JavaPolymorphic):
 
-    def __init__(self, java_class, name):
+    def __get__(self, instance, owner=None):
 
-        self.java_class   = java_class
-        self.name         = name
-        self.__polymorphs = {}
+        if instance is None:
+            raise AttributeError("Java method '{}.{}' is not static".format(
+                                 self.java_class.__dict__["_descriptor"], self.name))
+        return BoundJavaMethod(instance, self)
 
     def add(self, params_signature, return_signature):
 
         type_manager = JVM.jvm.type_manager
-        thandler = type_manager.get_handler(return_signature)
+        thandler = type_manager.get_handler(return_signature, self.java_class)
 
         full_signature = "({}){}".format(params_signature, return_signature)
 
@@ -86,31 +229,262 @@ class JavaMethod(object):
                                    "'{}'".format(self.java_class.__dict__["_descriptor"],
                                                  self.name, full_signature))
 
-        self.__polymorphs[params_signature] = dict(thandler=thandler,
-                                                   jmethod_id=jmethod_id)
+        self._add_polymorph(params_signature, dict(thandler=thandler,
+                                                   jmethod_id=jmethod_id,
+                                                   return_signature=return_signature))
+
+    def signature(self, signature):
+
+        """Return a handle calling the overload with the given full JNI signature.
+
+        The handle is called with the instance as its first argument.
+        """
+        match_types, polymorph = self._pinned_polymorph(signature)
+        return JavaMethodHandle(self, signature, match_types, polymorph)
+
+    _JNI_CALL = "Call{}Method"
 
     def __call__(self, instance, *args):
 
+        invoke = self._fast_paths().get(len(args))
+        if invoke is not None:
+            result = invoke(instance, args)
+            if result is not _MISS:
+                return result
+
         try:
-            arg_sig, match_types, polymorph = select_polymorph(self.__polymorphs, args)
-            jmethod_id = polymorph["jmethod_id"]
-            jargs = _convert_args_to_jargs(args, match_types)
-            thandler = polymorph["thandler"]
-            return thandler.callInstance(jmethod_id, instance, jargs)
+            match_types, polymorph = self._select_polymorph(args)
         except KeyError as exc:
             raise ValueError("Can't find Java instance method '{}.{}' matching argument signature "
                              "'{}'. Options are: {}".format(self.java_class.__dict__["_descriptor"],
-                                                            self.name, exc, self.__polymorphs.keys()))
+                                                            self.name, exc, self._polymorphs.keys()))
+        pool = polymorph["jargs_pool"]
+        jargs, jlocals = _marshal_args(polymorph["marshaller"], args, pool)
+        try:
+            return polymorph["thandler"].callInstance(polymorph["jmethod_id"], instance, jargs)
+        finally:
+            _release_args(pool, jargs, jlocals)
+
+
+@public
+class JavaConstructor(_JavaPolymorphic):
+
+    """The representation for the public constructors of a Java class
+
+    Constructor requires:
+     * java_class - the Python representation of the Java class
+
+    Calling it returns a new global reference to the constructed Java object.
+    """
+    def __init__(self, java_class):
+
+        super(JavaConstructor, self).__init__(java_class, "<init>")
+
+    def add(self, params_signature):
+
+        # We now know that a constructor exists, and we know the signature
+        # of that constructor. However, we won't resolve the method
+        # implementing the constructor until we need it.
+        self._add_polymorph(params_signature, dict(jmethod_id=None,
+                                                   return_signature="V"))
+
+    def signature(self, signature):
+
+        """Return a handle constructing instances through the constructor with
+        the given full JNI signature.
+        """
+        match_types, polymorph = self._pinned_polymorph(signature)
+        self._resolve(match_types, polymorph)
+        return JavaConstructorHandle(self, signature, match_types, polymorph)
+
+    def __call__(self, *args):
+
+        try:
+            match_types, polymorph = self._select_polymorph(args)
+        except KeyError as exc:
+            raise ValueError("Can't find constructor matching argument signature {}. "
+                             "Options are: {}".format(exc, ", ".join(self._polymorphs.keys())))
+
+        jmethod_id = self._resolve(match_types, polymorph)
+        return self._new_object(jmethod_id, polymorph, args)
+
+    def _resolve(self, match_types, polymorph):
+
+        jmethod_id = polymorph["jmethod_id"]
+        if jmethod_id is None:
+            sig = "".join(match_types)
+            with JVM.jvm as (jvm, jenv):
+                try:
+                    jmethod_id = jenv.GetMethodID(self.java_class.__javaclass__, b"<init>",
+                                                  "({})V".format(sig).encode("utf-8"))
+                except: # <AK> was: if constructor is None:
+                    raise RuntimeError("Couldn't get method ID for {} constructor of {}".format(
+                                       sig, self.java_class))
+            polymorph["jmethod_id"] = jmethod_id
+        return jmethod_id
+
+    def _new_object(self, jmethod_id, polymorph, args):
+
+        from ...jvm.jframe import JFrame
+        from .             import types as jtypes
+
+        # Local references created by the marshalling are released with the frame.
+        pool = polymorph["jargs_pool"]
+        with JVM.jvm as (jvm, jenv), JFrame(jenv, 1):
+            jargs, _ = _marshal_args(polymorph["marshaller"], args, pool)
+            try:
+                jobject = jenv.NewObject(self.java_class.__javaclass__, jmethod_id,
+                                         jargs.arguments)
+            except: # <AK> was: if not jobject:
+                raise RuntimeError("Couldn't instantiate Java instance of {}.".format(
+                                   self.java_class))
+            finally:
+                pool.release(jargs)
+            try:
+                jobject = jtypes.cast(jenv.NewGlobalRef(jobject), jtypes.jclass)
+            except: # <AK> was: if jobject.value is None:
+                raise RuntimeError("Unable to create global reference to instance.")
+        return track_global_ref(jobject, "JavaInstance", self.java_class.__dict__["_descriptor"])
+
+
+# JNI names of the primitive (and void) types, i.e. the <Type> of the
+# Call<Type>Method and CallStatic<Type>Method functions.
+_jni_type_names = {
+    "V": "Void",
+    "Z": "Boolean",
+    "C": "Char",
+    "B": "Byte",
+    "S": "Short",
+    "I": "Int",
+    "J": "Long",
+    "F": "Float",
+    "D": "Double",
+}
+
+# Returned by the fast path invokers for arguments they don't accept.
+_MISS = object()
+
+
+def _compile_fast_path(jni_call, jmethod_id, match_types, pool):
+
+    """Compile the invoker calling jni_call(jenv, target, jmethod_id, jvalues)
+    directly, for arguments of the exact types passed as match_types.
+
+    The invoker returns _MISS, without calling anything, if any of the
+    arguments is of another type.
+    """
+    if not match_types:
+        def invoke(target, args):
+            return jni_call(JVM.jenv, target, jmethod_id, None)
+        return invoke
+
+    plan = tuple(zip(map(_exact_types, match_types), compile_marshaller(match_types)))
+
+    def invoke(target, args):
+        for arg, (arg_types, _) in zip(args, plan):
+            if type(arg) not in arg_types:
+                return _MISS
+        jargs = pool.acquire()
+        try:
+            jvalues = jargs.arguments
+            for pos, (_, setter) in enumerate(plan):
+                setter(jvalues[pos], args[pos])
+            return jni_call(JVM.jenv, target, jmethod_id, jvalues)
+        finally:
+            pool.release(jargs)
+
+    return invoke
 
 
 @public
 class BoundJavaMethod(object):
 
+    __slots__ = ('instance', 'method')
+
     def __init__(self, instance, method):
 
         self.instance = instance
         self.method   = method
 
+    def signature(self, signature):
+
+        """Return the handle for the given full JNI signature, bound to the same instance.
+
+        e.g. Example().get_int_field.signature("()I")
+        """
+        return BoundJavaMethod(self.instance, self.method.signature(signature))
+
     def __call__(self, *args):
 
         return self.method(self.instance, *args)
+
+
+class _JavaMethodHandle(object):
+
+    """Common base for the Java callables pinned to a single JNI signature.
+
+    The method ID, the return type handler and the argument marshalling plan
+    are resolved once, when the handle is created; calling a handle doesn't go
+    through the overload resolution.
+    """
+    __slots__ = ('method', 'signature', '_jmethod_id', '_thandler', '_marshaller', '_jargs_pool',
+                 '_polymorph')
+
+    def __init__(self, method, signature, match_types, polymorph):
+
+        self.method      = method
+        self.signature   = signature
+        self._jmethod_id = polymorph["jmethod_id"]
+        self._thandler   = polymorph.get("thandler")
+        self._marshaller = polymorph["marshaller"]
+        self._jargs_pool = polymorph["jargs_pool"]
+        self._polymorph  = polymorph
+
+    def __repr__(self):
+
+        return "<{}: {}.{}{}>".format(self.__class__.__name__,
+                                      self.method.java_class.__dict__["_descriptor"],
+                                      self.method.name, self.signature)
+
+
+@public
+class StaticJavaMethodHandle(_JavaMethodHandle):
+
+    __slots__ = ()
+
+    def __call__(self, *args):
+
+        pool = self._jargs_pool
+        jargs, jlocals = _marshal_args(self._marshaller, args, pool)
+        try:
+            return self._thandler.callStatic(self._jmethod_id,
+                                             self.method.java_class.__javaclass__, jargs)
+        finally:
+            _release_args(pool, jargs, jlocals)
+
+
+@public
+class JavaMethodHandle(_JavaMethodHandle):
+
+    __slots__ = ()
+
+    def __call__(self, instance, *args):
+
+        pool = self._jargs_pool
+        jargs, jlocals = _marshal_args(self._marshaller, args, pool)
+        try:
+            return self._thandler.callInstance(self._jmethod_id, instance, jargs)
+        finally:
+            _release_args(pool, jargs, jlocals)
+
+
+@public
+class JavaConstructorHandle(_JavaMethodHandle):
+
+    __slots__ = ()
+
+    def __call__(self, *args):
+
+        constructors = self.method
+        jobject = constructors._new_object(self._jmethod_id, self._polymorph, args)
+        return constructors.java_class(jni=jobject, own=True)
@@ -5,23 +5,25 @@
 from ...jvm.lib import py2compatible
 from ...jvm.lib import annotate
 from ...jvm.lib import public
-from ...jvm.jframe import JFrame
 
-from ._constants  import EJavaModifiers
 from ._jvm        import JVM
-from ._jmethod    import BoundJavaMethod
-from ._conversion import _convert_args_to_jargs, select_polymorph, _signature_for_params
-from ._jclass     import _cache_field, _cache_methods
-from .            import types as jtypes
+from ._jfield     import JavaField
+from ._jclass     import _cache_member, _cache_constructors
+from ._jref       import release_global_ref
 
 
 @public
 @py2compatible
 class JavaInstance(object):
 
+    # The members are looked up on the class; an instance only holds its reference.
+    __slots__ = ('__javaobject__', '_as_parameter_', '_own', '__weakref__')
+
     def __init__(self, *args, **kwargs):
 
         jobject = kwargs.pop("jni", None)
+        own     = kwargs.pop("own", False)
+        jenv    = kwargs.pop("jenv", None)  # Of the calling thread, if not the JVM's
 
         if kwargs:
             raise ValueError("Can't construct instance of {} using keyword arguments.".format(
@@ -29,62 +31,12 @@ class JavaInstance(object):
 
         if jobject is None:
 
-            jclass = JVM.jvm.JClass(None, self.__class__.__javaclass__, own=False)
-
-            # Check that we know the constructors for the class
-
-            class_dict = self.__class__.__dict__
-
-            constructors = class_dict["_constructors"]
-            if constructors is None:
-
-                constructors = {}
-
-                try:
-                    jconstructors = jclass.getConstructors()
-                except:
-                    raise RuntimeError("Couldn't get constructor for '{}'".format(self))
-                for jconstructor in jconstructors:
-                    modifiers = jconstructor.getModifiers()
-                    is_public = EJavaModifiers.PUBLIC in modifiers
-                    if is_public:
-                        # We now know that a constructor exists, and we know the signature
-                        # of those constructors. However, we won't resolve the method
-                        # implementing the constructor until we need it.
-                        ctor_params = jconstructor.getParameterTypes()
-                        constructors[_signature_for_params(ctor_params)] = None
-
-                type.__setattr__(self.__class__, "_constructors", constructors)
-
-            # Invoke the JNI constructor
-
-            try:
-                arg_sig, match_types, constructor = select_polymorph(constructors, args)
-                if constructor is None:
-                    sig = "".join(match_types)
-                    with JVM.jvm as (jvm, jenv):
-                        try:
-                            constructor = jenv.GetMethodID(jclass.handle, b"<init>", "({})V".format("".join(sig)).encode("utf-8"))
-                        except: # <AK> was: if constructor is None:
-                            raise RuntimeError("Couldn't get method ID for {} constructor of {}".format(
-                                               sig, self.__class__))
-                    class_dict["_constructors"][sig] = constructor
-
-                with JVM.jvm as (jvm, jenv), JFrame(jenv, 1):
-                    try:
-                        jargs = _convert_args_to_jargs(args, match_types)
-                        jobject = jenv.NewObject(jclass.handle, constructor, jargs.arguments)
-                    except: # <AK> was: if not jobject:
-                        raise RuntimeError("Couldn't instantiate Java instance of {}.".format(
-                                           self.__class__))
-                    try:
-                        jobject = jtypes.cast(jenv.NewGlobalRef(jobject), jtypes.jclass)
-                    except: # <AK> was: if jobject.value is None:
-                        raise RuntimeError("Unable to create global reference to instance.")
-
-            except KeyError as exc:
-                raise ValueError("Can't find constructor matching argument signature {}. "
-                                 "Options are: {}".format(exc, ", ".join(constructors.keys())))
+            # Check that we know the constructors for the class,
+            # and invoke the JNI constructor
+
+            constructors = _cache_constructors(self.__class__)
+            jobject = constructors(*args)
+            own = True
 
         # This is just:
         #    self.__javaobject__ = jobject
@@ -94,6 +46,23 @@ class JavaInstance(object):
         object.__setattr__(self, "__javaobject__", jobject)
         object.__setattr__(self, "_as_parameter_", jobject)
 
+        # An owned global reference is released when the instance is
+        # garbage collected, through the release queue of the JVM.
+        object.__setattr__(self, "_own", own)
+        if own:
+            JVM.jvm.release_queue.safe_point(jenv)
+
+    def __del__(self):
+
+        # Don't use getattr(), which would look for a Java field
+        # if the instance hasn't been initialized.
+        try:
+            own = object.__getattribute__(self, "_own")
+        except AttributeError:
+            return
+        if own:
+            release_global_ref(self.__javaobject__)
+
     def __str__(self):
 
         return self.toString()
@@ -106,39 +75,39 @@ class JavaInstance(object):
 
         class_dict = self.__class__.__dict__
 
-        # First try to find a field match
+        # Find a field or (failing that) a method match
         try:
-            field_wrapper = class_dict["_members"]["fields"][name]
+            member_wrapper = class_dict["_members"][name]
         except KeyError:
-            field_wrapper = class_dict["_members"]["fields"][name] = _cache_field(self.__class__, name, False)
+            member_wrapper = class_dict["_members"][name] = _cache_member(self.__class__, name, False)
 
-        if field_wrapper:
-            return field_wrapper.get(self)
-
-        # Then try to find a method match
-        try:
-            method_wrapper = class_dict["_members"]["methods"][name]
-        except KeyError:
-            method_wrapper = class_dict["_members"]["methods"][name] = _cache_methods(self.__class__, name, False)
-
-        if method_wrapper:
-            return BoundJavaMethod(self, method_wrapper)
+        if member_wrapper is not None:
+            return member_wrapper.__get__(self, self.__class__)
 
         raise AttributeError("'{}' Java object has no attribute '{}'".format(
                              self.__class__.__name__, name))
 
     def __setattr__(self, name, value):
 
+        # The fields already discovered are installed on the class as data
+        # descriptors (see _cache_member); the normal assignment calls them.
+        for klass in self.__class__.__mro__:
+            attr = klass.__dict__.get(name)
+            if attr is not None:
+                if hasattr(type(attr), "__set__"):
+                    return object.__setattr__(self, name, value)
+                break
+
         class_dict = self.__class__.__dict__
 
         # Try to find a field match.
         try:
-            field_wrapper = class_dict["_members"]["fields"][name]
+            member_wrapper = class_dict["_members"][name]
         except KeyError:
-            field_wrapper = class_dict["_members"]["fields"][name] = _cache_field(self.__class__, name, False)
+            member_wrapper = class_dict["_members"][name] = _cache_member(self.__class__, name, False)
 
-        if field_wrapper:
-            return field_wrapper.set(self, value)
+        if isinstance(member_wrapper, JavaField):
+            return member_wrapper.__set__(self, value)
 
         raise AttributeError("'{}' Java object has no attribute '{}'".format(
                              self.__class__.__name__, name))
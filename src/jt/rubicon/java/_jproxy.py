@@ -5,70 +5,125 @@
 from __future__ import absolute_import
 
 import traceback
+import weakref
 
 from ...jvm.lib import annotate
 from ...jvm.lib import public
-from ...        import jni
 from ...jvm.jframe  import JFrame
 from ...jvm.jstring import JString
 
-from ._jvm    import JVM
-from ._jclass import JavaClass
+from ._jvm        import JVM
+from ._jclass     import JavaClass
+from ._conversion import _ArgumentsPool, signature_for_type_name
+from ._conversion import _argument_setters
+from ._jref       import track_global_ref, wrap_instance
+from ._jref       import release_global_ref, release_weak_global_ref
 from .        import types as jtypes
 
 
 @public
 class JavaProxy(object):
 
-    def __init__(self):
+    """The base of the Python implementations of Java interfaces.
 
-        # Create a Java-side proxy for this Python-side object
+    While Python references the proxy, it holds the Java proxy instance with a
+    global reference. When Python drops it, the proxy is kept alive (detached)
+    for as long as Java may call it: it then holds the Java proxy instance with
+    a weak global reference only, and is released when the JVM collects the Java
+    proxy instance (by the ProxyHandler.release callback, or the finalizer of
+    the trampoline class).
+    """
 
-        jclass = JVM.jvm.JClass(None, self.__class__.__javaclass__, own=False)
+    def __init__(self):
 
-        with JVM.jvm as (jvm, jenv), JFrame(jenv, 4): # cloader, interfaces, ihandler, jproxy
-            try:
-                cloader  = jenv.CallObjectMethod(jclass.handle, jvm.Class.getClassLoader)
-                interfaces = jenv.NewObjectArray(1, jvm.Class.Class)
-                jenv.SetObjectArrayElement(interfaces, 0, jclass.handle)
-                jargs = jni.new_array(jni.jvalue, 1)
-                jargs[0].j = id(self)
-                ihandler = jenv.NewObject(jvm.jt_reflect_ProxyHandler.Class,
-                                          jvm.jt_reflect_ProxyHandler.Constructor, jargs)
-                jargs = jni.new_array(jni.jvalue, 3)
-                jargs[0].l = cloader
-                jargs[1].l = interfaces
-                jargs[2].l = ihandler
-                jproxy = jenv.CallStaticObjectMethod(jvm.Proxy.Class,
-                                                     jvm.Proxy.newProxyInstance, jargs)
-            except:
-                raise RuntimeError("Unable to create proxy instance.")
-            if not jproxy: # <AK> was: if jproxy.value is None:
-                raise RuntimeError("Unable to create proxy instance.")
-            try:
-                jproxy = jtypes.cast(jenv.NewGlobalRef(jproxy), jtypes.jclass)
-            except: # <AK> was: if jproxy.value is None:
-                raise RuntimeError("Unable to create global reference to proxy instance.")
+        # Create a Java-side proxy for this Python-side object: an instance of
+        # the trampoline class generated for this class if there is one, or a
+        # java.lang.reflect.Proxy.
+
+        trampoline = JVM.jvm.trampolines.get(self.__class__)
+        if trampoline is not None:
+            jproxy = trampoline.new(id(self))
+        else:
+            jproxy = _new_reflect_proxy(self)
+        track_global_ref(jproxy, "JavaProxy", self._descriptor)
         self.__javaobject__ = jproxy
         self._as_parameter_ = jproxy
 
         # Register this Python instance with the proxy cache
         # This is a weak reference because _proxy_cache is a registry,
         # not an actual user of proxy objects. If all references to the
-        # proxy disappear, the proxy cache should be cleaned to avoid
-        # leaking memory on objects that aren't being used.
+        # proxy disappear, the proxy is detached (see __del__).
         _proxy_cache[id(self)] = self
 
-    # def __del__(self):
-    #
-    #     # If this object is garbage collected, remove it from the proxy cache.
-    #     del _proxy_cache[id(self)]
+    def __del__(self):
+
+        # Python doesn't reference this object anymore, but Java may still do.
+        # Resurrect it into the detached proxies, downgrading the reference to
+        # the Java proxy instance to a weak one, so that the JVM can collect it;
+        # release_proxy() drops it then.
+        try:
+            jproxy = self.__javaobject__
+        except AttributeError: # Not initialized
+            return
+        jvm = JVM.jvm
+        if jvm is None: # The proxy is gone with the JVM
+            return
+        _proxy_cache.pop(id(self), None)
+        with jvm as (_, jenv):
+            jweak = jtypes.cast(jenv.NewWeakGlobalRef(jproxy), jtypes.jobject)
+        release_global_ref(jproxy)
+        if not jweak:
+            return
+        track_global_ref(jweak, "JavaProxy", self._descriptor)
+        self.__javaobject__ = jweak
+        self._as_parameter_ = jweak
+        _detached_proxies[id(self)] = self
 
     def __repr__(self):
 
         return "<{}: {}>".format(self.__class__.__name__, self.__javaobject__.value)
 
 
+def _new_reflect_proxy(pyinstance):
+
+    jclass = JVM.jvm.JClass(None, pyinstance.__class__.__javaclass__, own=False)
+
+    with JVM.jvm as (jvm, jenv), JFrame(jenv, 4): # cloader, interfaces, ihandler, jproxy
+        handler_args = _handler_args_pool.acquire()
+        proxy_args   = _proxy_args_pool.acquire()
+        try:
+            cloader  = jenv.CallObjectMethod(jclass.handle, jvm.Class.getClassLoader)
+            interfaces = jenv.NewObjectArray(1, jvm.Class.Class)
+            jenv.SetObjectArrayElement(interfaces, 0, jclass.handle)
+            jargs = handler_args.arguments
+            jargs[0].j = id(pyinstance)
+            ihandler = jenv.NewObject(jvm.jt_reflect_ProxyHandler.Class,
+                                      jvm.jt_reflect_ProxyHandler.Constructor, jargs)
+            jargs = proxy_args.arguments
+            jargs[0].l = cloader
+            jargs[1].l = interfaces
+            jargs[2].l = ihandler
+            jproxy = jenv.CallStaticObjectMethod(jvm.Proxy.Class,
+                                                 jvm.Proxy.newProxyInstance, jargs)
+        except:
+            raise RuntimeError("Unable to create proxy instance.")
+        finally:
+            _handler_args_pool.release(handler_args)
+            _proxy_args_pool.release(proxy_args)
+        if not jproxy: # <AK> was: if jproxy.value is None:
+            raise RuntimeError("Unable to create proxy instance.")
+        try:
+            jproxy = jtypes.cast(jenv.NewGlobalRef(jproxy), jtypes.jclass)
+        except: # <AK> was: if jproxy.value is None:
+            raise RuntimeError("Unable to create global reference to proxy instance.")
+    return jproxy
+
+
+# Argument buffers of the ProxyHandler constructor and of Proxy.newProxyInstance.
+_handler_args_pool = _ArgumentsPool(1)
+_proxy_args_pool   = _ArgumentsPool(3)
+
+
 @public
 def dispatch(instance, method, args):
 
@@ -89,7 +144,7 @@ def dispatch(instance, method, args):
     interface methods with no return value.
     """
     try:
-        pyinstance = _proxy_cache[instance]
+        pyinstance = proxy_instance(instance)
         signatures = pyinstance._methods.get(method)
         if len(signatures) != 1:
             raise RuntimeError("Can't handle multiple prototypes for same method name (yet!)")
@@ -107,6 +162,319 @@ def dispatch(instance, method, args):
         raise RuntimeError("Unknown Python instance {}".format(instance))
 
 
+@public
+def dispatch_method(target, jmethod, jargs, jenv):
+
+    """Invoke the Python implementation of a Java interface method.
+
+    This is the dispatch mechanism of ProxyHandler.invoke: target is the ID of
+    the proxy, jmethod the java.lang.reflect.Method being invoked, jargs the
+    Java array of its arguments and jenv the JNI environment of the calling
+    thread. The dispatcher of the method is compiled on its first call, and
+    cached by the proxy class per method ID.
+
+    Returns a new local reference to the result, boxed if the method returns
+    a primitive, or None. The exceptions raised by the Python implementation
+    propagate, for the caller to throw them into Java.
+    """
+    try:
+        pyinstance = proxy_instance(target)
+    except KeyError:
+        raise RuntimeError("Unknown Python instance {}".format(target))
+
+    method_id = jenv.FromReflectedMethod(jmethod)
+    dispatchers = pyinstance._dispatchers
+    try:
+        dispatcher = dispatchers[method_id.value]
+    except KeyError:
+        dispatcher = dispatchers[method_id.value] = _CallbackDispatcher(
+                                                    type(pyinstance), jenv, jmethod)
+
+    argcnt = jenv.GetArrayLength(jargs) if jargs else 0
+    with JFrame(jenv, argcnt):
+        args = [jenv.GetObjectArrayElement(jargs, idx) for idx in range(argcnt)]
+        result = dispatcher(pyinstance, jenv, args)
+    # Outside of the frame, so that the reference to the result survives it
+    return dispatcher.marshal(jenv, result)
+
+
+class _CallbackDispatcher(object):
+
+    """The dispatcher of a Java interface method to its Python implementation.
+
+    It holds the Python function implementing the method, the converters of
+    the method's arguments and the marshaller of its result, so that a callback
+    doesn't need to look them up.
+
+    As the dispatchers are made per Java method, overloaded methods are
+    supported: all the overloads of a name are implemented by the Python method
+    of that name, which gets the arguments converted by the parameter types of
+    the overload being invoked.
+
+    The converters and the marshaller get the JNI environment of the thread
+    running the callback.
+    """
+    __slots__ = ('name', 'function', 'converters', 'marshal')
+
+    def __init__(self, proxy_class, jenv, jmethod):
+
+        name, params_signatures, return_signature = _describe_method(jenv, jmethod)
+        function = getattr(proxy_class, name, None)
+        if function is None:
+            function = _object_methods.get((name, params_signatures))
+            if function is None:
+                raise RuntimeError("Python class {} doesn't implement the Java method "
+                                   "'{}'".format(proxy_class.__name__, name))
+        self.name       = name
+        self.function   = function
+        self.converters = tuple(_argument_converter(type_signature)
+                                for type_signature in params_signatures)
+        self.marshal    = _result_marshaller(return_signature, name)
+
+    def __call__(self, pyinstance, jenv, args):
+
+        if len(args) != len(self.converters):
+            raise RuntimeError("argc provided for dispatch doesn't match registered method.")
+        return self.function(pyinstance, *[convert(jenv, jarg)
+                                           for convert, jarg in zip(self.converters, args)])
+
+
+def _describe_method(jenv, jmethod):
+
+    """Return the (name, params signatures, return signature) of a java.lang.reflect.Method."""
+    from ._reflect import reflect
+
+    def type_signature(jtype):
+        jname = jenv.CallObjectMethod(jtype, reflect.Class__getName)
+        return signature_for_type_name(JString(jenv, jname, own=False).str)
+
+    with JFrame(jenv, 4): # jname, jparams, jtype, jname
+        jname = jenv.CallObjectMethod(jmethod, reflect.Method__getName)
+        name  = JString(jenv, jname, own=False).str
+        jparams = jenv.CallObjectMethod(jmethod, reflect.Method__getParameterTypes)
+        params_signatures = []
+        for idx in range(jenv.GetArrayLength(jparams)):
+            with JFrame(jenv, 2): # jtype, jname
+                params_signatures.append(type_signature(
+                                         jenv.GetObjectArrayElement(jparams, idx)))
+        return_signature = type_signature(
+                           jenv.CallObjectMethod(jmethod, reflect.Method__getReturnType))
+
+    return name, tuple(params_signatures), return_signature
+
+
+def _argument_converter(type_signature):
+
+    """Return the function converting a raw callback argument of the given
+    type signature, called with the JNI environment and the argument."""
+    if type_signature in _unboxing:
+        return _unboxer(type_signature)
+    elif type_signature == "Ljava/lang/String;":
+        return lambda jenv, raw: JString(jenv, raw, own=False).str if raw else None
+    elif type_signature.startswith("L"):
+        java_class = JavaClass(type_signature[1:-1])
+        return lambda jenv, raw: (wrap_instance(java_class, raw, "dispatch_cast", jenv)
+                                  if raw else None)
+    else:
+        raise ValueError("Don't know how to convert argument with type signature '{}'".format(
+                         type_signature))
+
+
+def _unboxer(type_signature):
+
+    """Return the function unboxing a primitive callback argument (which the
+    Proxy passes boxed) by a direct call of its *Value() method.
+
+    The unboxers are made once per primitive type, with the JNI call function
+    bound once (as a function of the JNI environment class).
+    """
+    try:
+        return _unboxers[type_signature]
+    except KeyError:
+        pass
+
+    from ._reflect import reflect
+
+    method_name, call_name, convert = _unboxing[type_signature]
+    method_id = getattr(reflect, method_name)
+    with JVM.jvm as (_, jenv):
+        call = getattr(type(jenv), call_name)
+    if convert is None:
+        def unbox(jenv, raw):
+            return call(jenv, raw, method_id)
+    else:
+        def unbox(jenv, raw):
+            return convert(call(jenv, raw, method_id))
+    _unboxers[type_signature] = unbox
+    return unbox
+
+
+# The unboxers of the primitive types, made on first use
+_unboxers = {}  # {type signature: unboxer}
+
+# The (*Value() method, JNI call, conversion) unboxing the primitive types
+_unboxing = {
+    "Z": ("Boolean__booleanValue", "CallBooleanMethod", bool),
+    "C": ("Char__charValue",       "CallCharMethod",    chr),
+    "B": ("Byte__byteValue",       "CallByteMethod",    None),
+    "S": ("Short__shortValue",     "CallShortMethod",   None),
+    "I": ("Integer__intValue",     "CallIntMethod",     None),
+    "J": ("Long__longValue",       "CallLongMethod",    None),
+    "F": ("Float__floatValue",     "CallFloatMethod",   None),
+    "D": ("Double__doubleValue",   "CallDoubleMethod",  None),
+}
+
+
+def _boxer(type_signature):
+
+    """Return the function boxing a primitive value of the given type signature
+    into a new local reference (in the given JNI environment), by a direct
+    call of the valueOf() method of its wrapper class."""
+    try:
+        return _boxers[type_signature]
+    except KeyError:
+        pass
+
+    from ._reflect import reflect
+
+    class_name = _boxing[type_signature]
+    jclass     = getattr(reflect, class_name)
+    method_id  = getattr(reflect, class_name + "__valueOf")
+    set_value  = _argument_setters[type_signature]
+
+    def box(jenv, value):
+        jargs = _box_args_pool.acquire()
+        try:
+            set_value(jargs.arguments[0], value)
+            return jenv.CallStaticObjectMethod(jclass, method_id, jargs.arguments)
+        finally:
+            _box_args_pool.release(jargs)
+
+    _boxers[type_signature] = box
+    return box
+
+
+# The boxers of the primitive types, made on first use
+_boxers = {}  # {type signature: boxer}
+
+# The wrapper classes (in the reflection API) of the primitive types
+_boxing = {
+    "Z": "Boolean",
+    "C": "Char",
+    "B": "Byte",
+    "S": "Short",
+    "I": "Integer",
+    "J": "Long",
+    "F": "Float",
+    "D": "Double",
+}
+
+# Argument buffers of the valueOf() methods
+_box_args_pool = _ArgumentsPool(1)
+
+
+def _result_marshaller(return_signature, name):
+
+    """Return the function converting the result of a Python implementation of
+    the Java method name of the given return type into a new local reference
+    (in the given JNI environment).
+
+    A primitive result is boxed, as the Proxy unboxes it; None is a TypeError
+    then, instead of a NullPointerException in the Proxy.
+    """
+    if return_signature == "V":
+        return lambda jenv, value: None
+    elif return_signature in _boxing:
+        box = _boxer(return_signature)
+        def marshal(jenv, value):
+            if value is None:
+                raise _none_result_error(name, return_signature)
+            return box(jenv, value)
+        return marshal
+    elif return_signature.startswith("L") or return_signature.startswith("["):
+        box_signature = _box_signatures.get(return_signature)
+        def marshal(jenv, value):
+            if value is None:
+                return None
+            elif isinstance(value, (str, type(u""))):
+                return jenv.NewStringUTF(value.encode("utf-8"))
+            elif isinstance(value, (bool, int, float)):
+                return _boxer(box_signature or _box_signature(value))(jenv, value)
+            try:
+                jobject = value.__javaobject__
+            except AttributeError:
+                raise ValueError("Can't return {!r} as '{}'".format(value, return_signature))
+            return jenv.NewLocalRef(jobject)
+        return marshal
+    else:
+        raise ValueError("Don't know how to convert result with type signature '{}'".format(
+                         return_signature))
+
+
+def _none_result_error(name, return_signature):
+
+    return TypeError("The Python implementation of the Java method '{}' returned None "
+                     "instead of a value of type {}".format(name, _primitive_names[return_signature]))
+
+
+# The Java names of the primitive types
+_primitive_names = {
+    "Z": "boolean",
+    "C": "char",
+    "B": "byte",
+    "S": "short",
+    "I": "int",
+    "J": "long",
+    "F": "float",
+    "D": "double",
+}
+
+
+def _box_signature(value):
+
+    if isinstance(value, bool):
+        return "Z"
+    elif isinstance(value, int):
+        return "I" if -0x80000000 <= value <= 0x7FFFFFFF else "J"
+    else:
+        return "D"
+
+
+# The primitive types of the wrapper classes
+_box_signatures = {
+    "Ljava/lang/Boolean;":   "Z",
+    "Ljava/lang/Character;": "C",
+    "Ljava/lang/Byte;":      "B",
+    "Ljava/lang/Short;":     "S",
+    "Ljava/lang/Integer;":   "I",
+    "Ljava/lang/Long;":      "J",
+    "Ljava/lang/Float;":     "F",
+    "Ljava/lang/Double;":    "D",
+}
+
+
+def _proxy_equals(pyinstance, other):
+
+    if other is None:
+        return False
+    with JVM.jvm as (_, jenv):
+        return bool(jenv.IsSameObject(pyinstance.__javaobject__, other.__javaobject__))
+
+
+def _proxy_hash_code(pyinstance):
+
+    return ((id(pyinstance) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+# The implementations of the java.lang.Object methods a Proxy dispatches to its
+# handler, for the Python classes which don't implement them.
+_object_methods = {
+    ("equals",   ("Ljava/lang/Object;",)): _proxy_equals,
+    ("hashCode", ()):                      _proxy_hash_code,
+    ("toString", ()):                      repr,
+}
+
+
 @public
 def dispatch_cast(raw, type_signature):
 
@@ -117,18 +485,16 @@ def dispatch_cast(raw, type_signature):
     They need to be converted into Python objects to be passed to the proxied
     interface implementation.
     """
-    type_manager = JVM.jvm.type_manager
-    thandler = type_manager.get_handler(type_signature)
-    if type_signature in ("Z", "C", "B", "S", "I", "J", "F", "D"):
-        jobject = JVM.jvm.JObject(None, raw, own=False)
-        return thandler.toPython(jobject)
+    if type_signature in _unboxing:
+        unbox = _unboxer(type_signature)
+        with JVM.jvm as (_, jenv):
+            return unbox(jenv, raw)
     elif type_signature == "Ljava/lang/String;":
-        return thandler.toPython(raw)
+        return JVM.jvm.type_manager.get_handler(type_signature).toPython(raw)
     elif type_signature.startswith("L"):
         if raw:
             java_class = JavaClass(type_signature[1:-1])
-            with JVM.jvm as (jvm, jenv):
-                return java_class(jni=jtypes.cast(jenv.NewGlobalRef(raw), jtypes.jclass))
+            return wrap_instance(java_class, raw, "dispatch_cast")
         else:
             return None
     else:
@@ -136,6 +502,36 @@ def dispatch_cast(raw, type_signature):
                          type_signature))
 
 
+@public
+def proxy_instance(target):
+
+    """Return the JavaProxy of the given ID (the target of its ProxyHandler).
+
+    Raises KeyError if there is no such proxy.
+    """
+    try:
+        return _proxy_cache[target]
+    except KeyError:
+        return _detached_proxies[target]
+
+
+@public
+def release_proxy(target):
+
+    """Drop the proxy of the given ID, once the JVM has collected its Java proxy instance.
+
+    This is called by ProxyHandler.release, possibly on the finalizer thread of
+    the JVM, so the weak global reference is released through the release queue.
+    """
+    pyinstance = _detached_proxies.pop(target, None)
+    if pyinstance is not None:
+        release_weak_global_ref(pyinstance.__javaobject__)
+
+
 # A cache of known JavaInterface proxies. This is used by the dispatch
 # mechanism to direct callbacks to the right place.
-_proxy_cache = {}
+_proxy_cache = weakref.WeakValueDictionary()
+
+# The proxies no longer referenced by Python, kept alive until the JVM collects
+# their Java proxy instances.
+_detached_proxies = {}
@@ -0,0 +1,496 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+import weakref
+import traceback
+from collections import deque, namedtuple
+
+from ...jvm.lib import public
+from ...jvm.jframe import JFrame
+
+from ._jvm        import JVM
+from ._conversion import _ArgumentsPool
+from .            import types as jtypes
+
+
+@public
+class ReleaseQueue(object):
+
+    """The queue of the global references released by their Python owners.
+
+    Releasing a reference only enqueues it, so it is safe from __del__ methods
+    and any thread, and costs no JNI call during the garbage collection. The
+    DeleteGlobalRef calls are made in batches, when the queue is drained at
+    safe points: when a new owned reference is made and BATCH_SIZE references
+    are pending, on an explicit drain(), and when the JVM shuts down.
+    The weak global references are released the same way.
+    """
+    BATCH_SIZE = 64
+
+    def __init__(self):
+
+        self._pending      = deque()
+        self._pending_weak = deque()
+
+    def start(self):
+
+        self._pending.clear()
+        self._pending_weak.clear()
+
+    def stop(self):
+
+        self.drain()
+
+    def release(self, jref):
+
+        self._pending.append(jref)
+
+    def release_weak(self, jweak):
+
+        self._pending_weak.append(jweak)
+
+    def drain(self, jenv=None):
+
+        """Delete the pending global references; return their number.
+
+        jenv is the JNI environment of the calling thread, if it isn't the one
+        of the JVM (e.g. in a callback from another Java thread).
+        """
+        if not self._pending and not self._pending_weak:
+            return 0
+
+        if jenv is None:
+            with JVM.jvm as (_, jenv):
+                return self.drain(jenv)
+
+        count = 0
+        accounting = JVM.jvm.ref_accounting
+        for pending, delete in ((self._pending,      jenv.DeleteGlobalRef),
+                                (self._pending_weak, jenv.DeleteWeakGlobalRef)):
+            while True:
+                try:
+                    jref = pending.popleft()
+                except IndexError:
+                    break
+                delete(jref)
+                if accounting.enabled:
+                    accounting.released(jref)
+                count += 1
+        return count
+
+    def safe_point(self, jenv=None):
+
+        if len(self._pending) + len(self._pending_weak) >= self.BATCH_SIZE:
+            self.drain(jenv)
+
+    def __len__(self):
+
+        return len(self._pending) + len(self._pending_weak)
+
+
+RefRecord = namedtuple("RefRecord", ("origin", "descriptor", "stack"))
+public(RefRecord=RefRecord)
+
+
+@public
+class RefAccounting(object):
+
+    """The accounting of the live global references made by rubicon.
+
+    The references are counted by origin (e.g. "JavaClass", "JavaInstance",
+    "JavaProxy", "dispatch_cast") and by Java class, with their high-water
+    marks. The accounting is enabled by the REF_ACCOUNTING configuration
+    option (on, or stacks to also record the creation stack of each reference,
+    to find the leaks), or by enable(); the references made while it is
+    disabled aren't accounted.
+    """
+    def __init__(self):
+
+        self.enabled = False
+        self.stacks  = False
+        self._refs             = {}  # {address: RefRecord}
+        self._live             = {}  # {origin: count}
+        self._live_by_class    = {}  # {descriptor: count}
+        self._high_water       = {}  # {origin: count}
+        self._total_high_water = 0
+
+    def start(self):
+
+        from ..__config__ import config
+        mode = config.get("REF_ACCOUNTING", "off").lower()
+        if mode in ("on", "true", "1", "stacks"):
+            self.enable(stacks=(mode == "stacks"))
+        elif mode in ("off", "false", "0", ""):
+            self.disable()
+        else:
+            raise ValueError("Invalid reference accounting mode '{}'".format(mode))
+
+    def stop(self):
+
+        self.disable()
+
+    def enable(self, stacks=False):
+
+        self.enabled = True
+        self.stacks  = stacks
+
+    def disable(self):
+
+        self.enabled = False
+        self.stacks  = False
+        self._refs.clear()
+        self._live.clear()
+        self._live_by_class.clear()
+        self._high_water.clear()
+        self._total_high_water = 0
+
+    def created(self, jref, origin, descriptor=None):
+
+        stack = traceback.extract_stack()[:-2] if self.stacks else None
+        self._refs[jref.value] = RefRecord(origin, descriptor, stack)
+        count = self._live[origin] = self._live.get(origin, 0) + 1
+        if count > self._high_water.get(origin, 0):
+            self._high_water[origin] = count
+        if descriptor is not None:
+            self._live_by_class[descriptor] = self._live_by_class.get(descriptor, 0) + 1
+        self._total_high_water = max(self._total_high_water, len(self._refs))
+
+    def released(self, jref):
+
+        record = self._refs.pop(jref.value, None)
+        if record is None: # Made while the accounting was disabled
+            return
+        self._live[record.origin] -= 1
+        if record.descriptor is not None:
+            count = self._live_by_class[record.descriptor] - 1
+            if count:
+                self._live_by_class[record.descriptor] = count
+            else:
+                del self._live_by_class[record.descriptor]
+
+    @property
+    def total(self):
+
+        """The number of live global references."""
+        return len(self._refs)
+
+    @property
+    def total_high_water(self):
+
+        return self._total_high_water
+
+    def live(self):
+
+        """Return {origin: number of live global references}."""
+        return {origin: count for origin, count in self._live.items() if count}
+
+    def live_by_class(self):
+
+        """Return {class descriptor: number of live global references}."""
+        return dict(self._live_by_class)
+
+    def high_water(self):
+
+        """Return {origin: highest number of live global references}."""
+        return dict(self._high_water)
+
+    def reset_high_water(self):
+
+        self._high_water = {origin: count for origin, count in self._live.items() if count}
+        self._total_high_water = len(self._refs)
+
+    def records(self, origin=None, descriptor=None):
+
+        """Return the RefRecords of the live global references, optionally of
+        a given origin or Java class. Their stack is None unless the creation
+        stacks are recorded."""
+        return [record for record in self._refs.values()
+                if (origin is None or record.origin == origin) and
+                   (descriptor is None or record.descriptor == descriptor)]
+
+
+@public
+def track_global_ref(jref, origin, descriptor=None):
+
+    """Account a new global reference (see RefAccounting); return it."""
+    accounting = JVM.jvm.ref_accounting
+    if accounting.enabled:
+        accounting.created(jref, origin, descriptor)
+    return jref
+
+
+@public
+def untrack_global_ref(jref):
+
+    accounting = JVM.jvm.ref_accounting
+    if accounting.enabled:
+        accounting.released(jref)
+
+
+@public
+class InstanceTable(object):
+
+    """The opt-in weak interning table of the Java instance wrappers.
+
+    When it is enabled (by the INTERN_INSTANCES configuration option, or by
+    enable()), the objects returned by the calls (and passed to the callbacks)
+    are wrapped by wrap(), so the same Java object, returned as the same type,
+    is always wrapped by the same instance, as long as it is alive on the Python
+    side: `is` then works, and repeated returns don't make new wrappers.
+
+    The wrappers are found by the identity hash code of their Java object
+    (System.identityHashCode), and told apart with IsSameObject. The interned
+    wrappers own a global reference to their object.
+    """
+    def __init__(self):
+
+        self.enabled   = False
+        self._wrappers = {}  # {identity hash code: [weakref to wrapper]}
+
+    def start(self):
+
+        from ..__config__ import config
+        if config.getboolean("INTERN_INSTANCES", False):
+            self.enable()
+        else:
+            self.disable()
+
+    def stop(self):
+
+        self.disable()
+
+    def enable(self):
+
+        self.enabled = True
+
+    def disable(self):
+
+        self.enabled = False
+        self._wrappers.clear()
+
+    def wrap(self, java_class, jobject, origin=None, jenv=None):
+
+        """Return the wrapper of the given type for a reference to a Java object.
+
+        If origin is given, the reference is a local one to promote to an owned
+        global reference (accounted with that origin) for the new wrapper.
+        jenv is the JNI environment of the calling thread, if it isn't the one
+        of the JVM (e.g. in a callback from another Java thread).
+        """
+        if not self.enabled and origin is None:
+            return java_class(jni=jobject)
+
+        if jenv is None:
+            with JVM.jvm as (_, jenv):
+                return self.wrap(java_class, jobject, origin, jenv)
+
+        if not self.enabled:
+            jobject = jtypes.cast(jenv.NewGlobalRef(jobject), jtypes.jclass)
+            track_global_ref(jobject, origin, java_class.__dict__["_descriptor"])
+            return java_class(jni=jobject, own=True, jenv=jenv)
+
+        identity = _identity_hash(jenv, jobject)
+        bucket = self._wrappers.get(identity)
+        if bucket:
+            for ref in bucket:
+                wrapper = ref()
+                if (wrapper is not None and wrapper.__class__ is java_class and
+                    jenv.IsSameObject(wrapper.__javaobject__, jobject)):
+                    return wrapper
+        jobject = jtypes.cast(jenv.NewGlobalRef(jobject), jtypes.jclass)
+        track_global_ref(jobject, origin or "intern", java_class.__dict__["_descriptor"])
+        wrapper = java_class(jni=jobject, own=True, jenv=jenv)
+        self._wrappers.setdefault(identity, []).append(
+            weakref.ref(wrapper, lambda ref, identity=identity: self._discard(identity, ref)))
+        return wrapper
+
+    def _discard(self, identity, ref):
+
+        bucket = self._wrappers.get(identity)
+        if bucket is None:
+            return
+        try:
+            bucket.remove(ref)
+        except ValueError:
+            pass
+        if not bucket:
+            del self._wrappers[identity]
+
+    def __len__(self):
+
+        return sum(len(bucket) for bucket in self._wrappers.values())
+
+
+def _identity_hash(jenv, jobject):
+
+    from ._reflect import reflect
+    jargs = _identity_args_pool.acquire()
+    try:
+        jargs.arguments[0].l = jobject
+        return jenv.CallStaticIntMethod(reflect.System, reflect.System__identityHashCode,
+                                        jargs.arguments)
+    finally:
+        _identity_args_pool.release(jargs)
+
+
+_identity_args_pool = _ArgumentsPool(1)
+
+
+@public
+def wrap_instance(java_class, jobject, origin=None, jenv=None):
+
+    """Return the wrapper of the given type for a reference to a Java object,
+    through the interning table of the running JVM (see InstanceTable.wrap)."""
+    return JVM.jvm.instance_table.wrap(java_class, jobject, origin, jenv)
+
+
+@public
+def instance_table():
+
+    """Return the InstanceTable of the running JVM."""
+    return JVM.jvm.instance_table
+
+
+@public
+class WeakJavaRef(object):
+
+    """A weak reference to a Java instance, on top of a weak global reference.
+
+    It doesn't keep the Java object from being collected by the JVM, so the
+    Python side caches of Java objects can hold them without growing the Java
+    heap. As weakref.ref, calling it returns a new (strong) wrapper of the object,
+    or None if it has been collected.
+    """
+    __slots__ = ('_java_class', '_jweak', '__weakref__')
+
+    def __init__(self, instance):
+
+        java_class = instance.__class__
+        with JVM.jvm as (_, jenv):
+            jweak = jtypes.cast(jenv.NewWeakGlobalRef(instance.__javaobject__), jtypes.jobject)
+        if not jweak:
+            raise RuntimeError("Unable to create weak global reference to instance.")
+        self._java_class = java_class
+        self._jweak      = track_global_ref(jweak, "WeakJavaRef",
+                                            java_class.__dict__["_descriptor"])
+
+    def alive(self):
+
+        """Whether the Java object hasn't been collected yet (it may be
+        collected right after the check, unless it is referenced by then)."""
+        with JVM.jvm as (_, jenv):
+            return not jenv.IsSameObject(self._jweak, None)
+
+    def __call__(self):
+
+        with JVM.jvm as (_, jenv):
+            jobject = jtypes.cast(jenv.NewGlobalRef(self._jweak), jtypes.jclass)
+        if not jobject: # Collected
+            return None
+        java_class = self._java_class
+        track_global_ref(jobject, "WeakJavaRef", java_class.__dict__["_descriptor"])
+        return java_class(jni=jobject, own=True)
+
+    def __del__(self):
+
+        try:
+            jweak = self._jweak
+        except AttributeError: # Not initialized
+            return
+        release_weak_global_ref(jweak)
+
+    def __repr__(self):
+
+        return "<WeakJavaRef: {}>".format(self._java_class.__dict__["_descriptor"])
+
+
+@public
+def release_weak_global_ref(jweak):
+
+    """Release a weak global reference through the release queue of the running JVM."""
+    jvm = JVM.jvm
+    if jvm is not None: # The references are gone with the JVM
+        jvm.release_queue.release_weak(jweak)
+
+
+@public
+def release_global_ref(jref):
+
+    """Release a global reference through the release queue of the running JVM."""
+    jvm = JVM.jvm
+    if jvm is not None: # The references are gone with the JVM
+        jvm.release_queue.release(jref)
+
+
+@public
+def release_pending():
+
+    """Delete the global references pending in the release queue of the JVM
+    (e.g. at the end of a batch of work); return their number."""
+    return JVM.jvm.release_queue.drain()
+
+
+@public
+class LocalScope(object):
+
+    """A scope of local references (see local_scope())."""
+
+    def __init__(self, capacity=16):
+
+        self.capacity = capacity
+        self._frame   = None
+
+    def __enter__(self):
+
+        self._frame = JFrame(JVM.jenv, self.capacity)
+        self._frame.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+
+        frame, self._frame = self._frame, None
+        return frame.__exit__(*exc_info)
+
+    def keep(self, instance):
+
+        """Promote a Java instance to an owned global reference, so that it can
+        escape the scope. Returns the instance."""
+        if instance is None or object.__getattribute__(instance, "_own"):
+            return instance
+
+        with JVM.jvm as (_, jenv):
+            jobject = jtypes.cast(jenv.NewGlobalRef(instance.__javaobject__), jtypes.jclass)
+        track_global_ref(jobject, "keep", instance.__class__.__dict__["_descriptor"])
+        object.__setattr__(instance, "__javaobject__", jobject)
+        object.__setattr__(instance, "_as_parameter_", jobject)
+        object.__setattr__(instance, "_own", True)
+        return instance
+
+
+@public
+def local_scope(capacity=16):
+
+    """Return a context manager in which the Java objects returned by the calls
+    stay local references, all deleted together on exit, with a single
+    PushLocalFrame/PopLocalFrame pair.
+
+    capacity is the number of local references the frame is ensured to hold
+    (the JVM may allow more). The instances wrapping local references of the
+    scope must not be used after its exit, unless they have been passed to
+    keep():
+
+        with local_scope(capacity=1000) as scope:
+            for item in items:
+                result = processor.process(item)
+                ...
+            last = scope.keep(result)
+    """
+    return LocalScope(capacity)
+
+
+@public
+def ref_accounting():
+
+    """Return the RefAccounting of the running JVM."""
+    return JVM.jvm.ref_accounting
@@ -25,11 +25,21 @@ class JVM(_JVM):
     def __init__(self, dll_path=None):
 
         from ._typemanager import TypeManager
+        from ._metadata    import MetadataCache
+        from ._jclass      import ClassCache
+        from ._jref        import ReleaseQueue, RefAccounting, InstanceTable
+        from ._trampoline  import CallbackTrampolines
 
         self._dll_path = None
         self._load(dll_path)
         self._create()
-        self.type_manager = TypeManager()
+        self.type_manager   = TypeManager()
+        self.metadata_cache = MetadataCache()
+        self.class_cache    = ClassCache()
+        self.release_queue  = ReleaseQueue()
+        self.ref_accounting = RefAccounting()
+        self.instance_table = InstanceTable()
+        self.trampolines    = CallbackTrampolines()
 
     def __enter__(self):
 
@@ -39,12 +49,24 @@ class JVM(_JVM):
 
         _, jenv = result = super(JVM, self).start(*jvmoptions, **jvmargs)
         JVM._jvm, JVM._jenv = self, jenv
+        self.ref_accounting.start()
         self._initialize(jenv)
         self.type_manager.start()
+        self.metadata_cache.start()
+        self.class_cache.start()
+        self.release_queue.start()
+        self.instance_table.start()
+        self.trampolines.start()
         return result
 
     def shutdown(self):
 
+        self.trampolines.stop()
+        self.instance_table.stop()
+        self.class_cache.stop()
+        self.release_queue.stop()
+        self.ref_accounting.stop()
+        self.metadata_cache.stop()
         self.type_manager.stop()
         _, jenv = self
         self._dispose(jenv)
@@ -67,18 +89,24 @@ class JVM(_JVM):
     def _create(self):
 
         from .._java import jnirubicon
-        self.ProxyHandler = jnirubicon.rubicon_reflect_ProxyHandler()
-        self.Python       = jnirubicon.rubicon_Python()
+        self.ProxyHandler    = jnirubicon.rubicon_reflect_ProxyHandler()
+        self.Python          = jnirubicon.rubicon_Python()
+        self.Introspector    = jnirubicon.rubicon_Introspector()
+        self.BatchingHandler = jnirubicon.rubicon_BatchingHandler()
 
     @annotate(jenv=jni.JNIEnv)
     def _initialize(self, jenv):
 
         self.ProxyHandler.initialize(jenv)
         self.Python.initialize(jenv)
+        self.Introspector.initialize(jenv)
+        self.BatchingHandler.initialize(jenv)
 
     @annotate(jenv=jni.JNIEnv)
     def _dispose(self, jenv):
 
+        self.BatchingHandler.dispose(jenv)
+        self.Introspector.dispose(jenv)
         self.ProxyHandler.dispose(jenv)
         self.Python.dispose(jenv)
 
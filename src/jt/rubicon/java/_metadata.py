@@ -0,0 +1,389 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+from __future__ import absolute_import
+
+import os
+import json
+import hashlib
+from urllib.parse import unquote
+
+from ...jvm.lib import public
+from ...jvm.jframe  import JFrame
+from ...jvm.jstring import JString
+
+from ._jvm        import JVM
+from ._conversion import signature_for_type_name
+
+# java.lang.reflect.Modifier flags
+_PUBLIC = 0x0001
+_STATIC = 0x0008
+
+
+@public
+class ClassMetadata(object):
+
+    """The public member metadata of a Java class
+
+    Attributes:
+     * alternates     - the JNI types the class can be passed as, in order of
+                        preference: the class itself, its interfaces, then its
+                        superclasses
+     * fields         - {name: type signature} of the instance fields
+     * static_fields  - {name: type signature} of the static fields
+     * methods        - {name: [(params signature, return signature)]} of the
+                        instance methods
+     * static_methods - {name: [(params signature, return signature)]} of the
+                        static methods
+     * constructors   - [params signature] of the constructors
+     * members        - {name: kind} index of all the members above, where kind
+                        is the combination of the FIELD, METHOD, STATIC_FIELD and
+                        STATIC_METHOD flags of the members having the name
+    """
+    __slots__ = ('alternates', 'fields', 'static_fields',
+                 'methods', 'static_methods', 'constructors', 'members')
+
+    FIELD         = 0x1
+    METHOD        = 0x2
+    STATIC_FIELD  = 0x4
+    STATIC_METHOD = 0x8
+
+    def __init__(self, alternates, fields, static_fields,
+                 methods, static_methods, constructors):
+
+        self.alternates     = alternates
+        self.fields         = fields
+        self.static_fields  = static_fields
+        self.methods        = methods
+        self.static_methods = static_methods
+        self.constructors   = constructors
+
+        members = {}
+        for kind, names in ((self.FIELD,         fields),
+                            (self.METHOD,        methods),
+                            (self.STATIC_FIELD,  static_fields),
+                            (self.STATIC_METHOD, static_methods)):
+            for name in names:
+                members[name] = members.get(name, 0) | kind
+        self.members = members
+
+    @classmethod
+    def decode(cls, descriptor, description):
+
+        """Decode the packed description made by org.pybee.rubicon.Introspector."""
+        alternates     = ["L{};".format(descriptor)]
+        superclasses   = []
+        fields         = {}
+        static_fields  = {}
+        methods        = {}
+        static_methods = {}
+        constructors   = []
+
+        for record in description.split("\n"):
+            if not record:
+                continue
+            tag, items = record[0], record[1:]
+            if tag == "I":
+                alternates.append(signature_for_type_name(items))
+            elif tag == "S":
+                superclasses.append(signature_for_type_name(items))
+            elif tag == "F":
+                modifiers, name, type_name = items.split("\t")
+                modifiers = int(modifiers)
+                if modifiers & _PUBLIC:
+                    # Keep the first one found, as Class.getField() does.
+                    (static_fields if modifiers & _STATIC else fields).setdefault(
+                        name, signature_for_type_name(type_name))
+            elif tag == "M":
+                items = items.split("\t")
+                modifiers, name, return_type_name = items[:3]
+                modifiers = int(modifiers)
+                if modifiers & _PUBLIC:
+                    params_signature = "".join(signature_for_type_name(type_name)
+                                               for type_name in items[3:])
+                    (static_methods if modifiers & _STATIC else methods).setdefault(
+                        name, []).append((params_signature,
+                                          signature_for_type_name(return_type_name)))
+            elif tag == "C":
+                items = items.split("\t")
+                modifiers = int(items[0])
+                if modifiers & _PUBLIC:
+                    constructors.append("".join(signature_for_type_name(type_name)
+                                                for type_name in items[1:]))
+            else:
+                raise ValueError("Invalid class description record '{}'".format(record))
+
+        alternates.extend(superclasses)
+
+        return cls(alternates, fields, static_fields,
+                   methods, static_methods, constructors)
+
+
+@public
+def describe_class(descriptor, jclass, loader=None):
+
+    """Return the ClassMetadata of a Java class.
+
+    jclass is the JNI reference to the class, and loader the class loader it has
+    been loaded through (None for the default one). All the metadata is fetched
+    with a single JNI call (org.pybee.rubicon.Introspector.describe), instead of
+    the reflection calls per member, or taken from the on-disk metadata cache
+    (see MetadataCache) if it is enabled and the class is of the default class
+    loader. Classes predefined by generated bindings (see predefine_class) aren't
+    introspected at all.
+    """
+    return ClassMetadata.decode(descriptor, _describe(descriptor, jclass, loader))
+
+
+@public
+def predefine_class(descriptor, description):
+
+    """Register the description of a Java class made ahead of time.
+
+    This is used by the modules generated by jt.rubicon.java.bindgen, so that
+    importing them doesn't introspect the bound classes.
+    """
+    _predefined[descriptor] = description
+
+
+def _describe(descriptor, jclass, loader=None):
+
+    description = _predefined.get(descriptor)
+    if description is not None:
+        return description
+
+    jvm = JVM.jvm
+    cache = jvm.metadata_cache
+    if loader is None:
+        key, description = cache.lookup(descriptor, jclass)
+    else: # The cache is per classpath
+        key, description = None, None
+    if description is None:
+        description = _call_introspector(jvm.Introspector.describe, descriptor, jclass)
+        if description is None:
+            raise RuntimeError("Couldn't introspect Java class '{}'".format(descriptor))
+        if key is not None:
+            cache.store(key, descriptor, description)
+
+    return description
+
+
+# The descriptions of the predefined classes; {descriptor: description}
+_predefined = {}
+
+
+@public
+class MetadataCache(object):
+
+    """An on-disk cache of the class descriptions.
+
+    The cache is enabled by the METADATA_CACHE configuration option, which names
+    its directory. The descriptions made by org.pybee.rubicon.Introspector are kept
+    in one JSON file per classpath (the Java home and class path of the JVM), so
+    only the classes of the default class loader are cached. A description is
+    valid as long as all the files it has been made from keep their size and
+    modification time: the ones (jars, class files or the runtime image) of the
+    class and of all its superclasses and interfaces, as their public members
+    are described too. Classes which can't be located (e.g. the ones defined at
+    runtime) aren't cached.
+
+    The file is loaded lazily, when the first class is described. A cached
+    description is checked without any JNI call; only the new ones are located
+    (by org.pybee.rubicon.Introspector.locate). They are saved by flush(), which
+    is called when the JVM shuts down.
+    """
+    FORMAT = 2
+
+    def __init__(self):
+
+        self._directory    = None
+        self._entry        = None   # The classpath
+        self._classes      = None   # {descriptor: [sources, description]}
+        self._dirty        = False
+        self._fingerprints = {}     # {file path: fingerprint}
+
+    def start(self, directory=None):
+
+        if directory is None:
+            from ..__config__ import config
+            directory = config.get("METADATA_CACHE", None)
+        self._directory = (os.path.abspath(os.path.expanduser(directory))
+                           if directory else None)
+        self._classes = None
+        self._dirty   = False
+        self._fingerprints.clear()
+
+    def stop(self):
+
+        try:
+            self.flush()
+        finally:
+            self._directory = None
+            self._classes = None
+            self._dirty   = False
+            self._fingerprints.clear()
+
+    @property
+    def directory(self):
+
+        return self._directory
+
+    def lookup(self, descriptor, jclass):
+
+        """Return a 2-tuple of the cache key of the class (None if the class
+        can't be cached) and its cached description (None if there is no valid one).
+        """
+        if self._directory is None:
+            return None, None
+
+        record = self._load().get(descriptor)
+        if record is not None:
+            sources, description = record
+            if all(self._fingerprint(path) == fingerprint for path, fingerprint in sources):
+                return sources, description
+
+        location = _call_introspector(JVM.jvm.Introspector.locate, descriptor, jclass)
+        return (self._sources(location) if location else None), None
+
+    def store(self, key, descriptor, description):
+
+        self._load()[descriptor] = [key, description]
+        self._dirty = True
+
+    def flush(self):
+
+        """Save the new descriptions, merged with the ones saved meanwhile by other processes."""
+        if self._directory is None or not self._dirty:
+            return
+
+        classes = self._read()
+        classes.update(self._classes)
+        path = self._path()
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            if not os.path.isdir(self._directory):
+                os.makedirs(self._directory)
+            with open(temp_path, "w") as cache_file:
+                json.dump(dict(format=self.FORMAT, entry=self._entry, classes=classes),
+                          cache_file)
+            os.replace(temp_path, path)
+        except (IOError, OSError): # The cache is optional
+            try:
+                os.remove(temp_path)
+            except (IOError, OSError):
+                pass
+        self._dirty = False
+
+    def _load(self):
+
+        if self._classes is None:
+            if self._entry is None:
+                self._entry = _classpath()
+            self._classes = self._read()
+        return self._classes
+
+    def _read(self):
+
+        try:
+            with open(self._path()) as cache_file:
+                content = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        if content.get("format") != self.FORMAT or content.get("entry") != self._entry:
+            return {}
+        return content.get("classes", {})
+
+    def _path(self):
+
+        name = hashlib.sha1(self._entry.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, name + ".json")
+
+    def _sources(self, location):
+
+        """Return the [[file path, fingerprint]] of the files listed by a location
+        (None if one of them can't be fingerprinted)."""
+        sources = []
+        for class_location in location.splitlines():
+            path = _class_source(class_location)
+            if path is None:
+                return None
+            if any(path == source[0] for source in sources):
+                continue
+            fingerprint = self._fingerprint(path)
+            if fingerprint is None:
+                return None
+            sources.append([path, fingerprint])
+        return sources or None
+
+    def _fingerprint(self, path):
+
+        try:
+            return self._fingerprints[path]
+        except KeyError:
+            try:
+                stat = os.stat(path)
+            except (IOError, OSError):
+                fingerprint = None
+            else:
+                fingerprint = [stat.st_size, stat.st_mtime]
+            self._fingerprints[path] = fingerprint
+            return fingerprint
+
+
+def _classpath():
+
+    """Return the Java home and class path of the JVM, which identify the
+    classes of its default class loader."""
+    with JVM.jvm as (jvm, jenv), JFrame(jenv, 5): # jsystem, 2 * (jname, jvalue)
+        jsystem = jenv.FindClass(b"java/lang/System")
+        getProperty = jenv.GetStaticMethodID(jsystem, b"getProperty",
+                                             b"(Ljava/lang/String;)Ljava/lang/String;")
+        values = []
+        for name in (b"java.home", b"java.class.path"):
+            jargs = jvm.JArguments(1)
+            jargs.arguments[0].l = jenv.NewStringUTF(name)
+            jvalue = jenv.CallStaticObjectMethod(jsystem, getProperty, jargs.arguments)
+            values.append(JString(jenv, jvalue, own=False).str if jvalue else "")
+    return os.pathsep.join(values)
+
+
+def _call_introspector(jmethod, descriptor, jclass):
+
+    with JVM.jvm as (jvm, jenv), JFrame(jenv, 1): # jresult
+        jargs = jvm.JArguments(1)
+        jargs.arguments[0].l = jclass
+        try:
+            jresult = jenv.CallStaticObjectMethod(jvm.Introspector.Class, jmethod,
+                                                  jargs.arguments)
+        except:
+            raise RuntimeError("Couldn't introspect Java class '{}'".format(descriptor))
+        return JString(jenv, jresult, own=False).str if jresult else None
+
+
+def _class_source(location):
+
+    """Return the file a class has been loaded from (a jar, a class file or the
+    runtime image), given its location as returned by
+    org.pybee.rubicon.Introspector.locate.
+    """
+    if location.startswith("jar:file:"):
+        end = location.find("!/")
+        if end == -1:
+            return None
+        return _url_path(location[len("jar:file:"):end])
+    elif location.startswith("file:"):
+        return _url_path(location[len("file:"):])
+    elif location.startswith("jrt:"):
+        java_home = location[len("jrt:"):]
+        return os.path.join(java_home, "lib", "modules")
+    else:
+        return None
+
+
+def _url_path(url_path):
+
+    path = unquote(url_path)
+    if os.name == "nt" and path[:1] == "/" and path[2:3] == ":":
+        path = path[1:]
+    return os.path.normpath(path)
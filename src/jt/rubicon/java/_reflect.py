@@ -2,8 +2,9 @@
 # Licensed under the BSD license
 # http://opensource.org/licenses/BSD-3-Clause
 
-from ._jvm import JVM
-from .     import types as jtypes
+from ._jvm  import JVM
+from ._jref import track_global_ref
+from .      import types as jtypes
 
 
 class _ReflectionAPI(object):
@@ -12,6 +13,7 @@ class _ReflectionAPI(object):
 
     def __init__(self):
 
+        self._attrs = {}
         self._descriptors = {
 
             'Class':                          ('FindClass',   'java/lang/Class'),
@@ -40,31 +42,46 @@ class _ReflectionAPI(object):
             'Modifier__isStatic':             ('GetStaticMethodID', 'Modifier', 'isStatic', '(I)Z'),
             'Modifier__isPublic':             ('GetStaticMethodID', 'Modifier', 'isPublic', '(I)Z'),
 
+            'System':                         ('FindClass',         'java/lang/System'),
+            'System__identityHashCode':       ('GetStaticMethodID', 'System', 'identityHashCode', '(Ljava/lang/Object;)I'),
+
             'Python':                         ('FindClass',         'org/pybee/rubicon/Python'),
 
+            'Introspector':                   ('FindClass',         'org/pybee/rubicon/Introspector'),
+            'Introspector__describe':         ('GetStaticMethodID', 'Introspector', 'describe', '(Ljava/lang/Class;)Ljava/lang/String;'),
+            'Introspector__locate':           ('GetStaticMethodID', 'Introspector', 'locate',   '(Ljava/lang/Class;)Ljava/lang/String;'),
+
             'Boolean':                        ('FindClass',   'java/lang/Boolean'),
             'Boolean__booleanValue':          ('GetMethodID', 'Boolean', 'booleanValue', '()Z'),
+            'Boolean__valueOf':               ('GetStaticMethodID', 'Boolean', 'valueOf', '(Z)Ljava/lang/Boolean;'),
 
             'Char':                           ('FindClass',   'java/lang/Character'),
             'Char__charValue':                ('GetMethodID', 'Char', 'charValue', '()C'),
+            'Char__valueOf':                  ('GetStaticMethodID', 'Char', 'valueOf', '(C)Ljava/lang/Character;'),
 
             'Byte':                           ('FindClass',   'java/lang/Byte'),
             'Byte__byteValue':                ('GetMethodID', 'Byte', 'byteValue', '()B'),
+            'Byte__valueOf':                  ('GetStaticMethodID', 'Byte', 'valueOf', '(B)Ljava/lang/Byte;'),
 
             'Short':                          ('FindClass',   'java/lang/Short'),
             'Short__shortValue':              ('GetMethodID', 'Short', 'shortValue', '()S'),
+            'Short__valueOf':                 ('GetStaticMethodID', 'Short', 'valueOf', '(S)Ljava/lang/Short;'),
 
             'Integer':                        ('FindClass',   'java/lang/Integer'),
             'Integer__intValue':              ('GetMethodID', 'Integer', 'intValue', '()I'),
+            'Integer__valueOf':               ('GetStaticMethodID', 'Integer', 'valueOf', '(I)Ljava/lang/Integer;'),
 
             'Long':                           ('FindClass',   'java/lang/Long'),
             'Long__longValue':                ('GetMethodID', 'Long', 'longValue', '()J'),
+            'Long__valueOf':                  ('GetStaticMethodID', 'Long', 'valueOf', '(J)Ljava/lang/Long;'),
 
             'Float':                          ('FindClass',   'java/lang/Float'),
             'Float__floatValue':              ('GetMethodID', 'Float', 'floatValue', '()F'),
+            'Float__valueOf':                 ('GetStaticMethodID', 'Float', 'valueOf', '(F)Ljava/lang/Float;'),
 
             'Double':                         ('FindClass',   'java/lang/Double'),
             'Double__doubleValue':            ('GetMethodID', 'Double', 'doubleValue', '()D'),
+            'Double__valueOf':                ('GetStaticMethodID', 'Double', 'valueOf', '(D)Ljava/lang/Double;'),
         }
 
     def __getattr__(self, name):
@@ -88,6 +105,7 @@ class _ReflectionAPI(object):
                         raise RuntimeError("Couldn't find Java class '{}'".format(class_name))
                     with JVM.jvm as (_, jenv):
                         result = jtypes.cast(jenv.NewGlobalRef(jclass.handle), jtypes.jclass)
+                    track_global_ref(result, "reflect", descriptor[1])
 
                 elif descr_type == "GetMethodID":
 
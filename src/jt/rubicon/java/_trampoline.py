@@ -0,0 +1,444 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+from __future__ import absolute_import
+
+import ctypes
+import itertools
+import traceback
+import warnings
+import weakref
+
+from ...jvm.lib import public
+from ...jvm.jframe import JFrame
+from ...jvm.jhost  import JHost
+from ...jvm.java   import throwJavaException
+from ...        import jni
+
+from ._jvm        import JVM
+from ._classfile  import ClassFile, argument_slots
+from ._classfile  import ACC_PUBLIC, ACC_PRIVATE, ACC_PROTECTED, ACC_STATIC, ACC_NATIVE
+from ._classfile  import ACC_FINAL, ACC_SUPER, ACC_ABSTRACT
+from ._conversion import split_signature
+from ._metadata   import describe_class
+from ._jref       import track_global_ref, untrack_global_ref
+from .            import types as jtypes
+
+
+@public
+class CallbackTrampolines(object):
+
+    """The classes generated to implement Java interfaces in Python.
+
+    Instead of a java.lang.reflect.Proxy, whose InvocationHandler gets the
+    boxed arguments in a new Object[] and the reflected Method per call, a
+    Python implementation of a Java interface can be backed by a class defined
+    at runtime (DefineClass) for its Python class. Each method of the interface
+    the Python class implements is compiled into a forwarder to a static native
+    method of the exact same primitive signature (plus the ID of the proxy),
+    registered (RegisterNatives) as the Python function implementing it. So a
+    callback doesn't involve reflection, boxing or array allocation.
+
+    As with a java.lang.reflect.Proxy, calling an abstract method the Python
+    class doesn't implement throws a RuntimeException naming it, and so do the
+    exceptions raised by the Python implementation. The default methods of the
+    interface the Python class doesn't implement are inherited.
+
+    The trampolines are enabled by the CALLBACK_TRAMPOLINES configuration option.
+    The Python classes whose trampoline can't be generated (e.g. implementing a
+    non-public interface) fall back to java.lang.reflect.Proxy, with a warning.
+
+    The trampolines are held weakly by their Python classes: the trampoline of
+    a collected class is released (its natives unregistered) at the next get(),
+    or on stop().
+    """
+    CLASS_PREFIX = "org/pybee/rubicon/trampoline/Trampoline$"
+
+    def __init__(self):
+
+        self.enabled    = False
+        self._classes   = weakref.WeakKeyDictionary()  # {Python proxy class: _Trampoline or None}
+        self._collected = []  # The trampolines of the collected classes, to release
+        self._counter   = itertools.count()
+
+    def start(self, enabled=None):
+
+        if enabled is None:
+            from ..__config__ import config
+            enabled = config.getboolean("CALLBACK_TRAMPOLINES", False)
+        self.enabled = bool(enabled)
+        self._classes.clear()
+        del self._collected[:]
+
+    def stop(self):
+
+        classes, self._classes = self._classes, weakref.WeakKeyDictionary()
+        for trampoline in list(classes.values()):
+            if trampoline is not None:
+                trampoline.release()
+        self.release_collected()
+        self.enabled = False
+
+    def release_collected(self):
+
+        """Release the trampolines of the collected Python classes; return their number."""
+        count = 0
+        while self._collected:
+            self._collected.pop().release()
+            count += 1
+        return count
+
+    def get(self, proxy_class):
+
+        """Return the trampoline of a Python proxy class (a class implementing a
+        JavaInterface), or None if the trampolines are disabled or it has none."""
+        if not self.enabled:
+            return None
+        self.release_collected()
+        try:
+            return self._classes[proxy_class]
+        except KeyError:
+            try:
+                trampoline = _Trampoline(proxy_class,
+                                         "{}{}".format(self.CLASS_PREFIX, next(self._counter)))
+            except (RuntimeError, ValueError) as exc:
+                # The class can't be defined or linked, or a method has a
+                # signature the trampolines don't support.
+                warnings.warn("No callback trampoline for {}, falling back to "
+                              "java.lang.reflect.Proxy: {}".format(proxy_class.__name__, exc),
+                              RuntimeWarning, stacklevel=3)
+                trampoline = None
+            else:
+                # Called when the class is collected; the JNI calls of the
+                # release are deferred to a safe point.
+                finalizer = weakref.finalize(proxy_class, self._collected.append, trampoline)
+                finalizer.atexit = False
+            self._classes[proxy_class] = trampoline
+            return trampoline
+
+    def enable(self):
+
+        self.enabled = True
+
+    def disable(self):
+
+        """Stop generating trampolines; the existing ones are kept until stop()."""
+        self.enabled = False
+
+    def __len__(self):
+
+        return sum(1 for trampoline in self._classes.values() if trampoline is not None)
+
+
+@public
+def callback_trampolines():
+
+    """Return the CallbackTrampolines of the running JVM."""
+    return JVM.jvm.trampolines
+
+
+class _Trampoline(object):
+
+    """The class generated for a Python proxy class, with its native methods."""
+
+    def __init__(self, proxy_class, class_name):
+
+        from ._jproxy import JavaProxy
+
+        descriptor = proxy_class._descriptor
+        metadata   = describe_class(descriptor, proxy_class.__javaclass__)
+
+        # The overloads of the interface methods the Python class implements,
+        # and the abstract ones it doesn't (forwarding to an error).
+        implemented = set(name for name in metadata.methods
+                          if any(name in klass.__dict__ for klass in proxy_class.__mro__
+                                 if klass not in (JavaProxy, object)))
+        abstract = _abstract_methods(proxy_class.__javaclass__)
+        methods = [(name, params_signature, return_signature)
+                   for name, overloads in sorted(metadata.methods.items())
+                   for params_signature, return_signature in overloads
+                   if name in implemented or
+                      (name, params_signature, return_signature) in abstract]
+
+        code, native_methods = _trampoline_class(class_name, descriptor, methods)
+        natives = [(native_name, native_descriptor,
+                    _native_method(name, native_descriptor,
+                                   params_signature, return_signature)
+                    if name in implemented else
+                    _unimplemented_method(proxy_class, name, native_descriptor,
+                                          return_signature))
+                   for (native_name, native_descriptor),
+                       (name, params_signature, return_signature)
+                   in zip(native_methods, methods)]
+        natives.append(("native$release", "(J)V", jni.method("(J)V")(_release)))
+
+        self.natives = natives  # Keep the native callbacks alive
+        self.jclass, self.constructor = _define_class(class_name, proxy_class.__javaclass__,
+                                                      code, natives)
+
+    def new(self, target):
+
+        """Return a new global reference to an instance for the given proxy ID."""
+        with JVM.jvm as (jvm, jenv), JFrame(jenv, 1): # jobject
+            jargs = jvm.JArguments(1)
+            jargs.arguments[0].j = target
+            try:
+                jobject = jenv.NewObject(self.jclass, self.constructor, jargs.arguments)
+            except:
+                raise RuntimeError("Unable to create proxy instance.")
+            return jtypes.cast(jenv.NewGlobalRef(jobject), jtypes.jclass)
+
+    def release(self):
+
+        jclass, self.jclass = self.jclass, None
+        if jclass is None: # Already released
+            return
+        with JVM.jvm as (_, jenv):
+            jenv.UnregisterNatives(jclass)
+            jenv.DeleteGlobalRef(jclass)
+        untrack_global_ref(jclass)
+
+
+def _trampoline_class(class_name, descriptor, methods):
+
+    """Return the class file of a trampoline class implementing the given
+    interface methods [(name, params signature, return signature)], and the
+    [(name, descriptor)] of the native methods they forward to, in the same
+    order. The class also has the native method native$release(long), called
+    by its finalize().
+    """
+    class_file = ClassFile(class_name, interfaces=(descriptor,),
+                           access=ACC_PUBLIC | ACC_FINAL | ACC_SUPER)
+    class_file.field(ACC_PRIVATE | ACC_FINAL, "target", "J")
+
+    # public <init>(long target) { super(); this.target = target; }
+    code = class_file.code(3, 3)
+    code.aload(0).invokespecial("java/lang/Object", "<init>", "()V")
+    code.aload(0).lload(1).putfield(class_name, "target", "J").return_()
+    class_file.method(ACC_PUBLIC, "<init>", "(J)V", code)
+
+    natives = []
+    for num, (name, params_signature, return_signature) in enumerate(methods):
+        # public R name(P...) { return native$N(this.target, P...); }
+        method_descriptor = "({}){}".format(params_signature, return_signature)
+        native_name = "native${}".format(num)
+        native_descriptor = "(J{}){}".format(params_signature, return_signature)
+        slots = argument_slots(method_descriptor)
+        code = class_file.code(2 + slots, 1 + slots)
+        code.aload(0).getfield(class_name, "target", "J")
+        index = 1
+        for type_signature in split_signature(params_signature):
+            code.load(type_signature, index)
+            index += 2 if type_signature in ("J", "D") else 1
+        code.invokestatic(class_name, native_name, native_descriptor)
+        code.return_value(return_signature)
+        class_file.method(ACC_PUBLIC, name, method_descriptor, code)
+        class_file.method(ACC_PRIVATE | ACC_STATIC | ACC_NATIVE, native_name, native_descriptor)
+        natives.append((native_name, native_descriptor))
+
+    # protected void finalize() { native$release(this.target); }
+    code = class_file.code(2, 1)
+    code.aload(0).getfield(class_name, "target", "J")
+    code.invokestatic(class_name, "native$release", "(J)V").return_()
+    class_file.method(ACC_PROTECTED, "finalize", "()V", code)
+    class_file.method(ACC_PRIVATE | ACC_STATIC | ACC_NATIVE, "native$release", "(J)V")
+
+    return class_file.to_bytes(), natives
+
+
+def _define_class(class_name, jinterface, code, natives):
+
+    """Define the class in the class loader of the interface (or in the system
+    class loader for the interfaces of the bootstrap class loader) and register
+    its native methods; return the global reference to it and its constructor ID."""
+    with JVM.jvm as (jvm, jenv), JFrame(jenv, 3): # cloader, cloader class, jclass
+        cloader = jenv.CallObjectMethod(jinterface, jvm.Class.getClassLoader)
+        if not cloader:
+            jloader_class = jenv.FindClass(b"java/lang/ClassLoader")
+            getSystemClassLoader = jenv.GetStaticMethodID(jloader_class, b"getSystemClassLoader",
+                                                          b"()Ljava/lang/ClassLoader;")
+            cloader = jenv.CallStaticObjectMethod(jloader_class, getSystemClassLoader)
+        buf = (jtypes.jbyte * len(code)).from_buffer_copy(code)
+        try:
+            jclass = jenv.DefineClass(class_name.encode("utf-8"), cloader, buf, len(code))
+        except:
+            raise RuntimeError("Unable to define trampoline class for interface.")
+
+        jmethods = jni.new_array(jni.JNINativeMethod, len(natives))
+        for idx, (name, signature, function) in enumerate(natives):
+            jmethods[idx].name      = name.encode("utf-8")
+            jmethods[idx].signature = signature.encode("utf-8")
+            jmethods[idx].fnPtr     = ctypes.cast(function, ctypes.c_void_p)
+        jenv.RegisterNatives(jclass, jmethods, len(natives))
+
+        try: # Links (and initializes) the class
+            constructor = jenv.GetMethodID(jclass, b"<init>", b"(J)V")
+        except:
+            raise RuntimeError("Unable to link trampoline class for interface.")
+        jclass = track_global_ref(jtypes.cast(jenv.NewGlobalRef(jclass), jtypes.jclass),
+                                  "Trampoline", class_name)
+    return jclass, constructor
+
+
+def _abstract_methods(jinterface):
+
+    """Return the {(name, params signature, return signature)} of the abstract
+    methods of an interface, but those of the public java.lang.Object methods
+    (which the trampoline class inherits)."""
+    from ._reflect import reflect
+    from ._jproxy  import _describe_method
+
+    abstract = set()
+    with JVM.jvm as (_, jenv), JFrame(jenv, 1): # jmethods
+        jmethods = jenv.CallObjectMethod(jinterface, reflect.Class__getMethods)
+        for idx in range(jenv.GetArrayLength(jmethods)):
+            with JFrame(jenv, 1): # jmethod
+                jmethod = jenv.GetObjectArrayElement(jmethods, idx)
+                if not jenv.CallIntMethod(jmethod, reflect.Method__getModifiers) & ACC_ABSTRACT:
+                    continue
+                name, params_signatures, return_signature = _describe_method(jenv, jmethod)
+                if (name, params_signatures) in _inherited_methods:
+                    continue
+                abstract.add((name, "".join(params_signatures), return_signature))
+    return abstract
+
+
+def _native_method(name, native_descriptor, params_signature, return_signature):
+
+    """Return the native callback running the Python function implementing a method.
+
+    The function is looked up on the class of the proxy per call, so that the
+    natives (which the trampoline keeps) don't keep the class alive through it.
+    """
+    from ._jproxy import proxy_instance, _argument_converter, _result_marshaller
+    from ._jproxy import _none_result_error
+
+    converters = tuple(_primitive_converters.get(type_signature) or
+                       _argument_converter(type_signature)
+                       for type_signature in split_signature(params_signature))
+    if return_signature == "V":
+        marshal, default = _primitive_results[return_signature]
+    elif return_signature in _primitive_results:
+        marshal_value, default = _primitive_results[return_signature]
+        def marshal(jenv, value):
+            if value is None:
+                raise _none_result_error(name, return_signature)
+            return marshal_value(jenv, value)
+    else:
+        marshal, default = _result_marshaller(return_signature, name), None
+
+    def native(env, cls, target, *args):
+
+        jenv = env[0]
+        try:
+            with JHost.CallbackState():
+                pyinstance = proxy_instance(target)
+                function = getattr(type(pyinstance), name)
+                result = function(pyinstance, *[convert(jenv, arg)
+                                                for convert, arg in zip(converters, args)])
+                return marshal(jenv, result)
+        except Exception as exc:
+            _throw(jenv, exc)
+        return default
+
+    return jni.method(native_descriptor)(native)
+
+
+def _unimplemented_method(proxy_class, name, native_descriptor, return_signature):
+
+    """Return the native callback of an abstract method the Python class
+    doesn't implement, throwing a RuntimeException naming it."""
+    _, default = _primitive_results.get(return_signature, (None, None))
+    message = "Python class {} doesn't implement the Java method '{}'".format(
+              proxy_class.__name__, name)
+
+    def native(env, cls, target, *args):
+
+        throwJavaException(env[0], "java/lang/RuntimeException", message)
+        return default
+
+    return jni.method(native_descriptor)(native)
+
+
+def _throw(jenv, exc):
+
+    # Throw a Python exception into Java (returning from the native method)
+    throwJavaException(jenv, "java/lang/RuntimeException",
+                       "Python exception thrown: {}: {}".format(type(exc).__name__, exc))
+
+
+def _release(env, cls, target):
+
+    # The Java instance is being finalized; the Python object can go.
+
+    from ._jproxy import release_proxy
+    try:
+        with JHost.CallbackState():
+            release_proxy(target)
+    except Exception:
+        traceback.print_exc()
+
+
+def _convert_boolean(jenv, value):
+
+    return bool(value)
+
+
+def _convert_char(jenv, value):
+
+    return chr(value)
+
+
+# The public java.lang.Object methods an interface may declare; {(name, params signatures)}
+_inherited_methods = {
+    ("equals",   ("Ljava/lang/Object;",)),
+    ("hashCode", ()),
+    ("toString", ()),
+}
+
+
+def _identity(jenv, value):
+
+    return value
+
+
+def _marshal_boolean(jenv, value):
+
+    return bool(value)
+
+
+def _marshal_char(jenv, value):
+
+    return ord(value) if isinstance(value, (str, type(u""))) else (value or 0)
+
+
+def _marshal_number(jenv, value):
+
+    return value or 0
+
+
+# The native methods get the primitive arguments as Python values already
+_primitive_converters = {
+    "Z": _convert_boolean,
+    "C": _convert_char,
+    "B": _identity,
+    "S": _identity,
+    "I": _identity,
+    "J": _identity,
+    "F": _identity,
+    "D": _identity,
+}
+
+# {return signature: (marshaller, default result)}
+_primitive_results = {
+    "V": (lambda jenv, value: None, None),
+    "Z": (_marshal_boolean,   False),
+    "C": (_marshal_char,      0),
+    "B": (_marshal_number,    0),
+    "S": (_marshal_number,    0),
+    "I": (_marshal_number,    0),
+    "J": (_marshal_number,    0),
+    "F": (_marshal_number,    0.0),
+    "D": (_marshal_number,    0.0),
+}
@@ -8,7 +8,8 @@ from ....jvm.lib import public
 
 from .._constants import EJavaType
 from .._jvm       import JVM
-from .._jclass    import JavaClass
+from .._jclass    import JavaClass, _resolve_class
+from .._jref      import wrap_instance
 from ..           import types as jtypes
 
 from ._base_handler import _ObjectHandler
@@ -18,11 +19,14 @@ from ._base_handler import int_types, str_types
 @public
 class ObjectHandler(_ObjectHandler):
 
-    __slots__ = ()
+    __slots__ = ('_declaring_class',)
 
-    def __init__(self, state, jclass):
+    def __init__(self, state, jclass, declaring_class=None):
 
         super(ObjectHandler, self).__init__(state, EJavaType.OBJECT, jclass)
+        # The class whose members are of this type, if it resolves it through
+        # its class loader (see TypeManager.get_handler)
+        self._declaring_class = declaring_class
 
     def match(self, val):
 
@@ -124,8 +128,11 @@ class ObjectHandler(_ObjectHandler):
     def toPython(self, val):
 
         if val:
-            java_class = JavaClass(self._jclass[1:-1])
-            return java_class(jni=jtypes.cast(val, jtypes.jclass))
+            if self._declaring_class is None:
+                java_class = JavaClass(self._jclass[1:-1])
+            else:
+                java_class = _resolve_class(self._jclass[1:-1], self._declaring_class)
+            return wrap_instance(java_class, jtypes.cast(val, jtypes.jclass))
         else:
             return None
 
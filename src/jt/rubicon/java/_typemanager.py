@@ -43,9 +43,24 @@ class TypeManager(object):
         self._handlers[thandler._jclass] = thandler
         return thandler
 
-    def get_handler(self, jclass):
+    def get_handler(self, jclass, declaring_class=None):
 
+        """Return the handler of a type signature.
+
+        declaring_class is the JavaClass declaring the member of that type, if
+        any. The object types of the members of the classes loaded through a
+        class loader are resolved through that loader, by handlers kept by
+        their class.
+        """
         thandler = self._handlers.get(jclass)
+        if (declaring_class is not None and jclass.startswith("L") and
+            declaring_class.__dict__.get("_partition") is not None and
+            (thandler is None or type(thandler) is ObjectHandler)):
+            handlers = declaring_class.__dict__["_handlers"]
+            thandler = handlers.get(jclass)
+            if thandler is None:
+                thandler = handlers[jclass] = ObjectHandler(self._state, jclass, declaring_class)
+            return thandler
         if thandler is None:
             if not jclass.startswith("L"):
                 raise ValueError("Don't know how to convert argument with "
@@ -0,0 +1,315 @@
+# Copyright (c) 2016-2019, Adam Karpierz
+# Licensed under the BSD license
+# http://opensource.org/licenses/BSD-3-Clause
+
+"""Ahead-of-time Python bindings for Java classes.
+
+generate_bindings() emits the source of a Python module with a fixed class per
+Java type. The description of each class is embedded in the module, and every
+method gets a dispatcher specialised for its overloads: a table mapping the
+exact Python types of the arguments to the handle pinned to the overload they
+resolve to. Importing the module only fetches the class references and the
+field, method and constructor IDs; neither the reflection nor the overload
+resolution is needed for the calls covered by the tables.
+
+Arguments the tables don't cover (e.g. Java objects, or combinations of
+too many overloads) fall back to the normal overload resolution.
+
+The generated modules need a running JVM when they are imported. The module
+can be run as a script:
+
+    python -m jt.rubicon.java.bindgen -cp <classpath> -o <output file> <descriptor> ...
+"""
+
+from __future__ import absolute_import
+
+import json
+import keyword
+import itertools
+
+from ...jvm.lib import public
+
+from ._jvm        import JVM
+from ._jclass     import JavaClass
+from ._jclass     import _cache_member, _cache_methods, _cache_constructors
+from ._conversion import compile_polymorphs, split_signature
+from ._conversion import _dispatch, _type_candidates
+from ._metadata   import predefine_class, _describe
+from .            import types as jtypes
+
+# The maximum number of entries of the dispatch table of an arity.
+MAX_TABLE_SIZE = 256
+
+
+@public
+def generate_bindings(descriptors, header=""):
+
+    """Return the source of a Python module binding the given Java classes.
+
+    descriptors are the class descriptors, as accepted by JavaClass
+    (e.g. "org/pybee/rubicon/test/Example"). The Python class of each Java class
+    is named after its simple name.
+    """
+    lines = [header + "# Auto-generated by jt.rubicon.java.bindgen; DO NOT EDIT!",
+             "",
+             "from jt.rubicon.java import JavaClass",
+             "from jt.rubicon.java import types as _jtypes",
+             "from jt.rubicon.java import bindgen as _bindgen"]
+
+    class_names = []
+    for descriptor in descriptors:
+        class_name = _class_name(descriptor, class_names)
+        class_names.append(class_name)
+        lines.extend(_class_bindings(descriptor, class_name))
+
+    lines[5:5] = ["", "__all__ = {}".format(_tuple_expression(map(json.dumps, class_names)))]
+    return "\n".join(lines) + "\n"
+
+
+def _class_bindings(descriptor, class_name):
+
+    java_class = JavaClass(descriptor)
+    metadata   = java_class.__dict__["_metadata"]
+    records    = _describe(descriptor, java_class.__javaclass__, None).splitlines(True)
+
+    yield ""
+    yield ""
+    yield "# {}".format(descriptor)
+    yield ""
+    yield "_bindgen.predefine_class({}, (".format(json.dumps(descriptor))
+    for record in records:
+        yield "    {}".format(json.dumps(record))
+    yield "))"
+    yield ""
+    yield "{} = JavaClass({})".format(class_name, json.dumps(descriptor))
+    yield "_bindgen.pin_class({})".format(class_name)
+    yield "_bindgen.resolve_fields({})".format(class_name)
+    yield "_bindgen.resolve_constructors({})".format(class_name)
+
+    for static, methods in ((False, metadata.methods), (True, metadata.static_methods)):
+        for num, method_name in enumerate(sorted(methods)):
+            method = _cache_methods(java_class, method_name, static)
+            prefix = "_{}__{}{}".format(class_name, "static__" if static else "",
+                                        _identifier(method_name, num))
+            for line in _method_bindings(class_name, method_name, method, prefix, static):
+                yield line
+
+
+def _method_bindings(class_name, method_name, method, prefix, static):
+
+    polymorphs = method._polymorphs
+    table = _dispatch_table(polymorphs)
+
+    yield ""
+    yield "# {}{}".format("static " if static else "", method_name)
+    yield ""
+    yield "{} = _bindgen.{}({}, {})".format(prefix, "static_method" if static else "instance_method",
+                                            class_name, json.dumps(method_name))
+    handles = {}
+    for num, params_signature in enumerate(sorted(set(table.values()))):
+        handles[params_signature] = handle = "{}__{}".format(prefix, num)
+        yield "{} = {}.signature({})".format(handle, prefix, json.dumps("({}){}".format(
+                                             params_signature,
+                                             polymorphs[params_signature]["return_signature"])))
+    yield "{}__table = {{".format(prefix)
+    for arg_types, params_signature in sorted(table.items(), key=_table_order):
+        yield "    {}: {},".format(_tuple_expression(map(_type_expression, arg_types)),
+                                   handles[params_signature])
+    yield "}"
+    yield ""
+    args = "*args" if static else "self, *args"
+    yield "def {}__call({}):".format(prefix, args)
+    yield "    try:"
+    yield "        handle = {}__table[tuple(map(type, args))]".format(prefix)
+    yield "    except KeyError:"
+    yield "        return {}({})".format(prefix, args)
+    yield "    return handle({})".format(args)
+    yield ""
+    yield "_bindgen.{}({}, {}, {}__call)".format("install_static_method" if static else
+                                                "install_method",
+                                                class_name, json.dumps(method_name), prefix)
+
+
+def _dispatch_table(polymorphs):
+
+    """Return {(Python types): params signature} of the overloads the arguments of the
+    given exact Python types resolve to, as select_polymorph() would resolve them.
+    """
+    dispatch = compile_polymorphs(polymorphs)
+
+    table = {}
+    for arity, node in dispatch.items():
+        if arity == 0:
+            table[()] = node[0]
+            continue
+        overloads = [split_signature(params_signature) for params_signature in polymorphs
+                     if len(split_signature(params_signature)) == arity]
+        positions = [[arg_type for arg_type, candidates in _type_candidates.items()
+                      if any(match_types[pos] in candidates for match_types in overloads)]
+                     for pos in range(arity)]
+        size = 1
+        for arg_types in positions:
+            size *= len(arg_types)
+        if not size or size > MAX_TABLE_SIZE:
+            continue
+        for arg_types in itertools.product(*positions):
+            leaf = _dispatch(node, [_type_candidates[arg_type] for arg_type in arg_types], 0)
+            if leaf is not None:
+                table[arg_types] = leaf[0]
+
+    return table
+
+
+def _table_order(item):
+
+    arg_types, _ = item
+    return len(arg_types), [_type_expression(arg_type) for arg_type in arg_types]
+
+
+def _type_expression(arg_type):
+
+    if arg_type.__module__ in ("builtins", "__builtin__"):
+        return arg_type.__name__
+    for name in dir(jtypes):
+        if getattr(jtypes, name) is arg_type:
+            return "_jtypes." + name
+    raise ValueError("Unknown argument type {}".format(arg_type))
+
+
+def _tuple_expression(items):
+
+    items = list(items)
+    return "({}{})".format(", ".join(items), "," if len(items) == 1 else "")
+
+
+def _class_name(descriptor, taken):
+
+    name = descriptor.rpartition("/")[2].replace("$", "_")
+    if not _is_identifier(name):
+        name = "_" + name
+    if not _is_identifier(name):
+        name = "Class{}".format(len(taken))
+    unique_name, num = name, 1
+    while unique_name in taken:
+        num += 1
+        unique_name = "{}_{}".format(name, num)
+    return unique_name
+
+
+def _identifier(name, num):
+
+    if _is_identifier(name) and "__" not in name and not name.startswith("_"):
+        return name
+    return "_{}".format(num)
+
+
+def _is_identifier(name):
+
+    return name.isidentifier() and not keyword.iskeyword(name)
+
+
+# Run-time support of the generated modules
+
+
+@public
+def pin_class(java_class):
+
+    """Pin a bound class in the class cache, so that the Java objects returned
+    by the calls are always instances of the bound class.
+    """
+    JVM.jvm.class_cache.pin(java_class)
+
+
+@public
+def resolve_fields(java_class):
+
+    """Resolve the IDs of the public fields of a Java class."""
+    metadata = java_class.__dict__["_metadata"]
+    for static, names in ((False, metadata.fields), (True, metadata.static_fields)):
+        members = java_class.__dict__["_static" if static else "_members"]
+        for name in names:
+            if name not in members:
+                members[name] = _cache_member(java_class, name, static)
+
+
+@public
+def resolve_constructors(java_class):
+
+    """Resolve the IDs of the public constructors of a Java class."""
+    constructors = _cache_constructors(java_class)
+    for params_signature, polymorph in constructors._polymorphs.items():
+        constructors._resolve(split_signature(params_signature), polymorph)
+
+
+@public
+def instance_method(java_class, name):
+
+    """Return the JavaMethod of the given name, with the IDs of its overloads resolved."""
+    return _cache_methods(java_class, name, False)
+
+
+@public
+def static_method(java_class, name):
+
+    """Return the StaticJavaMethod of the given name, with the IDs of its overloads resolved."""
+    return _cache_methods(java_class, name, True)
+
+
+@public
+def install_method(java_class, name, function):
+
+    """Install the dispatcher of an instance method on a Java class.
+
+    As for the wrappers installed by the dynamic lookup, the attributes of the
+    Python side aren't shadowed.
+    """
+    if not any(name in klass.__dict__ for klass in java_class.__mro__):
+        type.__setattr__(java_class, name, function)
+
+
+@public
+def install_static_method(java_class, name, function):
+
+    """Install the dispatcher of a static method on a Java class."""
+    java_class.__dict__["_static"][name] = function
+
+
+def main(argv=None):
+
+    import sys
+    import os
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m jt.rubicon.java.bindgen",
+                                     description="Generate the Python bindings "
+                                                 "of Java classes.")
+    parser.add_argument("descriptors", metavar="descriptor", nargs="+",
+                        help="the descriptor of a Java class, e.g. java/util/ArrayList")
+    parser.add_argument("-cp", "--classpath", default=None,
+                        help="the class path of the JVM")
+    parser.add_argument("-o", "--output", default=None,
+                        help="the output file (default: the standard output)")
+    parser.add_argument("--jvm", default=None,
+                        help="the path of the JVM library (default: the one found)")
+    args = parser.parse_args(argv)
+
+    options = []
+    if args.classpath is not None:
+        options.append("-Djava.class.path={}".format(args.classpath))
+
+    jvm = JVM(args.jvm)
+    jvm.start(*options)
+    try:
+        source = generate_bindings(args.descriptors)
+    finally:
+        jvm.shutdown()
+
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(os.path.expanduser(args.output), "w") as output:
+            output.write(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ from . import test_dir
 test_java = os.path.join(test_dir, "java")
 
 
-def test_suite(names=None, omit=("run", "test_jni")):
+def test_suite(names=None, omit=("run", "test_jni", "bench_calls")):
 
     from . import __name__ as pkg_name
     from . import __path__ as pkg_path
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division, unicode_literals
+
+import sys
+import timeit
+from unittest import TestCase
+
+from rubicon.java import JavaClass
+from rubicon.java._jclass import _cache_methods
+
+
+class CallOverheadBenchmark(TestCase):
+
+    """Per-call overhead of the general call path vs. the primitive fast path.
+
+    Not a part of the default test suite; run it with:
+
+        python -m tests bench_calls
+    """
+    NUMBER = 20000
+    REPEAT = 5
+
+    def setUp(self):
+
+        self.Example = JavaClass('org/pybee/rubicon/test/Example')
+        self.obj = self.Example(42)
+
+    def method_pair(self, name, static=False):
+
+        general = _cache_methods(self.Example, name, static)
+        general.FAST_PATH = False
+        fast = _cache_methods(self.Example, name, static)
+        return general, fast
+
+    def measure(self, label, general, fast):
+
+        self.assertEqual(general(), fast())
+
+        general_time = min(timeit.repeat(general, number=self.NUMBER, repeat=self.REPEAT))
+        fast_time    = min(timeit.repeat(fast,    number=self.NUMBER, repeat=self.REPEAT))
+        print("\n{:<32} general: {:7.3f} us/call   fast: {:7.3f} us/call   ({:.1f}x)".format(
+              label,
+              general_time * 1e6 / self.NUMBER,
+              fast_time    * 1e6 / self.NUMBER,
+              general_time / fast_time), file=sys.stderr, end="")
+
+    def test_no_args(self):
+        "obj.get_int_field()"
+        general, fast = self.method_pair("get_int_field")
+        obj = self.obj
+        self.measure("get_int_field()",
+                     lambda: general(obj),
+                     lambda: fast(obj))
+
+    def test_int_arg(self):
+        "obj.set_int_field(int)"
+        general, fast = self.method_pair("set_int_field")
+        obj = self.obj
+        self.measure("set_int_field(37)",
+                     lambda: general(obj, 37),
+                     lambda: fast(obj, 37))
+
+    def test_double_arg(self):
+        "obj.area_of_circle(double)"
+        general, fast = self.method_pair("area_of_circle")
+        obj = self.obj
+        self.measure("area_of_circle(1.5)",
+                     lambda: general(obj, 1.5),
+                     lambda: fast(obj, 1.5))
+
+    def test_static_no_args(self):
+        "Example.get_static_int_field()"
+        general, fast = self.method_pair("get_static_int_field", static=True)
+        self.measure("get_static_int_field()",
+                     lambda: general(),
+                     lambda: fast())
+
+    def test_static_int_arg(self):
+        "Example.set_static_int_field(int)"
+        general, fast = self.method_pair("set_static_int_field", static=True)
+        self.measure("set_static_int_field(11)",
+                     lambda: general(11),
+                     lambda: fast(11))
@@ -0,0 +1,8 @@
+package org.pybee.rubicon.test;
+
+
+public interface IPrimitives {
+    public void primitives(boolean z, char c, byte b, short s, int i, long j, float f, double d);
+
+    public void boxes(Boolean z, Character c, Byte b, Short s, Integer i, Long j, Float f, Double d);
+}
@@ -0,0 +1,11 @@
+package org.pybee.rubicon.plugin;
+
+
+public class Plugin {
+    public Plugin() {
+    }
+
+    public Widget make(String name) {
+        return new Widget(name);
+    }
+}
@@ -0,0 +1,14 @@
+package org.pybee.rubicon.plugin;
+
+
+public class Widget {
+    private final String name;
+
+    public Widget(String name) {
+        this.name = name;
+    }
+
+    public String getName() {
+        return name;
+    }
+}
@@ -1,10 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, division, unicode_literals
 
+import gc
+import os
+import sys
 import math
+import weakref
+import importlib
+import shutil
+import tempfile
+import threading
+import time
 from unittest import TestCase
 
-from rubicon.java import JavaClass, JavaInterface
+from rubicon.java import JavaClass, JavaInterface, ClassCache, invalidate_loader
+from rubicon.java import select_polymorph, compile_polymorphs
+from rubicon.java import ClassMetadata, MetadataCache
+from rubicon.java import JavaField, JavaMethod, BoundJavaMethod
+from rubicon.java import generate_bindings, release_pending, local_scope
+from rubicon.java import ref_accounting, instance_table, WeakJavaRef
+from rubicon.java import callback_trampolines, BatchingAdapter
 
 
 class JNITest(TestCase):
@@ -236,6 +251,650 @@ class JNITest(TestCase):
         with self.assertRaises(ValueError):
             Example.tripler(1.234)
 
+    def test_polymorph_dispatch(self):
+        "Overloads are resolved by arity, then by argument types in order of preference"
+        polymorphs = {
+            "": "none",
+            "J": "long",
+            "S": "short",
+            "Ljava/lang/Object;": "object",
+            "ILjava/lang/String;": "int, string",
+            "JLjava/lang/CharSequence;": "long, charsequence",
+        }
+        dispatch = compile_polymorphs(polymorphs)
+
+        self.assertEqual(select_polymorph(polymorphs, (), dispatch),
+                         ("", (), "none"))
+        self.assertEqual(select_polymorph(polymorphs, (42,), dispatch),
+                         ("I", ("J",), "long"))
+        self.assertEqual(select_polymorph(polymorphs, ("wibble",), dispatch),
+                         ("Ljava/lang/String;", ("Ljava/lang/Object;",), "object"))
+        self.assertEqual(select_polymorph(polymorphs, (42, "wibble"), dispatch),
+                         ("ILjava/lang/String;", ("I", "Ljava/lang/String;"), "int, string"))
+
+        # The compiled structure is optional.
+        self.assertEqual(select_polymorph(polymorphs, (42,))[2], "long")
+
+        # If arguments don't match available options, an error is raised
+        with self.assertRaises(KeyError):
+            select_polymorph(polymorphs, (1.234,), dispatch)
+        with self.assertRaises(KeyError):
+            select_polymorph(polymorphs, (1, 2, 3), dispatch)
+
+    def test_polymorph_inline_cache(self):
+        "Resolved overloads are cached by argument types, up to INLINE_CACHE_SIZE of them"
+        _jmethod = importlib.import_module('jt.rubicon.java._jmethod')
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        obj = Example()
+        obj.doubler
+        doubler = Example.__dict__["doubler"]
+
+        slow_calls = []
+        def counting_select_polymorph(*args):
+            slow_calls.append(args[1])
+            return select_polymorph(*args)
+
+        _jmethod.select_polymorph = counting_select_polymorph
+        doubler.INLINE_CACHE_SIZE = 1
+        try:
+            doubler._JavaPolymorphic__icache.clear()
+
+            # A repeated call hits the cache.
+            self.assertEqual(obj.doubler(42), 84)
+            self.assertEqual(obj.doubler(21), 42)
+            self.assertEqual(len(slow_calls), 1)
+            self.assertEqual(list(doubler._JavaPolymorphic__icache), [(int,)])
+
+            # The argument types beyond the size of the cache take the slow
+            # path on every call, and are still resolved correctly.
+            self.assertEqual(obj.doubler("wibble"), "wibblewibble")
+            self.assertEqual(obj.doubler("wobble"), "wobblewobble")
+            self.assertEqual(len(slow_calls), 3)
+            self.assertEqual(list(doubler._JavaPolymorphic__icache), [(int,)])
+            self.assertEqual(obj.doubler(42), 84)
+            self.assertEqual(len(slow_calls), 3)
+        finally:
+            _jmethod.select_polymorph = select_polymorph
+            del doubler.INLINE_CACHE_SIZE
+            doubler._JavaPolymorphic__icache.clear()
+
+    def test_argument_marshalling(self):
+        "Arguments are stored straight into the jvalues by per-type setters"
+        _conversion = importlib.import_module('jt.rubicon.java._conversion')
+        from rubicon.java import compile_marshaller
+        from jt.jvm.jstring import JString
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        Thing   = JavaClass('org/pybee/rubicon/test/Thing')
+        thing = Thing('This is thing', 2)
+
+        marshaller = compile_marshaller(["Z", "C", "B", "S", "I", "J", "F", "D",
+                                         "Ljava/lang/String;",
+                                         "Lorg/pybee/rubicon/test/Thing;",
+                                         "Ljava/lang/Object;"])
+        self.assertEqual(marshaller, (_conversion._set_boolean_argument,
+                                      _conversion._set_char_argument,
+                                      _conversion._set_byte_argument,
+                                      _conversion._set_short_argument,
+                                      _conversion._set_int_argument,
+                                      _conversion._set_long_argument,
+                                      _conversion._set_float_argument,
+                                      _conversion._set_double_argument)
+                                     + (_conversion._set_object_argument,) * 3)
+
+        # Record the local references released after the calls.
+        deleted = []
+        jvm = _conversion.JVM.jvm
+
+        class RecordingEnv(object):
+            def __init__(self, jenv):
+                self.jenv = jenv
+            def __getattr__(self, name):
+                return getattr(self.jenv, name)
+            def DeleteLocalRef(self, jobject):
+                deleted.append(jobject)
+                self.jenv.DeleteLocalRef(jobject)
+
+        class RecordingJVM(object):
+            def __getattr__(self, name):
+                return getattr(jvm, name)
+            def __enter__(self):
+                _, jenv = jvm.__enter__()
+                return jvm, RecordingEnv(jenv)
+            def __exit__(self, *exc_info):
+                return jvm.__exit__(*exc_info)
+
+        JVM = _conversion.JVM
+        _conversion.JVM = type("JVM", (object,), dict(jvm=RecordingJVM()))
+        try:
+            pool = _conversion._ArgumentsPool(len(marshaller))
+            args = (True, "x", -2, 300, 70000, 2 ** 40, 1.5, 2.25, "wibble", thing, None)
+            jargs, jlocals = _conversion._marshal_args(marshaller, args, pool)
+            jvalues = jargs.arguments
+            self.assertTrue(jvalues[0].z)
+            self.assertEqual(jvalues[1].c, ord("x"))
+            self.assertEqual(jvalues[2].b, -2)
+            self.assertEqual(jvalues[3].s, 300)
+            self.assertEqual(jvalues[4].i, 70000)
+            self.assertEqual(jvalues[5].j, 2 ** 40)
+            self.assertEqual(jvalues[6].f, 1.5)
+            self.assertEqual(jvalues[7].d, 2.25)
+            self.assertFalse(jvalues[10].l)
+            with jvm as (_, jenv):
+                self.assertEqual(len(jlocals), 1)
+                self.assertTrue(jenv.IsSameObject(jvalues[8].l, jlocals[0]))
+                self.assertEqual(JString(jenv, jlocals[0], own=False).str, "wibble")
+                self.assertTrue(jenv.IsSameObject(jvalues[9].l, thing.__javaobject__))
+
+            # The string is freed and the buffer goes back to the pool.
+            _conversion._release_args(pool, jargs, jlocals)
+            self.assertEqual(deleted, jlocals)
+            self.assertIs(pool.spare, jargs)
+
+            # A failure also gives the buffer back.
+            with self.assertRaises(ValueError):
+                _conversion._marshal_args(marshaller[-1:], (object(),), pool)
+            self.assertIs(pool.spare, jargs)
+            with self.assertRaises(ValueError):
+                _conversion._marshal_args(marshaller, args[:-1], pool)
+
+            # The same through handles.
+            del deleted[:]
+            tripler = Example.tripler.signature("(Ljava/lang/String;)Ljava/lang/String;")
+            self.assertEqual(tripler("wibble"), "wibblewibblewibble")
+            self.assertEqual(len(deleted), 1)
+
+            example = Example()
+            set_thing = example.set_thing.signature("(Lorg/pybee/rubicon/test/Thing;)V")
+            set_thing(thing)
+            self.assertEqual(example.get_thing().toString(), "This is thing 2")
+            set_thing(None)
+            self.assertIsNone(example.get_thing())
+            self.assertEqual(len(deleted), 1)
+        finally:
+            _conversion.JVM = JVM
+
+    def test_arguments_pool(self):
+        "Argument buffers are reused, but never shared by nested calls or threads"
+        _conversion = importlib.import_module('jt.rubicon.java._conversion')
+
+        pool = _conversion._ArgumentsPool(2)
+        jargs = pool.acquire()
+        self.assertEqual(len(jargs.arguments), 2)
+        # In use, so a nested call gets another buffer.
+        nested = pool.acquire()
+        self.assertIsNot(nested, jargs)
+        pool.release(nested)
+        pool.release(jargs)
+        self.assertIs(pool.acquire(), jargs)
+        pool.release(jargs)
+
+        # Each thread has its own buffer.
+        acquired = []
+        def acquire():
+            acquired.append(pool.spare)
+            acquired.append(pool.acquire())
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        self.assertIsNone(acquired[0])
+        self.assertIsNot(acquired[1], jargs)
+        self.assertIs(pool.spare, jargs)
+
+        # A Java callback calling back into the same method.
+        ICallback = JavaInterface('org/pybee/rubicon/test/ICallback')
+
+        values = []
+        spares = []
+
+        class MyInterface(ICallback):
+            def poke(self, example, value):
+                values.append(value)
+                spares.append(test_poke_pool.spare)
+                if value < 3:
+                    example.test_poke(value + 1)
+                values.append(value)
+
+            def peek(self, example, value):
+                pass
+
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        example = Example()
+        handler = MyInterface()
+        example.set_callback(handler)
+        example.test_poke
+        test_poke_pool = Example.__dict__["test_poke"]._polymorphs["I"]["jargs_pool"]
+
+        example.test_poke(1)
+        self.assertEqual(values, [1, 2, 3, 3, 2, 1])
+        # The buffers of the enclosing calls are in use, so not spare.
+        self.assertEqual(spares, [None, None, None])
+        jargs = test_poke_pool.spare
+        self.assertIsNotNone(jargs)
+
+        del values[:], spares[:]
+        example.test_poke(3)
+        self.assertEqual(values, [3, 3])
+        self.assertIs(test_poke_pool.spare, jargs)
+
+    def test_signature_handles(self):
+        "A method or constructor can be pinned to a single JNI signature"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        new_example = Example.constructor("(II)V")
+        obj = new_example(3342, 3337)
+        self.assertEqual(obj.base_int_field, 3342)
+        self.assertEqual(obj.int_field, 3337)
+
+        get_int_field = obj.get_int_field.signature("()I")
+        self.assertEqual(get_int_field(), 3337)
+
+        doubler = obj.doubler.signature("(J)J")
+        self.assertEqual(doubler(42), 84)
+
+        tripler = Example.tripler.signature("(Ljava/lang/String;)Ljava/lang/String;")
+        self.assertEqual(tripler("wibble"), "wibblewibblewibble")
+
+        # Unknown signatures raise an error.
+        with self.assertRaises(ValueError):
+            obj.doubler.signature("(D)D")
+        with self.assertRaises(ValueError):
+            obj.doubler.signature("(I)J")
+        with self.assertRaises(ValueError):
+            Example.constructor("(Ljava/lang/String;)V")
+
+        # A handle accepts only as many arguments as its signature.
+        with self.assertRaises(ValueError):
+            doubler(1, 2)
+
+    def test_primitive_fast_path(self):
+        "Methods taking and returning only primitives are called directly"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        obj = Example()
+        self.assertEqual(sorted(obj.get_int_field.method._fast_paths()), [0])
+        self.assertEqual(sorted(obj.set_int_field.method._fast_paths()), [1])
+        self.assertEqual(sorted(Example.set_static_int_field._fast_paths()), [1])
+
+        # Overloads of the same arity, or non-primitive types, take the general path.
+        self.assertEqual(obj.doubler.method._fast_paths(), {})
+        self.assertEqual(obj.duplicate_string.method._fast_paths(), {})
+
+        obj.set_int_field(1234)
+        self.assertEqual(obj.get_int_field(), 1234)
+        self.assertAlmostEqual(obj.area_of_circle(1.0), math.pi)
+
+        Example.set_static_int_field(2345)
+        self.assertEqual(Example.get_static_int_field(), 2345)
+        Example.set_static_int_field(11)
+
+        # Arguments of other types are still resolved (and rejected) as before.
+        with self.assertRaises(ValueError):
+            obj.set_int_field("wibble")
+
+    def test_class_metadata(self):
+        "The public members of a class are introspected in bulk"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        metadata = Example._metadata
+        self.assertEqual(metadata.alternates, ["Lorg/pybee/rubicon/test/Example;",
+                                               "Lorg/pybee/rubicon/test/BaseExample;",
+                                               "Ljava/lang/Object;"])
+        self.assertEqual(metadata.fields["int_field"], "I")
+        self.assertEqual(metadata.fields["theThing"], "Lorg/pybee/rubicon/test/Thing;")
+        self.assertEqual(metadata.static_fields["static_base_int_field"], "I")
+        self.assertEqual(sorted(metadata.methods["doubler"]),
+                         [("I", "I"), ("J", "J"), ("Ljava/lang/String;", "Ljava/lang/String;")])
+        self.assertEqual(metadata.static_methods["get_static_int_field"], [("", "I")])
+        self.assertEqual(sorted(metadata.constructors), ["", "I", "II"])
+
+        # Non-public and static/instance mismatched members aren't described.
+        self.assertNotIn("invisible_field", metadata.fields)
+        self.assertNotIn("invisible_method", metadata.methods)
+        self.assertNotIn("tripler", metadata.methods)
+        self.assertNotIn("get_int_field", metadata.static_methods)
+
+        # All the members are indexed by name.
+        self.assertEqual(metadata.members["int_field"], ClassMetadata.FIELD)
+        self.assertEqual(metadata.members["doubler"], ClassMetadata.METHOD)
+        self.assertEqual(metadata.members["static_int_field"], ClassMetadata.STATIC_FIELD)
+        self.assertEqual(metadata.members["tripler"], ClassMetadata.STATIC_METHOD)
+        self.assertNotIn("invisible_field", metadata.members)
+
+    def test_metadata_cache(self):
+        "Class descriptions are cached on disk, checked against the files they come from"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        description = "Sjava.lang.Object\nM1\tget_int_field\tint\n"
+
+        directory = tempfile.mkdtemp()
+        try:
+            cache = MetadataCache()
+            cache.start(directory)
+            key, cached = cache.lookup(Example._descriptor, Example.__javaclass__)
+            self.assertIsNotNone(key)
+            self.assertIsNone(cached)
+            # The files of the superclasses count too
+            paths = [path.replace("\\", "/") for path, _ in key]
+            self.assertTrue(any(path.endswith("org/pybee/rubicon/test/Example.class")
+                                for path in paths))
+            self.assertTrue(any(path.endswith("org/pybee/rubicon/test/BaseExample.class")
+                                for path in paths))
+            cache.store(key, Example._descriptor, description)
+            cache.stop()
+
+            # Another process finds it
+            cache.start(directory)
+            key, cached = cache.lookup(Example._descriptor, Example.__javaclass__)
+            self.assertEqual(cached, description)
+
+            # A change of the file of a superclass invalidates it
+            stale_key = [[path, [size + 1, mtime]] if path.endswith("BaseExample.class")
+                         else [path, [size, mtime]] for path, (size, mtime) in key]
+            cache.store(stale_key, Example._descriptor, description)
+            cache.stop()
+            cache.start(directory)
+            key, cached = cache.lookup(Example._descriptor, Example.__javaclass__)
+            self.assertIsNotNone(key)
+            self.assertIsNone(cached)
+            cache.stop()
+
+            # The cache is disabled without a directory
+            cache.start("")
+            self.assertEqual(cache.lookup(Example._descriptor, Example.__javaclass__),
+                             (None, None))
+            cache.stop()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_class_cache(self):
+        "The class cache can be bounded, keeping the pinned classes"
+        Example     = JavaClass('org/pybee/rubicon/test/Example')
+        BaseExample = JavaClass('org/pybee/rubicon/test/BaseExample')
+        Thing       = JavaClass('org/pybee/rubicon/test/Thing')
+
+        self.assertIs(JavaClass('org/pybee/rubicon/test/Example'), Example)
+
+        cache = ClassCache()
+        cache.start(ClassCache.LRU, 2)
+        cache.add(Example._descriptor, Example)
+        cache.add(Thing._descriptor, Thing)
+        self.assertIs(cache.get(Example._descriptor), Example)
+        # Thing is now the least recently used one.
+        cache.add(BaseExample._descriptor, BaseExample)
+        self.assertIsNone(cache.get(Thing._descriptor))
+        self.assertEqual(len(cache), 2)
+
+        # Pinned classes are kept, and don't count toward the size.
+        cache.pin(Example)
+        cache.add(Thing._descriptor, Thing)
+        cache.add(Thing._descriptor, Thing)
+        self.assertIn(Example._descriptor, cache)
+        self.assertIn(BaseExample._descriptor, cache)
+        self.assertIn(Thing._descriptor, cache)
+        self.assertEqual(len(cache), 2)
+        cache.discard(Example._descriptor)
+        self.assertIs(cache.get(Example._descriptor), Example)
+        cache.unpin(Example)
+        self.assertNotIn(BaseExample._descriptor, cache)
+
+        cache.start(ClassCache.WEAK)
+        cache.add(Example._descriptor, Example)
+        self.assertIs(cache.get(Example._descriptor), Example)
+
+        with self.assertRaises(ValueError):
+            cache.start("random")
+
+    def test_class_loader(self):
+        "Classes can be loaded through a plugin class loader, and dropped by loader"
+        File = JavaClass('java/io/File')
+        Array = JavaClass('java/lang/reflect/Array')
+        URLClassLoader = JavaClass('java/net/URLClassLoader')
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "java", "plugin", "classes")
+        url = File(plugin_path).toURI().toURL()
+        urls = Array.newInstance.signature("(Ljava/lang/Class;I)Ljava/lang/Object;")(
+                                           url.getClass(), 1)
+        Array.set(urls, 0, url)
+        loader = URLClassLoader.constructor("([Ljava/net/URL;)V")(urls)
+
+        # The plugin classes aren't on the classpath.
+        with self.assertRaises(Exception):
+            JavaClass('org/pybee/rubicon/plugin/Plugin')
+
+        Plugin = JavaClass('org/pybee/rubicon/plugin/Plugin', loader=loader)
+        self.assertIs(JavaClass('org/pybee/rubicon/plugin/Plugin', loader=loader), Plugin)
+
+        # The types named by the plugin classes are resolved through their loader.
+        widget = Plugin().make("gear")
+        self.assertEqual(widget.getName(), "gear")
+        self.assertIs(type(widget), JavaClass('org/pybee/rubicon/plugin/Widget', loader=loader))
+
+        with self.assertRaises(Exception):
+            JavaClass('org/pybee/rubicon/plugin/NoSuchClass', loader=loader)
+
+        # Only the classes of that loader are dropped.
+        invalidate_loader(loader)
+        self.assertIs(JavaClass('org/pybee/rubicon/test/Example'), Example)
+        self.assertIsNot(JavaClass('org/pybee/rubicon/plugin/Plugin', loader=loader), Plugin)
+        invalidate_loader(loader)
+
+    def test_release_queue(self):
+        "Owned global references are released once their instances are collected"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        gc.collect()
+        release_pending()
+
+        obj = Example()
+        obj.set_int_field(1234)
+        self.assertEqual(obj.get_int_field(), 1234)
+        del obj
+        # The reference is deleted only at a safe point.
+        self.assertEqual(release_pending(), 1)
+        self.assertEqual(release_pending(), 0)
+
+    def test_ref_accounting(self):
+        "Live global references are accounted by origin and class"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        descriptor = 'org/pybee/rubicon/test/Example'
+
+        gc.collect()
+        release_pending()
+
+        accounting = ref_accounting()
+        accounting.enable(stacks=True)
+        try:
+            objs = [Example() for _ in range(3)]
+            self.assertEqual(accounting.live()["JavaInstance"], 3)
+            self.assertEqual(accounting.live_by_class()[descriptor], 3)
+            records = accounting.records(origin="JavaInstance")
+            self.assertEqual(len(records), 3)
+            self.assertEqual(records[0].descriptor, descriptor)
+            self.assertIsNotNone(records[0].stack)
+
+            del objs
+            release_pending()
+            self.assertNotIn("JavaInstance", accounting.live())
+            self.assertNotIn(descriptor, accounting.live_by_class())
+            self.assertEqual(accounting.high_water()["JavaInstance"], 3)
+            accounting.reset_high_water()
+            self.assertNotIn("JavaInstance", accounting.high_water())
+        finally:
+            accounting.disable()
+
+    def test_instance_interning(self):
+        "Repeated returns of the same object can reuse its wrapper"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        Thing = JavaClass('org/pybee/rubicon/test/Thing')
+
+        example = Example()
+        example.set_thing(Thing('This is thing', 2))
+        self.assertIsNot(example.get_thing(), example.get_thing())
+
+        table = instance_table()
+        table.enable()
+        try:
+            the_thing = example.get_thing()
+            self.assertIs(example.get_thing(), the_thing)
+            self.assertEqual(the_thing.toString(), "This is thing 2")
+
+            example.set_thing(Thing('This is another thing', 3))
+            self.assertIsNot(example.get_thing(), the_thing)
+
+            # Wrappers are interned only while they are alive.
+            del the_thing
+            self.assertEqual(len(table), 0)
+        finally:
+            table.disable()
+
+    def test_local_scope(self):
+        "Objects returned in a local scope stay local references, unless kept"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        Thing = JavaClass('org/pybee/rubicon/test/Thing')
+
+        example = Example()
+        example.set_thing(Thing('This is thing', 2))
+
+        with local_scope(capacity=100) as scope:
+            for _ in range(1000):
+                the_thing = example.get_thing()
+                self.assertEqual(the_thing.toString(), "This is thing 2")
+            kept = scope.keep(the_thing)
+            self.assertIs(scope.keep(kept), kept)
+
+        self.assertEqual(kept.toString(), "This is thing 2")
+
+    def test_weak_refs(self):
+        "A weak reference to an instance doesn't keep it alive, but can be upgraded"
+        Thing = JavaClass('org/pybee/rubicon/test/Thing')
+
+        thing = Thing('This is thing', 2)
+        ref = WeakJavaRef(thing)
+        self.assertTrue(ref.alive())
+
+        strong = ref()
+        self.assertIsInstance(strong, Thing)
+        self.assertEqual(strong.toString(), "This is thing 2")
+
+        # Once the Python wrappers and their global references are gone, the
+        # object is collectable; System.gc() is only a hint, so retry a bit.
+        System = JavaClass('java/lang/System')
+        Thread = JavaClass('java/lang/Thread')
+        del thing, strong
+        for _ in range(50):
+            gc.collect()
+            release_pending()
+            System.gc()
+            if not ref.alive():
+                break
+            Thread.sleep(10)
+        self.assertFalse(ref.alive())
+        self.assertIsNone(ref())
+
+    def test_slotted_instances(self):
+        "Instances hold only their reference, in slots"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        obj = Example()
+        with self.assertRaises(AttributeError):
+            obj.__dict__
+        self.assertIs(weakref.ref(obj)(), obj)
+
+        obj.int_field = 1234
+        self.assertEqual(obj.int_field, 1234)
+        with self.assertRaises(AttributeError):
+            obj.not_a_field = 1
+
+    def test_member_descriptors(self):
+        "Instance members are installed on the class as descriptors once discovered"
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+
+        obj = Example()
+        obj.int_field
+        obj.get_int_field
+        self.assertIsInstance(Example.__dict__["int_field"], JavaField)
+        self.assertIsInstance(Example.__dict__["get_int_field"], JavaMethod)
+
+        obj.int_field = 4321
+        self.assertEqual(obj.int_field, 4321)
+        self.assertIsInstance(obj.get_int_field, BoundJavaMethod)
+        self.assertEqual(obj.get_int_field(), 4321)
+
+        # Field writes go through the installed descriptor.
+        writes = []
+        class Tracing(JavaField):
+            def __set__(self, instance, value):
+                writes.append(value)
+                super(Tracing, self).__set__(instance, value)
+        field = Example.__dict__["int_field"]
+        type.__setattr__(Example, "int_field", Tracing(Example, "int_field", "I"))
+        try:
+            obj.int_field = 1234
+        finally:
+            type.__setattr__(Example, "int_field", field)
+        self.assertEqual(writes, [1234])
+        self.assertEqual(obj.get_int_field(), 1234)
+
+        # Static members aren't installed on the class.
+        Example.static_int_field
+        self.assertNotIn("static_int_field", Example.__dict__)
+
+        # Instance members still can't be accessed through the class.
+        with self.assertRaises(AttributeError):
+            Example.int_field
+        with self.assertRaises(AttributeError):
+            Example.get_int_field
+
+    def test_bindings(self):
+        "Generated bindings dispatch through tables of pinned handles"
+        source = generate_bindings(["org/pybee/rubicon/test/BaseExample",
+                                    "org/pybee/rubicon/test/Thing"])
+        bindings = {}
+        exec(compile(source, "<bindings>", "exec"), bindings)
+        self.assertEqual(bindings["__all__"], ("BaseExample", "Thing"))
+
+        BaseExample = bindings["BaseExample"]
+        self.assertIs(BaseExample, JavaClass("org/pybee/rubicon/test/BaseExample"))
+
+        obj = BaseExample(42)
+        self.assertEqual(obj.base_int_field, 42)
+        obj.set_base_int_field(1234)
+        self.assertEqual(obj.get_base_int_field(), 1234)
+
+        BaseExample.set_static_base_int_field(2345)
+        self.assertEqual(BaseExample.get_static_base_int_field(), 2345)
+        BaseExample.set_static_base_int_field(1)
+
+        # Arguments the tables don't cover take the normal overload resolution.
+        with self.assertRaises(ValueError):
+            obj.set_base_int_field("wibble")
+
+        Thing = bindings["Thing"]
+        thing = Thing("This is thing", 2)
+        self.assertEqual(str(thing), "This is thing 2")
+
+    def test_bindings_module(self):
+        "Generated bindings can be written out and imported as a module"
+        source = generate_bindings(["org/pybee/rubicon/test/Thing"])
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmpdir, "rubicon_test_bindings.py"), "w") as module:
+                module.write(source)
+            sys.path.insert(0, tmpdir)
+            try:
+                bindings = importlib.import_module("rubicon_test_bindings")
+            finally:
+                sys.path.remove(tmpdir)
+                sys.modules.pop("rubicon_test_bindings", None)
+        finally:
+            shutil.rmtree(tmpdir)
+
+        self.assertEqual(bindings.__all__, ("Thing",))
+        self.assertIs(bindings.Thing, JavaClass("org/pybee/rubicon/test/Thing"))
+        thing = bindings.Thing("This is thing", 3)
+        self.assertEqual(thing.toString(), "This is thing 3")
+
     def test_static_access_non_static(self):
         "An instance field/method cannot be accessed from the static context"
         Example = JavaClass('org/pybee/rubicon/test/Example')
@@ -346,6 +1005,347 @@ class JNITest(TestCase):
         self.assertEqual(results['string'], 'This is a Java Example object')
         self.assertEqual(results['int'], 47)
 
+    def test_interface_dispatchers(self):
+        "The callback dispatchers are compiled once per method"
+        ICallback = JavaInterface('org/pybee/rubicon/test/ICallback')
+
+        results = []
+
+        class MyInterface(ICallback):
+            def poke(self, example, value):
+                results.append(('poke', value))
+
+            def peek(self, example, value):
+                results.append(('peek', value))
+
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        example = Example()
+        example.set_callback(MyInterface())
+
+        for value in range(3):
+            example.test_peek(value)
+            example.test_poke(value)
+
+        self.assertEqual(results, [('peek', 0), ('poke', 0), ('peek', 1),
+                                   ('poke', 1), ('peek', 2), ('poke', 2)])
+        self.assertEqual(len(MyInterface._dispatchers), 2)
+
+    def test_interface_result(self):
+        "A Java interface implemented in Python can return values"
+        Comparator = JavaInterface('java/util/Comparator')
+
+        class ByLength(Comparator):
+            def compare(self, first, second):
+                return len(first.toString()) - len(second.toString())
+
+        ArrayList = JavaClass('java/util/ArrayList')
+        Collections = JavaClass('java/util/Collections')
+
+        words = ArrayList()
+        for word in ("three", "a", "to"):
+            words.add(word)
+
+        by_length = ByLength()
+        Collections.sort(words, by_length)
+
+        self.assertEqual([words.get(idx).toString() for idx in range(words.size())],
+                         ["a", "to", "three"])
+        self.assertEqual(Collections.max(words, by_length).toString(), "three")
+
+    def test_interface_exception(self):
+        "An exception raised by a Java interface implemented in Python is thrown into Java"
+        Comparator = JavaInterface('java/util/Comparator')
+
+        class Failing(Comparator):
+            def compare(self, first, second):
+                raise ValueError("Can't compare {} and {}".format(first, second))
+
+        ArrayList = JavaClass('java/util/ArrayList')
+        Collections = JavaClass('java/util/Collections')
+
+        words = ArrayList()
+        for word in ("three", "a", "to"):
+            words.add(word)
+
+        # The Java caller gets the exception instead of a null result.
+        with self.assertRaises(Exception) as context:
+            Collections.sort(words, Failing())
+        self.assertIn("java.lang.RuntimeException", str(context.exception))
+        self.assertIn("ValueError: Can't compare", str(context.exception))
+
+        # The list is untouched.
+        self.assertEqual([words.get(idx).toString() for idx in range(words.size())],
+                         ["three", "a", "to"])
+
+        # A primitive result can't be None.
+        class Undecided(Comparator):
+            def compare(self, first, second):
+                return None
+
+        with self.assertRaises(Exception) as context:
+            Collections.sort(words, Undecided())
+        self.assertIn("TypeError", str(context.exception))
+        self.assertIn("'compare' returned None instead of a value of type int",
+                      str(context.exception))
+
+    def test_interface_trampolines(self):
+        "A Java interface can be implemented by a generated trampoline class"
+        trampolines = callback_trampolines()
+        enabled = trampolines.enabled
+        trampolines.enable()
+        try:
+            ICallback = JavaInterface('org/pybee/rubicon/test/ICallback')
+            Comparator = JavaInterface('java/util/Comparator')
+
+            results = {}
+
+            class MyInterface(ICallback):
+                def __init__(self, value):
+                    super(MyInterface, self).__init__()
+                    self.value = value
+
+                def poke(self, example, value):
+                    results['string'] = example.toString()
+                    results['int'] = value + self.value
+
+                def peek(self, example, value):
+                    results['string'] = example.toString()
+                    results['int'] = value + self.value
+
+            class ByLength(Comparator):
+                def compare(self, first, second):
+                    return len(first.toString()) - len(second.toString())
+
+            Example = JavaClass('org/pybee/rubicon/test/Example')
+            example = Example()
+            example.set_callback(MyInterface(10))
+
+            example.test_peek(42)
+            self.assertEqual(results['string'], 'This is a Java Example object')
+            self.assertEqual(results['int'], 52)
+
+            ArrayList = JavaClass('java/util/ArrayList')
+            Collections = JavaClass('java/util/Collections')
+            words = ArrayList()
+            for word in ("three", "a", "to"):
+                words.add(word)
+            Collections.sort(words, ByLength())
+            self.assertEqual([words.get(idx).toString() for idx in range(words.size())],
+                             ["a", "to", "three"])
+
+            self.assertIsNotNone(trampolines.get(MyInterface))
+            self.assertIsNotNone(trampolines.get(ByLength))
+
+            # The methods the Python class doesn't implement, and the
+            # exceptions it raises, throw Java exceptions.
+            class PeekOnly(ICallback):
+                def peek(self, example, value):
+                    raise ValueError("Can't peek {}".format(value))
+
+            example.set_callback(PeekOnly())
+            self.assertIsNotNone(trampolines.get(PeekOnly))
+            with self.assertRaises(Exception) as context:
+                example.test_poke(37)
+            self.assertIn("doesn't implement the Java method 'poke'", str(context.exception))
+            with self.assertRaises(Exception) as context:
+                example.test_peek(42)
+            self.assertIn("ValueError: Can't peek 42", str(context.exception))
+
+            # The trampoline of a collected class is released.
+            Dynamic = type(str("Dynamic"), (ICallback,), {"peek": lambda self, example, value: None})
+            self.assertIsNotNone(trampolines.get(Dynamic))
+            count = len(trampolines)
+            dynamic_ref = weakref.ref(Dynamic)
+            del Dynamic
+            gc.collect()
+            self.assertIsNone(dynamic_ref())
+            self.assertEqual(trampolines.release_collected(), 1)
+            self.assertEqual(len(trampolines), count - 1)
+        finally:
+            if not enabled:
+                trampolines.disable()
+
+    def test_interface_boxed_arguments(self):
+        "The primitive arguments boxed by a Java proxy are unboxed for Python"
+        trampolines = callback_trampolines()
+        enabled = trampolines.enabled
+        trampolines.disable()
+        try:
+            IPrimitives = JavaInterface('org/pybee/rubicon/test/IPrimitives')
+
+            results = []
+
+            class MyInterface(IPrimitives):
+                def primitives(self, z, c, b, s, i, j, f, d):
+                    results.append((z, c, b, s, i, j, f, d))
+
+                def boxes(self, z, c, b, s, i, j, f, d):
+                    results.append((z, c, b, s, i, j, f, d))
+
+            handler = MyInterface()
+            self.assertIsNone(trampolines.get(MyInterface))
+            proxy = JavaClass('org/pybee/rubicon/test/IPrimitives')(jni=handler.__javaobject__)
+
+            primitives = proxy.primitives.signature("(ZCBSIJFD)V")
+            primitives(True, "x", -2, 300, 70000, 2 ** 40, 1.5, 2.25)
+            primitives(False, "€", 127, -32768, -1, -2 ** 63, -0.5, 1e300)
+            self.assertEqual(results, [(True, "x", -2, 300, 70000, 2 ** 40, 1.5, 2.25),
+                                       (False, "€", 127, -32768, -1, -2 ** 63, -0.5, 1e300)])
+            self.assertIs(type(results[0][0]), bool)
+
+            # Parameters of boxed types are passed as objects, a null box as None.
+            del results[:]
+            boxes = proxy.boxes.signature("(Ljava/lang/Boolean;Ljava/lang/Character;"
+                                          "Ljava/lang/Byte;Ljava/lang/Short;"
+                                          "Ljava/lang/Integer;Ljava/lang/Long;"
+                                          "Ljava/lang/Float;Ljava/lang/Double;)V")
+            boxes(None, None, None, None, None, None, None, None)
+            self.assertEqual(results, [(None,) * 8])
+
+            del results[:]
+            Integer = JavaClass('java/lang/Integer')
+            boxes(None, None, None, None,
+                  Integer.valueOf.signature("(I)Ljava/lang/Integer;")(70000),
+                  None, None, None)
+            self.assertEqual(results[0][4].intValue(), 70000)
+            self.assertEqual(results[0][:4] + results[0][5:], (None,) * 7)
+        finally:
+            if enabled:
+                trampolines.enable()
+
+    def test_interface_lifecycle(self):
+        "A proxy stays alive while Java references it"
+        ICallback = JavaInterface('org/pybee/rubicon/test/ICallback')
+
+        results = {}
+
+        class MyInterface(ICallback):
+            def __init__(self, value):
+                super(MyInterface, self).__init__()
+                self.value = value
+
+            def poke(self, example, value):
+                results['int'] = value + self.value
+
+            def peek(self, example, value):
+                results['int'] = value + self.value
+
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        example = Example()
+
+        # Only Java references the handler.
+        example.set_callback(MyInterface(10))
+        gc.collect()
+
+        example.test_peek(42)
+        self.assertEqual(results['int'], 52)
+
+        handler = MyInterface(5)
+        handler_ref = weakref.ref(handler)
+        example.set_callback(handler)
+        del handler
+        gc.collect()
+
+        self.assertIsNotNone(handler_ref())
+        example.test_poke(37)
+        self.assertEqual(results['int'], 42)
+
+    def test_interface_release(self):
+        "A detached proxy is released once Java collects its proxy instance"
+        _jproxy = importlib.import_module('jt.rubicon.java._jproxy')
+        ICallback = JavaInterface('org/pybee/rubicon/test/ICallback')
+        System = JavaClass('java/lang/System')
+
+        class MyInterface(ICallback):
+            def poke(self, example, value):
+                pass
+
+            def peek(self, example, value):
+                pass
+
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        example = Example()
+
+        handler = MyInterface()
+        handler_id = id(handler)
+        handler_ref = weakref.ref(handler)
+        example.set_callback(handler)
+        del handler
+        gc.collect()
+        self.assertIn(handler_id, _jproxy._detached_proxies)
+
+        # Java drops its reference too.
+        other = MyInterface()
+        example.set_callback(other)
+        for _ in range(100):
+            gc.collect()
+            System.gc()
+            System.runFinalization()
+            release_pending()
+            if handler_ref() is None:
+                break
+            time.sleep(0.01)
+        self.assertIsNone(handler_ref())
+        self.assertNotIn(handler_id, _jproxy._detached_proxies)
+
+    def test_batching_adapter(self):
+        "The events of a Java listener can be delivered to Python in batches"
+        batches = []
+
+        Example = JavaClass('org/pybee/rubicon/test/Example')
+        example = Example()
+
+        with BatchingAdapter('org/pybee/rubicon/test/ICallback', batches.append,
+                             size=3, interval=None) as adapter:
+            example.set_callback(adapter.listener)
+            for value in range(4):
+                example.test_peek(value)
+
+            # Delivered by size
+            self.assertEqual(len(batches), 1)
+            self.assertEqual([(name, args[1]) for name, args in batches[0]],
+                             [('peek', 0), ('peek', 1), ('peek', 2)])
+            self.assertEqual(batches[0][0][1][0].toString(), 'This is a Java Example object')
+
+            example.test_poke(37)
+            adapter.flush()
+            self.assertEqual([(name, args[1]) for name, args in batches[1]],
+                             [('peek', 3), ('poke', 37)])
+
+        # Closed
+        example.test_peek(42)
+        self.assertEqual(len(batches), 2)
+
+        with BatchingAdapter('org/pybee/rubicon/test/ICallback', batches.append,
+                             interval=None, columnar=True) as adapter:
+            example.set_callback(adapter.listener)
+            for value in range(3):
+                example.test_poke(value)
+        self.assertEqual(batches[2]['poke'][1], [0, 1, 2])
+
+        # Delivered by time, from the delivery thread of the handler
+        del batches[:]
+        with BatchingAdapter('org/pybee/rubicon/test/ICallback', batches.append,
+                             interval=0.05) as adapter:
+            example.set_callback(adapter.listener)
+            for value in range(3):
+                example.test_peek(value)
+            for _ in range(100):
+                if sum(len(batch) for batch in batches) >= 3:
+                    break
+                time.sleep(0.01)
+            self.assertEqual([(name, args[1]) for batch in batches for name, args in batch],
+                             [('peek', 0), ('peek', 1), ('peek', 2)])
+
+        with self.assertRaises(ValueError):
+            BatchingAdapter('java/util/Comparator', batches.append)
+
+    def test_embedded_classes(self):
+        "The embedded class files are the ones generated from their sources"
+        classgen = importlib.import_module('jt.rubicon._java.classgen')
+        for class_name in sorted(classgen.classes):
+            self.assertTrue(classgen.classgen(class_name, check=True), class_name)
+
     def test_alternatives(self):
         "A class is aware of it's type heirarchy"
         Example = JavaClass('org/pybee/rubicon/test/Example')